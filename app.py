@@ -1,11 +1,21 @@
+import time
+
 import streamlit as st
 import pandas as pd
-import sqlite3
-import re
-import pdfplumber
-from docx import Document
-import uuid
-from io import BytesIO
+
+import db
+import dedupe
+import export
+import jd_batch
+import jobs
+import perf
+import reparse
+from blobstore import BlobStore, file_type
+from candidate_store import CandidateStore, filters_active
+from matching import jd_key
+from ranking import RankingEngine
+
+script_started = time.perf_counter()
 
 st.set_page_config(layout="wide")
 
@@ -137,129 +147,23 @@ st.markdown("""
 
 # ================= DATABASE =================
 
-conn = sqlite3.connect("database.db", check_same_thread=False)
-c = conn.cursor()
-
-c.execute("""
-CREATE TABLE IF NOT EXISTS candidates(
-id TEXT PRIMARY KEY,
-name TEXT,
-email TEXT,
-phone TEXT,
-skills TEXT,
-experience TEXT,
-content TEXT
-)
-""")
-
-conn.commit()
+@st.cache_resource
+def get_candidate_store():
+    """Candidate list snapshot, read connection and serialized writer, one per server process"""
+    return CandidateStore(db.DB_PATH)
 
-# ================= TEXT EXTRACTION =================
+store = get_candidate_store()
+conn = store.conn
 
-def extract_text(file):
-    """Extract text from PDF or DOCX files with error handling"""
-    text = ""
-    
-    try:
-        if file.name.endswith(".pdf"):
-            with pdfplumber.open(file) as pdf:
-                for p in pdf.pages:
-                    page_text = p.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-        
-        elif file.name.endswith(".docx"):
-            doc = Document(file)
-            text = "\n".join([p.text for p in doc.paragraphs])
-    
-    except Exception as e:
-        st.error(f"Error extracting text from {file.name}: {str(e)}")
-        return ""
-    
-    return text.strip()
+def get_queue_connection():
+    """This session's own connection for the upload queue"""
+    if "queue_conn" not in st.session_state:
+        st.session_state.queue_conn = db.connect(db.DB_PATH)
+    return st.session_state.queue_conn
 
-# ================= SMART PARSER =================
-
-def parse_resume(text):
-    """Parse resume with improved regex and validation"""
-    
-    if not text:
-        return "Unknown", "", "", "", ""
-    
-    lines = [line.strip() for line in text.split("\n") if line.strip()]
-    
-    # NAME - first non-empty line
-    name = lines[0][:60] if lines else "Unknown"
-    
-    # EMAIL - improved pattern
-    email_match = re.findall(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b', text)
-    email = email_match[0] if email_match else ""
-    
-    # PHONE - improved pattern for various formats
-    phone_match = re.findall(r'(?:\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}', text)
-    phone = phone_match[0] if phone_match else ""
-    
-    # EXPERIENCE - improved pattern
-    exp_match = re.findall(r'(\d+\+?\s*(?:years?|yrs?))', text.lower())
-    experience = exp_match[0] if exp_match else ""
-    
-    # SKILLS - expanded keyword scan
-    skill_list = ["python", "sql", "azure", "aws", "java", "react", "etl", "data", 
-                  "spark", "javascript", "typescript", "node", "docker", "kubernetes",
-                  "tensorflow", "pytorch", "excel", "tableau", "powerbi", "databricks",
-                  "snowflake", "airflow", "kafka", "redis", "mongodb", "postgresql",
-                  "machine learning", "ml", "ai", "data science", "analytics", "bi",
-                  "power bi", "looker", "quicksight", "redshift", "bigquery", "gcp",
-                  "devops", "ci/cd", "jenkins", "git", "linux", "bash", "shell"]
-    
-    found_skills = []
-    text_lower = text.lower()
-    
-    for skill in skill_list:
-        if skill in text_lower:
-            found_skills.append(skill)
-    
-    skills = ", ".join(found_skills) if found_skills else "Not specified"
-    
-    return name, email, phone, skills, experience
-
-# ================= JD MATCHING =================
-
-def calculate_match_percentage(candidate_text, candidate_skills, jd_text):
-    """Calculate match percentage between candidate and JD"""
-    
-    if not jd_text:
-        return 0
-    
-    candidate_text_lower = candidate_text.lower()
-    jd_text_lower = jd_text.lower()
-    
-    # Extract keywords from JD (simple approach)
-    jd_words = set(re.findall(r'\b\w+\b', jd_text_lower))
-    # Filter out common words
-    stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-                  'of', 'with', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has',
-                  'had', 'do', 'does', 'did', 'will', 'would', 'should', 'could', 'may',
-                  'might', 'must', 'can', 'this', 'that', 'these', 'those', 'i', 'you',
-                  'he', 'she', 'it', 'we', 'they', 'them', 'their', 'what', 'which',
-                  'who', 'when', 'where', 'why', 'how'}
-    jd_keywords = jd_words - stop_words
-    
-    # Count matching keywords
-    matches = 0
-    total_keywords = len(jd_keywords)
-    
-    if total_keywords == 0:
-        return 0
-    
-    for keyword in jd_keywords:
-        if len(keyword) > 2 and keyword in candidate_text_lower:
-            matches += 1
-    
-    # Calculate percentage
-    match_percentage = int((matches / total_keywords) * 100)
-    
-    return min(match_percentage, 100)
+@st.cache_data(max_entries=4, show_spinner=False)
+def load_skill_options(version):
+    return db.skill_names(conn)
 
 # ================= FORMAT RESUME =================
 
@@ -279,29 +183,6 @@ def format_resume_text(text):
     
     return '\n\n'.join(formatted_lines)
 
-# ================= EXPORT FUNCTIONS =================
-
-def convert_df_to_excel(df_export):
-    """Convert dataframe to Excel file using openpyxl"""
-    output = BytesIO()
-    
-    try:
-        # Try using openpyxl engine
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df_export.to_excel(writer, index=False, sheet_name='Candidates')
-    except:
-        # Fallback to basic Excel export without formatting
-        df_export.to_excel(output, index=False, sheet_name='Candidates')
-    
-    output.seek(0)
-    return output
-
-def prepare_export_data(df):
-    """Prepare data for export"""
-    export_df = df[['name', 'email', 'phone', 'experience', 'skills', 'match_percentage']].copy()
-    export_df.columns = ['Name', 'Email', 'Phone', 'Experience', 'Skills', 'Match %']
-    return export_df
-
 # ================= SESSION STATE =================
 
 if "selected_id" not in st.session_state:
@@ -313,14 +194,24 @@ if "jd_text" not in st.session_state:
 if "show_full_resume" not in st.session_state:
     st.session_state.show_full_resume = False
 
+if "ingest_jobs" not in st.session_state:
+    st.session_state.ingest_jobs = []
+    st.session_state.ingest_active = set()
+
 # ================= SIDEBAR =================
 
 st.sidebar.title("🔍 Filters")
 
 name_filter = st.sidebar.text_input("Candidate Name")
 email_filter = st.sidebar.text_input("Email")
-skill_filter = st.sidebar.text_input("Skills (contains)")
+skill_filter = st.sidebar.multiselect(
+    "Skills (must have all)",
+    load_skill_options(store.snapshot().version),
+    placeholder="Choose skills"
+)
+body_filter = st.sidebar.text_input("Search Resume Body", placeholder="e.g. kafka streaming")
 min_match = st.sidebar.slider("Minimum Match %", 0, 100, 0)
+page_size = st.sidebar.selectbox("Candidates per page", [25, 50, 100, 250, 500, 1000], index=2)
 
 delete_mode = st.sidebar.checkbox("🗑️ Enable Delete Mode")
 
@@ -363,134 +254,394 @@ files = st.file_uploader(
 
 if files:
     if st.button("🚀 Process All Resumes", type="primary"):
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        
-        uploaded_count = 0
-        error_count = 0
-        
-        for idx, file in enumerate(files):
-            status_text.text(f"Processing {file.name}...")
-            
-            try:
-                text = extract_text(file)
-                
-                if text:
-                    name, email, phone, skills, experience = parse_resume(text)
-                    uid = str(uuid.uuid4())
-                    
-                    c.execute("INSERT INTO candidates VALUES (?,?,?,?,?,?,?)",
-                             (uid, name, email, phone, skills, experience, text))
-                    conn.commit()
-                    uploaded_count += 1
-                else:
-                    error_count += 1
-            
-            except sqlite3.IntegrityError:
-                error_count += 1
-            except Exception as e:
-                st.warning(f"Error processing {file.name}: {str(e)}")
-                error_count += 1
-            
-            progress_bar.progress((idx + 1) / len(files))
-        
-        status_text.empty()
-        progress_bar.empty()
-        
-        st.success(f"✅ Uploaded {uploaded_count} resumes successfully!")
-        if error_count > 0:
-            st.warning(f"⚠️ {error_count} files failed to upload")
-        
+        # the bytes go to the queue and a worker process does the rest, so
+        # closing the tab no longer aborts the batch
+        queue_conn = get_queue_connection()
+        job_id = jobs.enqueue(queue_conn, [(file.name, file.getvalue()) for file in files])
+        jobs.ensure_worker(queue_conn, db.DB_PATH)
+        st.session_state.ingest_jobs.append(job_id)
+        st.session_state.ingest_active.add(job_id)
+
+def show_job_status(status):
+    if not status.finished:
+        st.progress(status.processed / max(status.total, 1),
+                    text=f"⏳ Processing resumes ({status.processed}/{status.total})")
+        return
+    
+    st.success(f"✅ Uploaded {status.counts.get(jobs.DONE, 0)} resumes successfully!")
+    if status.counts.get(jobs.DUPLICATE):
+        st.info(f"⏭️ Skipped {status.counts[jobs.DUPLICATE]} duplicate resumes already in the database")
+    if status.errors:
+        with st.expander(f"⚠️ {len(status.errors)} files failed to upload"):
+            for name, error in status.errors:
+                st.text(f"{name}: {error}")
+
+@st.fragment(run_every=2 if st.session_state.ingest_active else None)
+def ingest_job_panel():
+    """Status of this session's uploads; polls only while one is running"""
+    queue_conn = get_queue_connection()
+    statuses = [jobs.job_status(queue_conn, job_id) for job_id in st.session_state.ingest_jobs]
+    statuses = [status for status in statuses if status is not None]
+    if not statuses:
+        return
+    
+    if any(not status.finished for status in statuses):
+        # restarts the worker if it died; its leased files are retried
+        jobs.ensure_worker(queue_conn, db.DB_PATH)
+    
+    for status in statuses:
+        show_job_status(status)
+    
+    if all(status.finished for status in statuses):
+        if st.button("Dismiss", key="dismiss_jobs"):
+            st.session_state.ingest_jobs = []
+            st.rerun()
+    
+    finished = {status.id for status in statuses if status.finished} & st.session_state.ingest_active
+    if finished:
+        st.session_state.ingest_active -= finished
+        # new candidates: refresh the list outside this fragment
         st.rerun()
 
+ingest_job_panel()
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def load_stale_count(version):
+    return reparse.stale_count(conn)
+
+stale = load_stale_count(store.snapshot().version)
+if stale:
+    # fields derived by an older parser; the worker re-parses them from
+    # the stored text whenever its upload queue is idle
+    st.caption(f"🔄 {stale} candidates were parsed by an older parser version and are being refreshed")
+    queue_conn = get_queue_connection()
+    jobs.ensure_worker(queue_conn, db.DB_PATH)
+
 st.divider()
 
 # ================= LOAD DATA =================
 
+@st.cache_resource
+def get_ranking_engine():
+    """Process-wide BM25 engine, kept in sync with the table incrementally"""
+    return RankingEngine()
+
+@st.cache_resource
+def get_blob_store():
+    """Original uploaded files, shared by every session"""
+    return BlobStore.for_connection(conn)
+
+@st.cache_resource
+def get_export_cache():
+    """Export files shared by every session"""
+    return export.ExportCache.for_database(db.DB_PATH)
+
+def rank_candidates(version, filters, jd_text, min_match, top_k=None):
+    """Filtered candidates ranked against the JD: match %, then BM25.
+
+    The JD's sorted ranking is built once per data version and shared;
+    filter and min_match changes only select from it.
+    """
+    engine = get_ranking_engine()
+    engine.sync(conn, version)
+    ids = store.filter_ids(store.snapshot(), **filters) if filters_active(filters) else None
+    return engine.rank(jd_text, ids, min_match, top_k)
+
+def to_frame(rows, ranking=None):
+    frame = pd.DataFrame(rows, columns=db.LIST_COLUMNS)
+    if ranking is None:
+        frame['match_percentage'] = 0
+    else:
+        scores = dict(zip(ranking.ids, ranking.match_percentage.tolist()))
+        frame['match_percentage'] = [scores.get(i, 0) for i in frame['id']]
+    return frame
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def load_candidate_page(version, filters, jd_text, min_match, page_size, page):
+    """One page of list columns (no resume bodies) and the total match count"""
+    snapshot = store.snapshot()
+    if jd_text:
+        # the JD's ranking is already sorted: this only slices it
+        ranking = rank_candidates(version, filters, jd_text, min_match, top_k=page * page_size)
+        page_ids = ranking.ids[(page - 1) * page_size:]
+        return to_frame(snapshot.rows(page_ids), ranking), ranking.total
+    
+    if min_match > 0:
+        # without a JD every candidate scores 0
+        return to_frame([]), 0
+    
+    offset = (page - 1) * page_size
+    ids = store.filter_ids(snapshot, **filters)
+    return to_frame(snapshot.rows(ids[offset:offset + page_size])), len(ids)
+
+def export_rows(version, filters, jd_text, min_match):
+    """Export rows for every filtered candidate, in display order, from the shared snapshot"""
+    snapshot = store.snapshot()
+    if jd_text:
+        ranking = rank_candidates(version, filters, jd_text, min_match)
+        scores = dict(zip(ranking.ids, ranking.match_percentage.tolist()))
+        rows = snapshot.rows(ranking.ids)
+    elif min_match > 0:
+        return
+    else:
+        scores = {}
+        rows = snapshot.rows(store.filter_ids(snapshot, **filters))
+    for candidate_id, name, email, phone, skills, experience in rows:
+        yield name, email, phone, experience, skills, scores.get(candidate_id, 0)
+
+def load_match_percentage(version, jd_text, candidate_id):
+    """The candidate's match % from the JD's shared ranking"""
+    engine = get_ranking_engine()
+    engine.sync(conn, version)
+    ranking = engine.rank(jd_text, [candidate_id])
+    return int(ranking.match_percentage[0]) if ranking.ids else 0
+
+filters = {"name": name_filter, "email": email_filter, "skills": tuple(skill_filter), "body": body_filter}
+page = st.session_state.get("page", 1)
+
 try:
-    df = pd.read_sql("SELECT * FROM candidates", conn)
+    # one version check per server process, not per session and click
+    version = store.snapshot().version
+    df, total_candidates = load_candidate_page(
+        version, filters, st.session_state.jd_text, min_match, page_size, page
+    )
+    
+    page_count = max(1, -(-total_candidates // page_size))
+    if page > page_count:
+        st.session_state.page = page = page_count
+        df, total_candidates = load_candidate_page(
+            version, filters, st.session_state.jd_text, min_match, page_size, page
+        )
 except Exception as e:
     st.error(f"Error loading data: {str(e)}")
-    df = pd.DataFrame()
-
-# Calculate match percentage if JD is provided
-if not df.empty and st.session_state.jd_text:
-    df['match_percentage'] = df.apply(
-        lambda row: calculate_match_percentage(
-            row['content'], 
-            row['skills'], 
-            st.session_state.jd_text
-        ), 
-        axis=1
-    )
-    # Sort by match percentage
-    df = df.sort_values('match_percentage', ascending=False)
-else:
-    df['match_percentage'] = 0
+    df = to_frame([])
+    total_candidates = 0
+    page_count = 1
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def load_skill_facets(version, filters, jd_text, min_match):
+    """Candidates per skill across the filtered set"""
+    if jd_text and min_match > 0:
+        # the JD's cut is an id list: counting it over the snapshot beats
+        # matching the ids inside a GROUP BY
+        facets = store.snapshot().skill_counts(rank_candidates(version, filters, jd_text, min_match).ids, 25)
+    elif min_match > 0:
+        facets = []
+    else:
+        facets = db.skill_facets(conn, limit=25, **filters)
+    return pd.DataFrame(facets, columns=["Skill", "Candidates"])
+
+if total_candidates:
+    with st.sidebar.expander("📊 Skills in Results"):
+        st.dataframe(
+            load_skill_facets(version, filters, st.session_state.jd_text, min_match),
+            hide_index=True,
+            use_container_width=True
+        )
 
-# APPLY FILTERS
+# ================= SAVED REQS =================
 
-if not df.empty:
-    if name_filter:
-        df = df[df["name"].str.contains(name_filter, case=False, na=False)]
+# saved JDs are scored against every candidate together (one candidates x
+# JDs matrix), so switching between them needs no rescan
+st.sidebar.divider()
+st.sidebar.subheader("🗂️ Saved Reqs")
+
+req_title = st.sidebar.text_input("Req Title", placeholder="e.g. Senior Data Engineer")
+if st.sidebar.button("💾 Save JD as Req", disabled=not (req_title.strip() and jd_input.strip())):
+    with store.writing() as write_conn:
+        db.save_jd(write_conn, req_title.strip(), jd_input)
+    st.rerun()
+
+saved_jds = db.list_jds(conn)
+if saved_jds:
+    jd_titles = {jd_id: title for jd_id, title, *_ in saved_jds}
+    jd_texts = {jd_id: text for jd_id, _, text, *_ in saved_jds}
+    chosen_jd = st.sidebar.selectbox("Req", list(jd_titles), format_func=jd_titles.get)
     
-    if email_filter:
-        df = df[df["email"].str.contains(email_filter, case=False, na=False)]
+    col1, col2 = st.sidebar.columns(2)
+    with col1:
+        if st.button("Use as JD", use_container_width=True):
+            st.session_state.jd_text = jd_texts[chosen_jd]
+            st.rerun()
+    with col2:
+        if st.button("Delete Req", use_container_width=True):
+            with store.writing() as write_conn:
+                db.delete_jd(write_conn, chosen_jd)
+            st.rerun()
     
-    if skill_filter:
-        df = df[df["skills"].str.contains(skill_filter, case=False, na=False)]
+    match_mode = st.sidebar.radio(
+        "Req Matching", list(jd_batch.MODES), format_func=jd_batch.MODES.get, horizontal=True
+    )
+    if st.sidebar.button("⚡ Match All Reqs", use_container_width=True):
+        with st.spinner(f"Scoring every candidate against {len(saved_jds)} reqs..."):
+            stats = jd_batch.match_saved_jds(
+                conn, get_ranking_engine(), match_mode, version, writer=store.writing
+            )
+        st.session_state.jd_matrix_stats = stats.line()
+        st.rerun()
     
-    if min_match > 0:
-        df = df[df["match_percentage"] >= min_match]
+    if "jd_matrix_stats" in st.session_state:
+        st.sidebar.caption(f"⚡ {st.session_state.jd_matrix_stats}")
+    # stamped with content_version: re-parses and signatures do not make
+    # stored scores stale
+    content_version = db.content_version(conn)
+    if any(matched != content_version or mode != match_mode for _, _, _, matched, mode in saved_jds):
+        st.sidebar.caption("Some reqs have not been matched against the current candidates")
 
 # ================= EXPORT SECTION =================
 
 if not df.empty:
     st.markdown('<div class="export-section">', unsafe_allow_html=True)
     st.markdown("<h3 style='color:white; margin:0;'>📥 Export Filtered Candidates</h3>", unsafe_allow_html=True)
-    st.markdown(f"<p style='color:white; margin:10px 0;'>Total candidates to export: <strong>{len(df)}</strong></p>", unsafe_allow_html=True)
+    st.markdown(f"<p style='color:white; margin:10px 0;'>Total candidates to export: <strong>{total_candidates}</strong></p>", unsafe_allow_html=True)
     
-    col1, col2, col3 = st.columns([1, 1, 2])
+    # files are only built when asked for, then reused until the data,
+    # filters or JD change
+    cache = get_export_cache()
+    key = export.export_key(
+        version, filters, jd_key(st.session_state.jd_text) if st.session_state.jd_text else "", min_match
+    )
     
-    with col1:
-        # Excel Export
-        export_df = prepare_export_data(df)
-        excel_data = convert_df_to_excel(export_df)
-        
-        st.download_button(
-            label="📊 Download Excel",
-            data=excel_data,
-            file_name="filtered_candidates.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            use_container_width=True,
-            type="primary"
-        )
+    col1, col2, col3 = st.columns([1, 1, 2])
     
-    with col2:
-        # CSV Export
-        csv_data = export_df.to_csv(index=False).encode('utf-8')
-        
-        st.download_button(
-            label="📄 Download CSV",
-            data=csv_data,
-            file_name="filtered_candidates.csv",
-            mime="text/csv",
-            use_container_width=True,
-            type="primary"
-        )
+    for column, fmt, label in ((col1, "xlsx", "📊 Excel"), (col2, "csv", "📄 CSV")):
+        with column:
+            path = cache.get(key, fmt)
+            if path is None:
+                if st.button(f"Prepare {label}", key=f"prepare_{fmt}", use_container_width=True):
+                    try:
+                        with st.spinner(f"Writing {total_candidates} candidates..."), perf.timer(f"export.{fmt}"):
+                            cache.build(key, fmt, export_rows(
+                                version, filters, st.session_state.jd_text, min_match
+                            ))
+                        st.rerun()
+                    except export.ExportError as e:
+                        st.error(f"Export failed: {str(e)}")
+            else:
+                mime, file_name = export.FORMATS[fmt]
+                with open(path, "rb") as f:
+                    st.download_button(
+                        label=f"Download {label}",
+                        data=f,
+                        file_name=file_name,
+                        mime=mime,
+                        use_container_width=True,
+                        type="primary"
+                    )
     
     st.markdown('</div>', unsafe_allow_html=True)
     
     st.divider()
 
+# ================= OPEN REQS =================
+
+if saved_jds and any(matched is not None for _, _, _, matched, _ in saved_jds):
+    with st.expander("🗂️ Top Candidates per Req"):
+        col1, col2 = st.columns([2, 1])
+        with col1:
+            req = st.selectbox("Req", list(jd_titles), format_func=jd_titles.get, key="top_req")
+        with col2:
+            top_k = st.number_input("Top", min_value=1, max_value=jd_batch.STORED_TOP_K, value=20)
+        top = db.top_candidates_for_jd(conn, req, top_k)
+        if top:
+            st.dataframe(
+                pd.DataFrame([row[1:4] for row in top], columns=["Name", "Email", "Match"]),
+                column_config={"Match": st.column_config.ProgressColumn(
+                    "Match", min_value=0, max_value=100, format="%d%%"
+                )},
+                hide_index=True,
+                use_container_width=True
+            )
+        else:
+            st.caption("No matches stored for this req yet; use ⚡ Match All Reqs")
+    
+    st.divider()
+
+# ================= POSSIBLE DUPLICATES =================
+
+# groups shown at once; merging one brings up the next
+DUPLICATE_GROUPS_SHOWN = 10
+
+@st.cache_data(max_entries=2, show_spinner=False)
+def load_duplicate_clusters(version):
+    """Near-duplicate clusters from the LSH index, and how many rows have
+    no signature yet"""
+    return dedupe.find_clusters(conn), dedupe.unsigned_count(conn)
+
+if total_candidates and st.checkbox("🧬 Show Possible Duplicates"):
+    with st.spinner("Looking for near-duplicate resumes..."):
+        clusters, unsigned = load_duplicate_clusters(version)
+    if unsigned:
+        # rows stored before signatures existed; the worker signs them
+        # whenever its upload queue is idle
+        st.caption(f"🔄 {unsigned} candidates are still being signed and are left out until then")
+        jobs.ensure_worker(get_queue_connection(), db.DB_PATH)
+    snapshot = store.snapshot()
+    # members deleted since the clusters were built are left out
+    groups = []
+    for cluster in clusters:
+        members = [(snapshot.rows([i])[0], similarity)
+                   for i, similarity in zip(cluster.ids, cluster.similarity) if i in snapshot]
+        if len(members) > 1:
+            groups.append(members)
+    
+    if not groups:
+        st.success("No near-duplicate resumes found")
+    else:
+        st.caption(f"{len(groups)} groups of resumes that look like the same person "
+                   f"(≥{dedupe.THRESHOLD:.0%} similar text)")
+    
+    for members in groups[:DUPLICATE_GROUPS_SHOWN]:
+        group_key = members[0][0][0]
+        with st.container(border=True):
+            st.dataframe(
+                pd.DataFrame(
+                    [(row[1], row[2], row[3], similarity) for row, similarity in members],
+                    columns=["Name", "Email", "Phone", "Similarity"]
+                ),
+                column_config={"Similarity": st.column_config.ProgressColumn(
+                    "Similarity", min_value=0, max_value=1, format="%.2f"
+                )},
+                hide_index=True,
+                use_container_width=True
+            )
+            col1, col2 = st.columns([2, 1])
+            with col1:
+                keep = st.selectbox(
+                    "Keep", range(len(members)), key=f"keep_{group_key}",
+                    format_func=lambda n, members=members: f"{members[n][0][1]} ({members[n][0][2] or 'no email'})"
+                )
+            with col2:
+                st.write("")
+                if st.button("🔗 Merge", key=f"merge_{group_key}", use_container_width=True):
+                    keep_id = members[keep][0][0]
+                    merged_ids = [row[0] for row, _ in members if row[0] != keep_id]
+                    with store.writing() as write_conn:
+                        removed = dedupe.merge_candidates(write_conn, keep_id, merged_ids)
+                    blobs = get_blob_store()
+                    if blobs:
+                        blobs.delete_unused(conn, removed)
+                    if st.session_state.selected_id in merged_ids:
+                        st.session_state.selected_id = keep_id
+                    st.rerun()
+    
+    st.divider()
+
 # ================= DISPLAY =================
 
 left, right = st.columns([1.3, 2])
 
 # ===== LEFT TABLE =====
 
-with left:
-    st.subheader(f"👥 Candidates ({len(df)})")
+def candidate_fit_icon(match):
+    if match >= 70:
+        return "✅"
+    if match >= 50:
+        return "⚠️"
+    return "❌"
+
+with left, perf.timer("render.list"):
+    st.subheader(f"👥 Candidates ({total_candidates})")
     
     if st.session_state.jd_text:
         st.caption("🎯 Sorted by JD Match")
@@ -498,53 +649,68 @@ with left:
     if df.empty:
         st.info("No candidates found. Upload resumes to get started!")
     else:
-        for i, row in df.iterrows():
-            col1, col2, col3 = st.columns([4, 1, 0.7])
-            
-            with col1:
-                button_label = f"{row['name']}"
-                if row['email']:
-                    button_label += f" | {row['email'][:20]}"
-                
-                if st.button(button_label, key=row["id"], use_container_width=True):
-                    st.session_state.selected_id = row["id"]
-                    st.session_state.show_full_resume = False
-            
-            with col2:
-                # Show match percentage badge
-                if st.session_state.jd_text:
-                    match = row['match_percentage']
-                    if match >= 70:
-                        st.success(f"✅ {match}%")
-                    elif match >= 50:
-                        st.warning(f"⚠️ {match}%")
-                    else:
-                        st.error(f"❌ {match}%")
-                else:
-                    st.text("")
-            
-            with col3:
-                if delete_mode:
-                    if st.button("🗑️", key="del" + row["id"]):
-                        try:
-                            c.execute("DELETE FROM candidates WHERE id=?", (row["id"],))
-                            conn.commit()
-                            
-                            if st.session_state.selected_id == row["id"]:
-                                st.session_state.selected_id = None
-                            
-                            st.rerun()
-                        except Exception as e:
-                            st.error(f"Error deleting: {str(e)}")
+        # one table element for the whole page instead of a row of buttons
+        # per candidate; the browser virtualizes its scrolling
+        table = df[['name', 'email']].copy()
+        column_config = {
+            "name": st.column_config.TextColumn("Name"),
+            "email": st.column_config.TextColumn("Email"),
+        }
+        if st.session_state.jd_text:
+            table['fit'] = [candidate_fit_icon(match) for match in df['match_percentage']]
+            table['match_percentage'] = df['match_percentage']
+            column_config["fit"] = st.column_config.TextColumn("", width="small")
+            column_config["match_percentage"] = st.column_config.ProgressColumn(
+                "Match", min_value=0, max_value=100, format="%d%%"
+            )
+        
+        event = st.dataframe(
+            table,
+            column_config=column_config,
+            hide_index=True,
+            use_container_width=True,
+            height=min(35 * (len(table) + 1) + 3, 700),
+            on_select="rerun",
+            selection_mode="multi-row" if delete_mode else "single-row",
+            # a new page or result set starts with a fresh selection
+            key=f"candidates_{hash(tuple(df['id']))}"
+        )
+        selected_rows = event.selection.rows
+        
+        if delete_mode:
+            if selected_rows and st.button(f"🗑️ Delete {len(selected_rows)} selected", type="primary"):
+                delete_ids = [df['id'].iloc[n] for n in selected_rows]
+                try:
+                    # every session sees the deletion on its next rerun
+                    store.delete(delete_ids, get_blob_store())
+                    
+                    if st.session_state.selected_id in delete_ids:
+                        st.session_state.selected_id = None
+                    
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"Error deleting: {str(e)}")
+        elif selected_rows:
+            selected_id = df['id'].iloc[selected_rows[0]]
+            if selected_id != st.session_state.selected_id:
+                st.session_state.selected_id = selected_id
+                st.session_state.show_full_resume = False
+        
+        if page_count > 1:
+            st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, key="page")
 
 # ===== RIGHT PANEL =====
 
-with right:
+with right, perf.timer("render.detail"):
     if st.session_state.selected_id:
-        selected = df[df["id"] == st.session_state.selected_id]
+        # only the selected candidate's resume body is ever loaded
+        data = db.get_candidate(conn, st.session_state.selected_id)
         
-        if not selected.empty:
-            data = selected.iloc[0]
+        if data:
+            if st.session_state.jd_text:
+                data["match_percentage"] = load_match_percentage(
+                    version, st.session_state.jd_text, data["id"]
+                )
             
             # Candidate Details Card
             st.markdown('<div class="candidate-info">', unsafe_allow_html=True)
@@ -585,6 +751,12 @@ with right:
             skills_html = "".join([f'<span class="skill-badge">{skill}</span>' for skill in skills_list])
             st.markdown(skills_html, unsafe_allow_html=True)
             
+            best_reqs = db.best_jds_for(conn, data["id"], jd_batch.BEST_JDS) if saved_jds else []
+            if best_reqs:
+                st.write("")
+                st.markdown("**🗂️ Best-Matching Reqs:**")
+                st.markdown(" · ".join(f"{title} ({match}%)" for _, title, match in best_reqs))
+            
             st.divider()
             
             # Resume Preview Section
@@ -610,13 +782,26 @@ with right:
                     st.markdown(formatted_text, unsafe_allow_html=True)
                     st.markdown('</div>', unsafe_allow_html=True)
                     
-                    # Download button
+                    # Download buttons
                     st.download_button(
                         label="💾 Download Resume Text",
                         data=data["content"],
                         file_name=f"{data['name']}_resume.txt",
                         mime="text/plain"
                     )
+                    
+                    # only the first bytes are read per rerun, for the file
+                    # type; the original itself is read when the button is clicked
+                    blobs = get_blob_store()
+                    header = blobs.read(data["content_hash"], 8) if blobs and data["content_hash"] else None
+                    if header is not None:
+                        extension, mime = file_type(header)
+                        st.download_button(
+                            label="📎 Download Original File",
+                            data=lambda digest=data["content_hash"]: blobs.read(digest),
+                            file_name=f"{data['name']}_resume{extension}",
+                            mime=mime
+                        )
         else:
             st.info("Selected candidate not found.")
     else:
@@ -628,3 +813,38 @@ with right:
             st.markdown('<div class="resume-container">', unsafe_allow_html=True)
             st.markdown(f'<div class="resume-text">{st.session_state.jd_text}</div>', unsafe_allow_html=True)
             st.markdown('</div>', unsafe_allow_html=True)
+
+# ================= PERFORMANCE PANEL =================
+
+if perf.enabled():
+    perf.REGISTRY.record("render.script", time.perf_counter() - script_started)
+    
+    with st.sidebar.expander("⏱️ Performance"):
+        summary = perf.REGISTRY.summary()
+        if summary:
+            st.dataframe(
+                pd.DataFrame(
+                    [(stage, count, total, mean * 1000, p50 * 1000, p95 * 1000, worst * 1000)
+                     for stage, count, total, mean, p50, p95, worst in summary],
+                    columns=["Stage", "Calls", "Total s", "Mean ms", "p50 ms", "p95 ms", "Max ms"]
+                ),
+                hide_index=True,
+                use_container_width=True
+            )
+        else:
+            st.caption("No timings recorded yet")
+        
+        dump_format = st.radio("Dump format", list(perf.DUMP_FORMATS), horizontal=True,
+                               format_func=lambda fmt: f"{fmt} ({perf.DUMP_FORMATS[fmt]})")
+        st.caption(f"Dumps are written to a new file in {perf.DUMP_DIR}/")
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("💾 Write", use_container_width=True):
+                try:
+                    st.success(f"Wrote {perf.REGISTRY.dump(dump_format)}")
+                except OSError as e:
+                    st.error(f"Could not write to {perf.DUMP_DIR}: {str(e)}")
+        with col2:
+            if st.button("Reset", use_container_width=True):
+                perf.REGISTRY.reset()
+                st.rerun()
@@ -0,0 +1,76 @@
+"""Candidate insert throughput: per-row commits versus batched writes.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_db_writes --rows 5000 --batch-sizes 100 500 2000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+import uuid
+
+import db
+from benchmarks.corpus import resume_lines
+
+
+def make_rows(count, seed):
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        text = "\n".join(resume_lines(rng, 6))
+        name, email, phone = text.split("\n")[:3]
+        uid = str(uuid.uuid4())
+        rows.append((uid, name, email, phone, "python, sql", "5 years", text, uid, None, None, None))
+    return rows
+
+
+def per_row_commit(path, rows):
+    """The original app path: default journal, one commit per INSERT"""
+    conn = sqlite3.connect(path)
+    c = conn.cursor()
+    db._create_candidates(conn)
+    for row in rows:
+        c.execute("INSERT INTO candidates VALUES (?,?,?,?,?,?,?)", row[:7])
+        conn.commit()
+    conn.close()
+
+
+def batched(path, rows, batch_size):
+    conn = db.connect(path)
+    with db.CandidateWriter(conn, batch_size) as writer:
+        for row in rows:
+            writer.add(row)
+    conn.close()
+
+
+def timed(fn, *args):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        start = time.perf_counter()
+        fn(path, *args)
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[100, 500, 2000])
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows, args.seed)
+    print(f"{'path':>22} {'seconds':>9} {'rows/sec':>10}")
+
+    elapsed = timed(per_row_commit, rows)
+    print(f"{'per-row commit':>22} {elapsed:>9.2f} {len(rows) / elapsed:>10.0f}")
+
+    for batch_size in args.batch_sizes:
+        elapsed = timed(batched, rows, batch_size)
+        print(f"{f'WAL batch={batch_size}':>22} {elapsed:>9.2f} {len(rows) / elapsed:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
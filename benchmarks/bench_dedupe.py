@@ -0,0 +1,74 @@
+"""Near-duplicate clustering: MinHash + LSH build time versus comparing every pair.
+
+Signs a synthetic corpus in which ``--duplicates`` of the resumes are
+re-uploaded with a few words edited, then times the LSH cluster build
+and reports how many of the planted duplicates it found. Comparing
+every pair of signatures is timed on a sample and scaled up by the
+number of pairs. Run from the repository root:
+
+    python -m benchmarks.bench_dedupe --sizes 10000 100000
+"""
+import argparse
+import random
+import time
+
+import dedupe
+from benchmarks.corpus import resume_texts
+
+
+def edited(text, rng, edits):
+    """``text`` with ``edits`` words replaced, as a re-saved resume might be"""
+    words = text.split(" ")
+    for _ in range(edits):
+        words[rng.randrange(len(words))] = rng.choice(["updated", "lead", "senior", "2024"])
+    return " ".join(words)
+
+
+def all_pairs_seconds(signatures, sample):
+    """Time to compare every pair of ``sample`` signatures, scaled to all of them"""
+    rows = signatures[:sample]
+    start = time.perf_counter()
+    for n in range(len(rows) - 1):
+        dedupe.similarity(rows[n], rows[n + 1:]) >= dedupe.THRESHOLD
+    elapsed = time.perf_counter() - start
+    pairs = len(signatures) * (len(signatures) - 1) / 2
+    return elapsed * pairs / (len(rows) * (len(rows) - 1) / 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--duplicates", type=float, default=0.05)
+    parser.add_argument("--edits", type=int, default=5)
+    parser.add_argument("--sample", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'resumes':>8} {'sign us/doc':>12} {'LSH build s':>12} {'all pairs s':>12} "
+          f"{'clusters':>9} {'planted found':>14}")
+    for size in args.sizes:
+        rng = random.Random(args.seed)
+        planted = int(size * args.duplicates)
+        texts = resume_texts(size - planted, seed=args.seed)
+        originals = rng.sample(range(len(texts)), planted)
+        texts += [edited(texts[n], rng, args.edits) for n in originals]
+
+        start = time.perf_counter()
+        signatures = dedupe.signature_matrix([dedupe.signature(text) for text in texts])
+        sign_us = (time.perf_counter() - start) / size * 1e6
+
+        ids = list(range(size))
+        start = time.perf_counter()
+        clusters = dedupe.build_clusters(ids, signatures)
+        build_s = time.perf_counter() - start
+
+        cluster_of = {i: n for n, cluster in enumerate(clusters) for i in cluster.ids}
+        found = sum(1 for copy, original in enumerate(originals, start=len(texts) - planted)
+                    if copy in cluster_of and cluster_of.get(original) == cluster_of[copy])
+        pairs_s = all_pairs_seconds(signatures, min(args.sample, size))
+        print(f"{size:>8} {sign_us:>12.1f} {build_s:>12.2f} {pairs_s:>12.1f} "
+              f"{len(clusters):>9} {f'{found}/{planted}':>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Peak RSS per file: original extract_text versus streaming extraction.
+
+Each extraction runs in a fresh process so its peak resident set size is
+its own. Both streaming rows use the pdfplumber backend, so the raw PDF
+fast path does not stand in for it. Run from the repository root:
+
+    python -m benchmarks.bench_extraction_memory --pages 50 200 500
+"""
+import argparse
+import io
+import multiprocessing
+import resource
+import time
+
+import pdfplumber
+
+from benchmarks.corpus import make_pdf
+from extraction import DEFAULT_LIMITS, PDFPLUMBER, ExtractionLimits, extract
+
+
+def legacy_extract(data):
+    """The original implementation: every page kept open, string grown per page"""
+    text = ""
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        for p in pdf.pages:
+            page_text = p.extract_text()
+            if page_text:
+                text += page_text + "\n"
+    return text.strip()
+
+
+def _run(variant, data, queue):
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    if variant == "original":
+        text = legacy_extract(data)
+    else:
+        limits = ExtractionLimits(max_pages=10**6, max_chars=10**9) if variant == "streaming" else DEFAULT_LIMITS
+        text, _ = extract(io.BytesIO(data), limits, backends=[PDFPLUMBER])
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux
+    queue.put((elapsed, before / 1024, peak / 1024, len(text)))
+
+
+def measure(variant, data):
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_run, args=(variant, data, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[50, 200, 500])
+    args = parser.parse_args()
+
+    print(f"{'pages':>6} {'variant':<18} {'seconds':>8} {'base MB':>8} {'peak MB':>8} {'chars':>9}")
+    for pages in args.pages:
+        lines = [f"Portfolio entry {i}: designed and shipped data pipelines, dashboards "
+                 f"and services for project {i % 97}" for i in range(pages * 48)]
+        data = make_pdf(lines)
+        variants = ["original", "streaming", f"capped ({DEFAULT_LIMITS.max_pages} pages)"]
+        for variant in variants:
+            elapsed, base, peak, chars = measure(variant.split()[0], data)
+            print(f"{pages:>6} {variant:<18} {elapsed:>8.2f} {base:>8.1f} {peak:>8.1f} {chars:>9}")
+
+
+if __name__ == "__main__":
+    main()
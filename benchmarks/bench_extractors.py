@@ -0,0 +1,92 @@
+"""Per-page extraction latency for each backend, and the fast path's fallback rate.
+
+Runs every PDF through the raw content-stream reader and through
+pdfplumber, and reports how often the chain would have fallen back.
+Without ``--dir`` a synthetic corpus (half of it Flate-compressed) is
+used. Run from the repository root:
+
+    python -m benchmarks.bench_extractors --files 200
+    python -m benchmarks.bench_extractors --dir fixtures/resumes
+"""
+import argparse
+import os
+import random
+import time
+from contextlib import closing
+from io import BytesIO
+
+from benchmarks.corpus import make_pdf, resume_lines
+from extraction import DEFAULT_LIMITS, PDF_RAW, PDFPLUMBER, extract
+
+
+def synthetic_pdfs(count, seed):
+    rng = random.Random(seed)
+    return [(f"resume_{i:06d}.pdf", make_pdf(resume_lines(rng, rng.randint(4, 40)), compress=i % 2 == 1))
+            for i in range(count)]
+
+
+def directory_pdfs(path):
+    files = []
+    for root, _, names in os.walk(path):
+        for name in sorted(names):
+            if name.lower().endswith(".pdf"):
+                with open(os.path.join(root, name), "rb") as f:
+                    files.append((name, f.read()))
+    return files
+
+
+def run_backend(backend, name, data):
+    """``(seconds, parts)`` for one file; a failure counts as no parts"""
+    buffer = BytesIO(data)
+    buffer.name = name
+    start = time.perf_counter()
+    try:
+        with closing(backend.parts(buffer, DEFAULT_LIMITS)) as parts:
+            count = sum(1 for _ in parts)
+    except Exception:
+        count = 0
+    return time.perf_counter() - start, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--dir", help="directory of real PDFs to use instead of the synthetic corpus")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    files = directory_pdfs(args.dir) if args.dir else synthetic_pdfs(args.files, args.seed)
+    print(f"corpus: {len(files)} PDFs, {sum(len(data) for _, data in files) / 1e6:.1f} MB")
+
+    print(f"{'backend':<12} {'seconds':>9} {'pages':>7} {'ms/page':>8} {'files/sec':>10}")
+    for backend in (PDF_RAW, PDFPLUMBER):
+        total = 0.0
+        pages = 0
+        for name, data in files:
+            elapsed, count = run_backend(backend, name, data)
+            total += elapsed
+            pages += count
+        print(f"{backend.name:<12} {total:>9.2f} {pages:>7} {total * 1000 / max(pages, 1):>8.2f} "
+              f"{len(files) / total:>10.1f}")
+
+    chosen = {}
+    start = time.perf_counter()
+    for name, data in files:
+        buffer = BytesIO(data)
+        buffer.name = name
+        try:
+            _, backend = extract(buffer)
+        except Exception:
+            backend = "error"
+        chosen[backend] = chosen.get(backend, 0) + 1
+    elapsed = time.perf_counter() - start
+
+    fallbacks = len(files) - chosen.get(PDF_RAW.name, 0)
+    print(f"chain: {elapsed:.2f}s, {len(files) / elapsed:.1f} files/sec, "
+          f"fallback rate {fallbacks / max(len(files), 1):.1%}")
+    for backend, count in sorted(chosen.items()):
+        print(f"  {backend:<12} {count:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Sidebar filter latency: pandas str.contains versus the FTS5 index.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_filters --sizes 10000 100000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import pandas as pd
+
+import db
+from benchmarks.corpus import populate
+
+QUERIES = [
+    {"name": "sharma"},
+    {"email": "priya"},
+    {"skills": ("kafka",)},
+    {"name": "rao", "skills": ("python",)},
+    {"body": "pipelines kubernetes"},
+]
+
+
+# the original table's columns, with the text decompressed as it is now stored
+FULL_TABLE = "SELECT id, name, email, phone, skills, experience, unz(content_z) AS content FROM candidates"
+
+
+def pandas_filter(df, filters):
+    """The original app path"""
+    columns = {"name": "name", "email": "email", "skills": "skills", "body": "content"}
+    for key, value in filters.items():
+        for term in (value if key == "skills" else [value]):
+            df = df[df[columns[key]].str.contains(term, case=False, na=False)]
+    return df
+
+
+def filter_label(filters):
+    return ", ".join(f"{k}={'+'.join(v) if k == 'skills' else v}" for k, v in filters.items())
+
+
+def best_of(fn, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'rows':>7} {'filter':<36} {'pandas ms':>10} {'fts ms':>8} {'hits':>6}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            conn = db.connect(os.path.join(tmp, "bench.db"))
+            populate(conn, size, random.Random(args.seed), paragraphs=(3, 3))
+            # the original app loads the whole table on every rerun
+            load_ms, df = best_of(lambda: pd.read_sql(FULL_TABLE, conn), 1)
+            print(f"{size:>7} {'(pandas read_sql of full table)':<36} {load_ms:>10.1f}")
+            for filters in QUERIES:
+                pandas_ms, hits = best_of(lambda: pandas_filter(df, filters))
+                fts_ms, ids = best_of(lambda: db.filter_candidate_ids(conn, **filters))
+                label = filter_label(filters)
+                print(f"{size:>7} {label:<36} {pandas_ms:>10.1f} {fts_ms:>8.1f} {len(ids):>6}")
+            conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""Ingestion throughput (files/sec) versus worker count.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_ingest --files 200 --workers 1 2 4
+"""
+import argparse
+import time
+
+from benchmarks.corpus import generate_corpus
+from ingest import ingest_files
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    corpus = generate_corpus(args.files, seed=args.seed)
+    megabytes = sum(len(data) for _, data in corpus) / 1e6
+    print(f"corpus: {len(corpus)} files, {megabytes:.1f} MB")
+    print(f"{'workers':>8} {'seconds':>9} {'files/sec':>10} {'errors':>7}")
+
+    for workers in args.workers:
+        start = time.perf_counter()
+        errors = sum(1 for r in ingest_files(corpus, workers=workers) if not r.ok)
+        elapsed = time.perf_counter() - start
+        print(f"{workers:>8} {elapsed:>9.2f} {len(corpus) / elapsed:>10.1f} {errors:>7}")
+
+
+if __name__ == "__main__":
+    main()
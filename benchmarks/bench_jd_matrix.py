@@ -0,0 +1,74 @@
+"""Batch JD matching: the candidates x JDs score matrix versus scoring one JD at a time.
+
+For each corpus size and number of saved JDs, times building the whole
+score matrix in one pass (whole-word and legacy substring modes) and
+scoring the same JDs one by one with the engine, as switching between
+them used to. The substring mode is checked against
+``calculate_match_percentage`` on a sample of candidates. Run from the
+repository root:
+
+    python -m benchmarks.bench_jd_matrix --sizes 10000 50000 --jds 1 10 50
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import db
+from benchmarks.corpus import FILLER, SKILLS, populate
+from matching import calculate_match_percentage
+from ranking import RankingEngine
+
+
+def make_jds(count, seed):
+    """Synthetic open reqs: a few skills and some filler each"""
+    rng = random.Random(seed)
+    return [" ".join(rng.sample(SKILLS, rng.randint(4, 10)) + rng.sample(FILLER, 8)) for _ in range(count)]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def mismatches(conn, ids, match, jds, sample, rng):
+    """Sampled cells where the substring matrix differs from calculate_match_percentage"""
+    rows = dict((candidate_id, row) for row, candidate_id in enumerate(ids))
+    texts = {candidate_id: content for candidate_id, _, content in db.iter_candidate_texts(conn)}
+    picked = rng.sample(ids, min(sample, len(ids)))
+    return sum(calculate_match_percentage(texts[i], "", jd) != match[rows[i], j]
+               for i in picked for j, jd in enumerate(jds))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000])
+    parser.add_argument("--jds", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--sample", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'rows':>7} {'JDs':>4} {'one by one ms':>14} {'matrix ms':>10} {'substring ms':>13} "
+          f"{'ms/JD':>7} {'mismatches':>11}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            conn = db.connect(os.path.join(tmp, "bench.db"))
+            populate(conn, size, random.Random(args.seed))
+            engine = RankingEngine()
+            engine.sync(conn)
+            engine.score("warm up")  # first call sorts postings by term
+            for count in args.jds:
+                jds = make_jds(count, args.seed)
+                single_ms, _ = timed(lambda: [engine.score(jd) for jd in jds])
+                matrix_ms, _ = timed(lambda: engine.score_matrix(jds))
+                substring_ms, (ids, match, _) = timed(lambda: engine.score_matrix(jds, substring=True))
+                wrong = mismatches(conn, ids, match, jds, args.sample, random.Random(args.seed))
+                print(f"{size:>7} {count:>4} {single_ms:>14.1f} {matrix_ms:>10.1f} {substring_ms:>13.1f} "
+                      f"{matrix_ms / count:>7.1f} {wrong:>11}")
+            conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""JD scoring latency: substring scan, term-index SQL and the BM25 engine.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_matching --sizes 1000 10000 50000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import db
+from benchmarks.corpus import populate
+from matching import calculate_match_percentage
+from ranking import RankedIndex, RankingEngine
+
+JD = """Senior Data Engineer. We are looking for an engineer with strong Python,
+SQL and Spark experience who has built streaming pipelines on Kafka and
+Airflow, deployed services with Docker and Kubernetes on AWS or Azure,
+and is comfortable with Snowflake, dbt and CI/CD in a Linux environment."""
+
+
+def legacy_scores(conn, jd_text):
+    """The original app path: substring checks over every resume"""
+    return {
+        candidate_id: calculate_match_percentage(content, skills, jd_text)
+        for candidate_id, skills, content in db.iter_candidate_texts(conn)
+    }
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'rows':>7} {'legacy ms':>10} {'index ms':>9} {'sync ms':>8} "
+          f"{'engine ms':>10} {'top50 ms':>9} {'changed':>8}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            conn = db.connect(os.path.join(tmp, "bench.db"))
+            populate(conn, size, random.Random(args.seed), paragraphs=(3, 3))
+            legacy_ms, legacy = timed(legacy_scores, conn, JD)
+            index_ms, indexed = timed(db.match_scores, conn, JD)
+            engine = RankingEngine()
+            sync_ms, _ = timed(engine.sync, conn)
+            engine.rank(JD)  # first call sorts postings by term
+            # scoring and sorting everyone, as on a new JD; repeat ranks reuse it
+            ids = db.filter_candidate_ids(conn)
+            engine_ms, _ = timed(lambda: RankedIndex(*engine.score_ids(JD, ids)))
+            top_ms, _ = timed(lambda: engine.rank(JD, top_k=50))
+            # scores differ where a keyword only occurred inside a longer word
+            # ("java" in "javascript", "engineer" in "engineers")
+            changed = sum(1 for i, score in legacy.items() if indexed.get(i, 0) != score)
+            print(f"{size:>7} {legacy_ms:>10.1f} {index_ms:>9.1f} {sync_ms:>8.1f} "
+                  f"{engine_ms:>10.1f} {top_ms:>9.1f} {changed:>8}")
+            conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""parse_resume throughput (resumes/sec): three findall passes versus a first-match search per field.
+
+Also checks that both return the same fields, on the generated resumes
+and on EDGE_CASES. Run from the repository root:
+
+    python -m benchmarks.bench_parse --paragraphs 8 60 200
+"""
+import argparse
+import random
+import re
+import time
+
+from benchmarks.corpus import resume_lines
+from parsing import parse_resume
+from skills import default_matcher
+
+
+# fields that touch or run into other text
+EDGE_CASES = [
+    "Ada Lovelace\n5551234567@mail.com",
+    "Ada Lovelace\nover10 years of experience",
+    "Ada Lovelace\nX5551234567",
+    "Ada Lovelace\ntel:555-123-4567, ada@example.com, 7+ yrs",
+    "Ada Lovelace\nref 12345551234567 and 3years",
+]
+
+
+def legacy_parse(text):
+    """The previous parse_resume: a findall per field and two lowercase copies"""
+    lines = [line.strip() for line in text.split("\n") if line.strip()]
+    name = lines[0][:60] if lines else "Unknown"
+    email_match = re.findall(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b', text)
+    email = email_match[0] if email_match else ""
+    phone_match = re.findall(r'(?:\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}', text)
+    phone = phone_match[0] if phone_match else ""
+    exp_match = re.findall(r'(\d+\+?\s*(?:years?|yrs?))', text.lower())
+    experience = exp_match[0] if exp_match else ""
+    found_skills = default_matcher().find(text.lower())
+    skills = ", ".join(found_skills) if found_skills else "Not specified"
+    return name, email, phone, skills, experience
+
+
+def long_resume(rng, paragraphs):
+    lines = resume_lines(rng, paragraphs)
+    # details further down, as in real resumes
+    lines[len(lines) // 2:len(lines) // 2] = [
+        "Education: Bachelor of Science, Master's in Data Science",
+        "linkedin.com/in/example-person  Austin, TX",
+        "Data Engineer, Jan 2019 - present; Analyst 2015 - 2018",
+    ]
+    return "\n".join(lines)
+
+
+def throughput(fn, texts, seconds=1.0):
+    done = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        fn(texts[done % len(texts)])
+        done += 1
+    return done / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paragraphs", type=int, nargs="+", default=[8, 60, 200])
+    parser.add_argument("--resumes", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'paragraphs':>10} {'KB':>6} {'legacy/s':>9} {'search/s':>9} {'mismatch':>9}")
+    for paragraphs in args.paragraphs:
+        texts = [long_resume(rng, paragraphs) for _ in range(args.resumes)]
+        kilobytes = sum(map(len, texts)) / len(texts) / 1000
+        mismatches = sum(1 for text in texts + EDGE_CASES if legacy_parse(text) != parse_resume(text))
+        legacy = throughput(legacy_parse, texts)
+        search = throughput(parse_resume, texts)
+        print(f"{paragraphs:>10} {kilobytes:>6.1f} {legacy:>9.0f} {search:>9.0f} {mismatches:>9}")
+
+
+if __name__ == "__main__":
+    main()
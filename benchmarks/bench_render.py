@@ -0,0 +1,86 @@
+"""Script rerun time of the candidate list: one button row per candidate versus one table.
+
+Each variant is run headlessly with Streamlit's AppTest, rendering
+``--rows`` candidates, so the numbers are the script-side cost of a
+rerun (the websocket payload grows the same way). Run from the
+repository root:
+
+    python -m benchmarks.bench_render --rows 1000 10000
+"""
+import argparse
+import random
+import time
+
+from benchmarks.corpus import resume_lines
+
+
+def button_rows(rows):
+    """The original left panel: columns and buttons for every candidate"""
+    import streamlit as st
+
+    for row in rows:
+        col1, col2, col3 = st.columns([4, 1, 0.7])
+        with col1:
+            st.button(f"{row['name']} | {row['email'][:20]}", key=row["id"], use_container_width=True)
+        with col2:
+            st.success(f"✅ {row['match_percentage']}%")
+        with col3:
+            st.button("🗑️", key="del" + row["id"])
+
+
+def table_rows(rows):
+    """The current left panel: one selectable dataframe"""
+    import pandas as pd
+    import streamlit as st
+
+    table = pd.DataFrame(rows)
+    st.dataframe(
+        table[["name", "email", "match_percentage"]],
+        column_config={"match_percentage": st.column_config.ProgressColumn(
+            "Match", min_value=0, max_value=100, format="%d%%"
+        )},
+        hide_index=True,
+        on_select="rerun",
+        selection_mode="single-row",
+        key="candidates",
+    )
+
+
+def make_rows(count, seed):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        lines = resume_lines(rng, 1)
+        rows.append({"id": f"c{i}", "name": lines[0], "email": lines[1],
+                     "match_percentage": rng.randint(0, 100)})
+    return rows
+
+
+def rerun_seconds(script, rows, repeats):
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_function(script, args=(rows,), default_timeout=600)
+    app.run()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        app.run()
+    return (time.perf_counter() - start) / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'rows':>7} {'buttons s':>10} {'table s':>9} {'speedup':>8}")
+    for count in args.rows:
+        rows = make_rows(count, args.seed)
+        buttons = rerun_seconds(button_rows, rows, args.repeats)
+        table = rerun_seconds(table_rows, rows, args.repeats)
+        print(f"{count:>7} {buttons:>10.3f} {table:>9.3f} {buttons / table:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
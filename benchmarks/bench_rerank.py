@@ -0,0 +1,118 @@
+"""Filter-change latency with a JD applied: rescoring per change versus the JD's sorted index.
+
+Replays sidebar changes (a ``min_match`` slider drag, name and skill
+filters) against one JD and times getting the first page of the
+ranking for each: the previous path scored the filtered ids and sorted
+them again on every change; now the JD's ranking is sorted once and
+each change is a binary-search cut plus a mask. Both include the filter
+query itself. Run from the repository root:
+
+    python -m benchmarks.bench_rerank --rows 50000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+import db
+from benchmarks.bench_matching import JD
+from benchmarks.corpus import populate
+from candidate_store import CandidateStore, filters_active
+from ranking import Ranking, RankingEngine
+
+PAGE_SIZE = 100
+
+NO_FILTERS = {"name": "", "email": "", "skills": (), "body": ""}
+
+# (label, filters, min_match) in the order a recruiter might click
+CHANGES = [
+    *((f"min_match={m}", {}, m) for m in range(0, 90, 10)),
+    ("name=sharma", {"name": "sharma"}, 0),
+    ("skills=python", {"skills": ("python",)}, 0),
+    ("skills=python min=40", {"skills": ("python",)}, 40),
+    ("name+skills min=20", {"name": "rao", "skills": ("python",)}, 20),
+]
+
+
+def rank_scores(ids, match, score, min_match=0, top_k=None):
+    """Order ``ids`` by match %, then score, best first, as the list did before RankedIndex.
+
+    Candidates below ``min_match`` are dropped; ``total`` counts the
+    rest. With ``top_k`` only the best k are selected (argpartition) and
+    sorted, instead of sorting every candidate.
+    """
+    match = np.asarray(match, dtype=int)
+    score = np.asarray(score, dtype=float)
+    candidates = np.flatnonzero(match >= min_match)
+    total = len(candidates)
+
+    # match % first, score (scaled into [0, 1)) only breaks ties
+    top = score.max() if len(score) else 0
+    key = (match + score / (top * 1.001) if top > 0 else match)[candidates]
+    if top_k is not None and top_k < total:
+        best = np.argpartition(-key, top_k)[:top_k]
+        candidates, key = candidates[best], key[best]
+    order = candidates[np.argsort(-key, kind="stable")]
+    return Ranking([ids[n] for n in order], match[order], score[order], total)
+
+
+def rescored(store, engine, filters, min_match):
+    """The previous path: score the filtered ids, then sort them"""
+    ids = store.filter_ids(store.snapshot(), **filters)
+    ids, match, bm25 = engine.score_ids(JD, ids)
+    return rank_scores(ids, match, bm25, min_match, PAGE_SIZE)
+
+
+def from_index(store, engine, filters, min_match):
+    ids = store.filter_ids(store.snapshot(), **filters) if filters_active(filters) else None
+    return engine.rank(JD, ids, min_match, PAGE_SIZE)
+
+
+def median_ms(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        conn = db.connect(path)
+        populate(conn, args.rows, random.Random(args.seed))
+        conn.close()
+        store = CandidateStore(path)
+        engine = RankingEngine()
+        engine.sync(store.conn, store.snapshot().version)
+        start = time.perf_counter()
+        engine.ranked(JD)
+        print(f"{args.rows} candidates; JD index built in {(time.perf_counter() - start) * 1000:.1f} ms "
+              f"(once per JD and data version)")
+
+        print(f"{'change':<22} {'matches':>8} {'rescore ms':>11} {'index ms':>9} {'speedup':>8}")
+        before, after = [], []
+        for label, changed, min_match in CHANGES:
+            filters = {**NO_FILTERS, **changed}
+            old_ms, old = median_ms(lambda: rescored(store, engine, filters, min_match), args.repeat)
+            new_ms, new = median_ms(lambda: from_index(store, engine, filters, min_match), args.repeat)
+            assert old.total == new.total and old.ids == new.ids, label
+            before.append(old_ms)
+            after.append(new_ms)
+            print(f"{label:<22} {new.total:>8} {old_ms:>11.2f} {new_ms:>9.2f} {old_ms / new_ms:>7.1f}x")
+        print(f"{'median':<22} {'':>8} {statistics.median(before):>11.2f} {statistics.median(after):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
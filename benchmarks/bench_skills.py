@@ -0,0 +1,63 @@
+"""Skill extraction throughput (resumes/sec) versus taxonomy size.
+
+Compares the original per-skill substring scan with the compiled
+single-pass SkillMatcher. Run from the repository root:
+
+    python -m benchmarks.bench_skills --sizes 50 500 5000
+"""
+import argparse
+import random
+import string
+import time
+
+from benchmarks.corpus import resume_lines
+from skills import DEFAULT_TAXONOMY, SkillMatcher
+
+
+def synthetic_taxonomy(size, rng):
+    """The built-in skills padded with made-up ones (some multi-word, some with synonyms)"""
+    taxonomy = dict(DEFAULT_TAXONOMY)
+    while len(taxonomy) < size:
+        words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9)))
+                 for _ in range(rng.choice([1, 1, 1, 2]))]
+        taxonomy[" ".join(words)] = ["".join(words)] if len(words) > 1 else []
+    return dict(list(taxonomy.items())[:size])
+
+
+def linear_scan(taxonomy, text_lower):
+    """The original parse_resume loop"""
+    return [skill for skill in taxonomy if skill in text_lower]
+
+
+def throughput(fn, texts, seconds=1.0):
+    done = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        fn(texts[done % len(texts)])
+        done += 1
+    return done / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 500, 5000])
+    parser.add_argument("--resumes", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    texts = ["\n".join(resume_lines(rng, rng.randint(4, 16))).lower() for _ in range(args.resumes)]
+
+    print(f"{'skills':>7} {'build ms':>9} {'linear/s':>10} {'compiled/s':>11}")
+    for size in args.sizes:
+        taxonomy = synthetic_taxonomy(size, rng)
+        start = time.perf_counter()
+        matcher = SkillMatcher(taxonomy)
+        build_ms = (time.perf_counter() - start) * 1000
+        linear = throughput(lambda text: linear_scan(taxonomy, text), texts)
+        compiled = throughput(matcher.find, texts)
+        print(f"{size:>7} {build_ms:>9.1f} {linear:>10.0f} {compiled:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
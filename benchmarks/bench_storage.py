@@ -0,0 +1,110 @@
+"""Database size and read latency: plain-text content versus compressed content_z.
+
+Stores a synthetic corpus the current way (compressed text, originals
+in the blob store), then makes a copy with the text put back into the
+plain ``content`` column as it used to be stored, and compares file
+sizes after VACUUM and single-candidate read latency. Also times
+reading originals back from the blob store. Run from the repository
+root:
+
+    python -m benchmarks.bench_storage --resumes 10000
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+
+import db
+import dedupe
+from benchmarks.corpus import populate
+from blobstore import BlobStore
+
+
+def vacuumed_size(conn, path):
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.execute("VACUUM")
+    return os.path.getsize(path)
+
+
+def to_plain(path):
+    """Put the text back in ``content`` and drop content_z, as before compression"""
+    conn = db.connect(path)
+    # the search index is left alone: it is the same size in both layouts
+    conn.execute("DROP TRIGGER IF EXISTS candidates_fts_update")
+    with conn:
+        conn.execute("UPDATE candidates SET content = unz(content_z), content_z = NULL")
+    return conn
+
+
+def latencies(fn, keys):
+    timings = []
+    for key in keys:
+        start = time.perf_counter()
+        fn(key)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return statistics.median(timings) * 1e6, timings[int(len(timings) * 0.95)] * 1e6
+
+
+def directory_size(root):
+    return sum(os.path.getsize(os.path.join(parent, name))
+               for parent, _, names in os.walk(root) for name in names)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resumes", type=int, default=10000)
+    parser.add_argument("--reads", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "compressed.db")
+        conn = db.connect(path)
+        blobs = BlobStore(os.path.join(tmp, "blobs"))
+        start = time.perf_counter()
+        texts = populate(conn, args.resumes, random.Random(args.seed), paragraphs=(4, 16), blobs=blobs)
+        text_bytes = sum(len(text.encode("utf-8")) for text in texts)
+        print(f"stored {args.resumes} resumes ({text_bytes / 1e6:.1f} MB of text) "
+              f"in {time.perf_counter() - start:.1f}s")
+        # signed as the ingest worker would, so rows are their real size
+        dedupe.fill_signatures(conn)
+
+        compressed_size = vacuumed_size(conn, path)
+        stored_text = conn.execute("SELECT SUM(LENGTH(content_z)) FROM candidates").fetchone()[0]
+        rng = random.Random(args.seed)
+        ids = [row[0] for row in conn.execute("SELECT id FROM candidates")]
+        sample = [rng.choice(ids) for _ in range(args.reads)]
+        digests = [row[0] for row in conn.execute("SELECT content_hash FROM candidates")]
+        digest_sample = [rng.choice(digests) for _ in range(args.reads)]
+        compressed_p50, compressed_p95 = latencies(lambda i: db.get_candidate(conn, i), sample)
+        conn.close()
+
+        plain_path = os.path.join(tmp, "plain.db")
+        shutil.copy(path, plain_path)
+        plain = to_plain(plain_path)
+        plain_size = vacuumed_size(plain, plain_path)
+        plain_p50, plain_p95 = latencies(
+            lambda i: plain.execute(f"SELECT {','.join(db.CANDIDATE_COLUMNS)} FROM candidates WHERE id = ?",
+                                    (i,)).fetchone(),
+            sample,
+        )
+        plain.close()
+
+        store_p50, store_p95 = latencies(blobs.read, digest_sample)
+
+        print(f"text: {text_bytes / 1e6:.1f} MB plain, {stored_text / 1e6:.1f} MB compressed "
+              f"({stored_text / text_bytes:.0%}) with codec {db.CONTENT_CODEC}")
+        print(f"{'':<28} {'DB MB':>8} {'read p50 us':>12} {'read p95 us':>12}")
+        print(f"{'plain content (before)':<28} {plain_size / 1e6:>8.1f} {plain_p50:>12.1f} {plain_p95:>12.1f}")
+        print(f"{'compressed content_z':<28} {compressed_size / 1e6:>8.1f} "
+              f"{compressed_p50:>12.1f} {compressed_p95:>12.1f}")
+        print(f"originals in blob store: {directory_size(blobs.root) / 1e6:.1f} MB; "
+              f"read p50 {store_p50:.1f} us (p95 {store_p95:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Concurrent sessions paging the candidate list: a query per rerun versus the shared snapshot.
+
+Simulates ``--sessions`` recruiters, each a thread rerunning the list
+page ``--reruns`` times while a writer appends candidates now and then,
+and counts the database reads made for them (calls to the timed ``db.*``
+and ``store.refresh`` stages). Run from the repository root:
+
+    python -m benchmarks.bench_store --rows 50000 --sessions 10
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+import db
+import perf
+from benchmarks.corpus import populate
+from candidate_store import CandidateStore
+
+PAGE_SIZE = 100
+
+
+def per_rerun(store, rng):
+    """The previous path: count and one page straight from SQLite"""
+    total = db.count_candidates(store.conn)
+    pages = max(1, -(-total // PAGE_SIZE))
+    return db.list_candidates(store.conn, PAGE_SIZE, rng.randrange(pages) * PAGE_SIZE)
+
+
+def from_snapshot(store, rng):
+    snapshot = store.snapshot()
+    pages = max(1, -(-len(snapshot) // PAGE_SIZE))
+    return snapshot.page(PAGE_SIZE, rng.randrange(pages) * PAGE_SIZE)
+
+
+def run(store, render, sessions, reruns, writes, seed):
+    perf.enable()
+    perf.REGISTRY.reset()
+
+    def session(number):
+        rng = random.Random(seed + number)
+        for _ in range(reruns):
+            render(store, rng)
+            # time between clicks, so the writes land mid-session
+            time.sleep(0.002)
+
+    writer_rng = random.Random(seed)
+    threads = [threading.Thread(target=session, args=(n,)) for n in range(sessions)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for _ in range(writes):
+        # an upload landing while the sessions click around
+        with store.writing() as conn:
+            populate(conn, 10, writer_rng)
+        time.sleep(0.05)
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    reads = sum(count for stage, count, *_ in perf.REGISTRY.summary()
+                if stage.startswith("db.") and stage != "db.write_batch" or stage == "store.refresh")
+    return elapsed, reads
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--reruns", type=int, default=200)
+    parser.add_argument("--writes", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'path':<16} {'seconds':>8} {'reruns/sec':>11} {'DB reads':>9}")
+    for label, render in (("query per rerun", per_rerun), ("shared snapshot", from_snapshot)):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bench.db")
+            conn = db.connect(path)
+            populate(conn, args.rows, random.Random(args.seed))
+            conn.close()
+            store = CandidateStore(path)
+            store.snapshot()
+            elapsed, reads = run(store, render, args.sessions, args.reruns, args.writes, args.seed)
+            reruns = args.sessions * args.reruns
+            print(f"{label:<16} {elapsed:>8.2f} {reruns / elapsed:>11.0f} {reads:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""Deterministic synthetic resume corpus for benchmarks.
+
+PDFs are written directly (single Helvetica font, one text object per
+page) so no PDF authoring library is needed; DOCX files use python-docx.
+Everything is derived from a seed, so two runs produce byte-identical
+files. ``populate`` stores generated resumes straight into a database,
+for benchmarks and tests that start from stored candidates. To write a
+corpus to disk (e.g. for the bulk importer):
+
+    python -m benchmarks.corpus --out /tmp/corpus --count 10000
+"""
+import argparse
+import os
+import random
+import uuid
+import zipfile
+import zlib
+from io import BytesIO
+
+import db
+from ingest import content_hash
+
+FIRST_NAMES = ["Aarav", "Priya", "John", "Maria", "Wei", "Fatima", "Lucas", "Aisha",
+               "Noah", "Sofia", "Rahul", "Emma", "Kenji", "Olivia", "Omar", "Ananya"]
+LAST_NAMES = ["Sharma", "Patel", "Smith", "Garcia", "Chen", "Khan", "Silva", "Okafor",
+              "Brown", "Rossi", "Iyer", "Müller", "Tanaka", "Jones", "Haddad", "Rao"]
+SKILLS = ["python", "sql", "azure", "aws", "java", "react", "etl", "spark", "javascript",
+          "typescript", "docker", "kubernetes", "tensorflow", "pytorch", "excel", "tableau",
+          "power bi", "databricks", "snowflake", "airflow", "kafka", "redis", "mongodb",
+          "postgresql", "machine learning", "data science", "looker", "redshift",
+          "bigquery", "gcp", "devops", "ci/cd", "jenkins", "git", "linux", "bash"]
+FILLER = ("designed built maintained scalable pipelines services dashboards for "
+          "stakeholders across teams improving reliability latency and cost while "
+          "mentoring engineers and owning delivery of production systems").split()
+
+
+def resume_lines(rng, paragraphs=8):
+    """Lines of one synthetic resume"""
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    skills = rng.sample(SKILLS, rng.randint(4, 12))
+    lines = [
+        f"{first} {last}",
+        f"{first.lower()}.{last.lower()}{rng.randint(1, 999)}@example.com",
+        f"+1 {rng.randint(200, 999)}-{rng.randint(200, 999)}-{rng.randint(1000, 9999)}",
+        f"{rng.randint(1, 20)} years of experience",
+        "",
+        "Skills: " + ", ".join(skills),
+        "",
+    ]
+    for _ in range(paragraphs):
+        words = rng.choices(FILLER, k=rng.randint(40, 90)) + rng.sample(skills, 2)
+        rng.shuffle(words)
+        line = []
+        for word in words:
+            line.append(word)
+            if len(line) == 12:
+                lines.append(" ".join(line))
+                line = []
+        if line:
+            lines.append(" ".join(line))
+        lines.append("")
+    return lines
+
+
+def _pdf_escape(line):
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(lines, lines_per_page=48, compress=False):
+    """Minimal multi-page text PDF from a list of lines; ``compress``
+    Flate-encodes the page content streams, as most generators do"""
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"]
+    page_refs = []
+    for page in pages:
+        body = ["BT", "/F1 10 Tf", "14 TL", "50 760 Td"]
+        for line in page:
+            body.append(f"({_pdf_escape(line)}) Tj T*")
+        body.append("ET")
+        stream = "\n".join(body).encode("cp1252", "replace")
+        objects.append(zlib.compress(stream) if compress else stream)
+        content_id = len(objects)
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>")
+        page_refs.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(page_refs)}] /Count {len(page_refs)} >>"
+
+    out = BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n".encode())
+        if isinstance(obj, bytes):
+            flate = " /Filter /FlateDecode" if compress else ""
+            out.write(f"<< /Length {len(obj)}{flate} >>\nstream\n".encode() + obj + b"\nendstream")
+        else:
+            out.write(obj.encode())
+        out.write(b"\nendobj\n")
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return out.getvalue()
+
+
+def make_docx(lines):
+    """DOCX bytes with one paragraph per line"""
+    from docx import Document
+
+    doc = Document()
+    for line in lines:
+        doc.add_paragraph(line)
+    saved = BytesIO()
+    doc.save(saved)
+    # python-docx stamps each zip entry with the current time; rewrite the
+    # archive with a fixed one so equal lines give equal bytes
+    out = BytesIO()
+    with zipfile.ZipFile(saved) as source, zipfile.ZipFile(out, "w") as target:
+        for info in source.infolist():
+            entry = zipfile.ZipInfo(info.filename, date_time=(1980, 1, 1, 0, 0, 0))
+            entry.compress_type = info.compress_type
+            target.writestr(entry, source.read(info))
+    return out.getvalue()
+
+
+def resume_texts(count, seed=42, paragraphs=(4, 16)):
+    """Plain text of ``count`` resumes, for benchmarks that skip extraction"""
+    rng = random.Random(seed)
+    return ["\n".join(resume_lines(rng, rng.randint(*paragraphs))) for _ in range(count)]
+
+
+def populate(conn, count, rng, paragraphs=(2, 2), blobs=None):
+    """Store ``count`` generated resumes as candidates and return their texts.
+
+    Fields come from the generated lines rather than ``parse_resume``, and
+    rows get no MinHash signature. Each row's content_hash is a fresh
+    uuid, unless ``blobs`` (a BlobStore) is given: then the resume is also
+    kept there as a PDF, under that file's hash.
+    """
+    texts = []
+    with db.CandidateWriter(conn, 2000) as writer:
+        for _ in range(count):
+            lines = resume_lines(rng, rng.randint(*paragraphs))
+            text = "\n".join(lines)
+            uid = str(uuid.uuid4())
+            digest = uid
+            if blobs is not None:
+                data = make_pdf(lines, compress=True)
+                digest = content_hash(data)
+                blobs.put(data, digest)
+            writer.add((uid, lines[0], lines[1], lines[2], lines[5].removeprefix("Skills: "), lines[3],
+                        text, digest, None, None, None))
+            texts.append(text)
+    return texts
+
+
+def generate_corpus(count, seed=42, docx_ratio=0.3, paragraphs=(4, 16)):
+    """Return ``count`` ``(name, bytes)`` resume files, reproducible per seed"""
+    rng = random.Random(seed)
+    files = []
+    for i in range(count):
+        lines = resume_lines(rng, rng.randint(*paragraphs))
+        if rng.random() < docx_ratio:
+            files.append((f"resume_{i:06d}.docx", make_docx(lines)))
+        else:
+            files.append((f"resume_{i:06d}.pdf", make_pdf(lines)))
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic resume corpus to a directory")
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--docx-ratio", type=float, default=0.3)
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    for name, data in generate_corpus(args.count, args.seed, args.docx_ratio):
+        with open(os.path.join(args.out, name), "wb") as f:
+            f.write(data)
+    print(f"wrote {args.count} resumes to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
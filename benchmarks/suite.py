@@ -0,0 +1,194 @@
+"""Benchmark suite with machine-readable, comparable results.
+
+Builds a deterministic synthetic corpus and measures ingestion
+throughput, parse latency, candidate writes, filter latency, JD scoring
+latency and export time across corpus sizes. Results are written as
+JSON so two runs (e.g. before and after a change) can be compared.
+Everything runs offline in temporary directories. From the repository
+root:
+
+    python -m benchmarks.suite run --sizes 1000 10000 --out before.json
+    python -m benchmarks.suite run --sizes 1000 10000 --out after.json
+    python -m benchmarks.suite compare before.json after.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import db
+import export
+from benchmarks.bench_filters import QUERIES, filter_label
+from benchmarks.bench_matching import JD
+from benchmarks.corpus import generate_corpus, populate, resume_texts
+from ingest import default_workers, ingest_files
+from parsing import parse_resume
+from ranking import RankedIndex, RankingEngine
+
+
+class Results:
+    """Collected measurements; ``better`` says which direction is an improvement"""
+
+    def __init__(self):
+        self.records = []
+
+    def add(self, benchmark, value, unit, better="lower", size=None):
+        self.records.append({"benchmark": benchmark, "size": size, "value": value,
+                             "unit": unit, "better": better})
+        label = f"{benchmark} [{size}]" if size is not None else benchmark
+        print(f"  {label:<48} {value:>12.3f} {unit}", flush=True)
+
+
+def median_seconds(fn, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def bench_ingest(results, files, workers, seed):
+    corpus = generate_corpus(files, seed=seed)
+    megabytes = sum(len(data) for _, data in corpus) / 1e6
+    for count in workers:
+        start = time.perf_counter()
+        errors = sum(1 for result in ingest_files(corpus, workers=count) if not result.ok)
+        elapsed = time.perf_counter() - start
+        results.add(f"ingest.files_per_sec.workers_{count}", len(corpus) / elapsed, "files/s", "higher")
+        results.add(f"ingest.mb_per_sec.workers_{count}", megabytes / elapsed, "MB/s", "higher")
+        results.add(f"ingest.errors.workers_{count}", errors, "files")
+
+
+def bench_parse(results, count, seed):
+    for label, paragraphs in (("typical", (4, 16)), ("long", (60, 120))):
+        texts = resume_texts(count, seed=seed, paragraphs=paragraphs)
+        timings = []
+        for text in texts:
+            start = time.perf_counter()
+            parse_resume(text)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        results.add(f"parse.{label}.p50", timings[len(timings) // 2] * 1e6, "us")
+        results.add(f"parse.{label}.p95", timings[int(len(timings) * 0.95)] * 1e6, "us")
+
+
+def bench_corpus_size(results, size, seed, tmp):
+    path = os.path.join(tmp, f"bench_{size}.db")
+    conn = db.connect(path)
+
+    elapsed = median_seconds(lambda: populate(conn, size, random.Random(seed), paragraphs=(3, 3)), repeat=1)
+    results.add("db.write_rows_per_sec", size / elapsed, "rows/s", "higher", size)
+
+    for filters in QUERIES:
+        ms = median_seconds(lambda: db.filter_candidate_ids(conn, **filters)) * 1000
+        results.add(f"filter.{filter_label(filters)}", ms, "ms", size=size)
+    ms = median_seconds(lambda: db.list_candidates(conn, 50, 0)) * 1000
+    results.add("filter.first_page", ms, "ms", size=size)
+
+    engine = RankingEngine()
+    results.add("jd.engine_sync", median_seconds(lambda: engine.sync(conn), repeat=1) * 1000, "ms", size=size)
+    engine.rank(JD)  # first call sorts postings by term
+    # scoring and sorting everyone, as on a new JD; repeat ranks reuse it
+    ids = db.filter_candidate_ids(conn)
+    results.add("jd.rank_all", median_seconds(lambda: RankedIndex(*engine.score_ids(JD, ids))) * 1000,
+                "ms", size=size)
+    results.add("jd.rank_top50", median_seconds(lambda: engine.rank(JD, top_k=50)) * 1000, "ms", size=size)
+    results.add("jd.term_index_sql", median_seconds(lambda: db.match_scores(conn, JD), repeat=3) * 1000,
+                "ms", size=size)
+
+    for fmt in ("csv", "xlsx"):
+        out = os.path.join(tmp, f"export.{fmt}")
+
+        def write():
+            rows = ((name, email, phone, experience, skills, 0)
+                    for _, name, email, phone, skills, experience in db.iter_list_candidates(conn))
+            export.WRITERS[fmt](rows, out)
+
+        try:
+            results.add(f"export.{fmt}", median_seconds(write, repeat=1) * 1000, "ms", size=size)
+        except export.ExportError as e:
+            print(f"  export.{fmt} [{size}] skipped: {e}")
+    conn.close()
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"python": platform.python_version(), "platform": platform.platform(),
+            "cpus": os.cpu_count(), "commit": commit, "timestamp": time.time()}
+
+
+def run(args):
+    results = Results()
+    print("ingest")
+    bench_ingest(results, args.ingest_files, args.workers, args.seed)
+    print("parse")
+    bench_parse(results, args.parse_resumes, args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            print(f"corpus of {size}")
+            bench_corpus_size(results, size, args.seed, tmp)
+
+    report = {"environment": environment(), "seed": args.seed, "results": results.records}
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"wrote {args.out}")
+
+
+def compare(args):
+    with open(args.before, encoding="utf-8") as f:
+        before = {(r["benchmark"], r["size"]): r for r in json.load(f)["results"]}
+    with open(args.after, encoding="utf-8") as f:
+        after = json.load(f)["results"]
+
+    regressions = 0
+    print(f"{'benchmark':<48} {'before':>12} {'after':>12} {'change':>8}")
+    for record in after:
+        old = before.get((record["benchmark"], record["size"]))
+        if old is None or not old["value"]:
+            continue
+        change = (record["value"] - old["value"]) / old["value"]
+        worse = change > args.threshold if record["better"] == "lower" else change < -args.threshold
+        regressions += worse
+        label = record["benchmark"] + (f" [{record['size']}]" if record["size"] is not None else "")
+        print(f"{label:<48} {old['value']:>12.3f} {record['value']:>12.3f} {change:>+8.1%}"
+              f"{'  REGRESSION' if worse else ''}")
+    print(f"{regressions} regressions beyond {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the suite")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    run_parser.add_argument("--ingest-files", type=int, default=200)
+    run_parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, default_workers()}))
+    run_parser.add_argument("--parse-resumes", type=int, default=500)
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--out", help="write results as JSON")
+
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("before")
+    compare_parser.add_argument("after")
+    compare_parser.add_argument("--threshold", type=float, default=0.10,
+                                help="relative change counted as a regression (default 0.10)")
+
+    args = parser.parse_args()
+    sys.exit(run(args) if args.command == "run" else compare(args))
+
+
+if __name__ == "__main__":
+    main()
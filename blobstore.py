@@ -0,0 +1,92 @@
+"""Content-addressed store for the original uploaded files.
+
+Each file is kept once, under the SHA-256 of its bytes (the candidate's
+``content_hash``), at ``<root>/<first two hex digits>/<hash>``. Files
+are written under a temporary name and renamed, so a reader never sees
+a partial one. Files are only read when asked for: the UI reads the
+first bytes for the file type and the rest when a download is clicked.
+
+Keeping the originals means a better extractor can be run over them
+later without asking anyone to upload again.
+"""
+import os
+import tempfile
+
+import db
+
+# leading bytes -> (extension, MIME type) of what the UI accepts
+FILE_TYPES = (
+    (b"%PDF", ".pdf", "application/pdf"),
+    (b"PK", ".docx", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"),
+)
+
+
+def default_root(db_path=db.DB_PATH):
+    """RESUME_BLOB_DIR, else a directory next to the database"""
+    return os.environ.get("RESUME_BLOB_DIR") or f"{db_path}-blobs"
+
+
+def file_type(data):
+    """``(extension, MIME type)`` guessed from a file's first bytes"""
+    for magic, extension, mime in FILE_TYPES:
+        if bytes(data[:len(magic)]) == magic:
+            return extension, mime
+    return "", "application/octet-stream"
+
+
+class BlobStore:
+    """Original files by SHA-256 digest"""
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    @classmethod
+    def for_connection(cls, conn):
+        """The store belonging to ``conn``'s database file; None for in-memory databases"""
+        path = conn.execute("PRAGMA database_list").fetchone()[2]
+        return cls(default_root(path)) if path else None
+
+    def path(self, digest):
+        return os.path.join(self.root, digest[:2], digest)
+
+    def __contains__(self, digest):
+        return os.path.exists(self.path(digest))
+
+    def put(self, data, digest):
+        """Store ``data`` under ``digest`` unless it is already there"""
+        path = self.path(digest)
+        if os.path.exists(path):
+            return path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, partial = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(partial, path)
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+        return path
+
+    def read(self, digest, size=-1):
+        """The file's bytes (at most ``size`` of them), or None if it is not stored"""
+        try:
+            with open(self.path(digest), "rb") as f:
+                return f.read(size)
+        except FileNotFoundError:
+            return None
+
+    def delete(self, digest):
+        try:
+            os.remove(self.path(digest))
+        except FileNotFoundError:
+            pass
+
+    def delete_unused(self, conn, digests):
+        """Delete the files of ``digests`` that no candidate row refers to any more.
+
+        Call after the rows that used them are deleted and committed.
+        """
+        for digest in set(digests) - db.existing_hashes(conn, digests):
+            self.delete(digest)
@@ -0,0 +1,142 @@
+"""Process-wide, columnar snapshot of the candidate list.
+
+Streamlit reruns the whole script for every click in every session. The
+UI keeps one ``CandidateStore`` per server process (``st.cache_resource``)
+holding the list columns of every candidate as parallel columns,
+refreshed only when the table changes, so any number of sessions share
+one read per change instead of querying on each rerun. Appended rows are
+read incrementally; a delete or an edit of a list column (counted by
+``list_rewrites`` in the meta table) reloads the whole snapshot.
+Snapshots are never modified, only replaced, so a reader never sees one
+half-updated.
+
+Writes from the UI go through ``writing()``: one dedicated connection
+behind a lock, so transactions from concurrent sessions never interleave
+on a shared connection.
+"""
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+import db
+import perf
+
+
+def filters_active(filters):
+    """Whether any sidebar filter would narrow the list"""
+    return any(value.strip() if isinstance(value, str) else value for value in filters.values())
+
+
+class Snapshot:
+    """LIST_COLUMNS of every candidate, column by column in rowid order"""
+
+    def __init__(self, version, rewrites, max_rowid, columns):
+        self.version = version
+        self.rewrites = rewrites
+        self.max_rowid = max_rowid
+        # one list per LIST_COLUMNS entry, ids first
+        self.columns = columns
+        self.ids = columns[0]
+        self.index = {candidate_id: n for n, candidate_id in enumerate(self.ids)}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, candidate_id):
+        return candidate_id in self.index
+
+    def page(self, limit, offset=0):
+        """Rows ``offset`` to ``offset + limit`` as LIST_COLUMNS tuples"""
+        return list(zip(*(column[offset:offset + limit] for column in self.columns)))
+
+    def rows(self, ids):
+        """LIST_COLUMNS tuples for ``ids`` in the given order; unknown ids are skipped"""
+        positions = [self.index[i] for i in ids if i in self.index]
+        return [tuple(column[n] for column in self.columns) for n in positions]
+
+    def skill_counts(self, ids=None, limit=None):
+        """``(skill, candidates)`` over ``ids`` (default: everyone), most common first"""
+        skills = self.columns[db.LIST_COLUMNS.index("skills")]
+        positions = range(len(self)) if ids is None else (self.index[i] for i in ids if i in self.index)
+        counts = Counter(skill for n in positions for skill in set(db.split_skills(skills[n])))
+        return sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+
+class CandidateStore:
+    """Shared read connection, serialized writer and the current Snapshot.
+
+    ``snapshot()`` checks the table's version at most every
+    ``max_staleness`` seconds; writes through ``writing()`` make the next
+    call check straight away.
+    """
+
+    def __init__(self, path=db.DB_PATH, max_staleness=1.0):
+        self.conn = db.connect(path)
+        self._writer = db.connect(path)
+        self.write_lock = threading.Lock()
+        self.refresh_lock = threading.Lock()
+        self.max_staleness = max_staleness
+        self._snapshot = None
+        self._checked = 0.0
+
+    def snapshot(self):
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._checked < self.max_staleness:
+            return snapshot
+        with self.refresh_lock:
+            # sessions waiting here share the refresh done by the first one
+            if self._snapshot is None or time.monotonic() - self._checked >= self.max_staleness:
+                self._snapshot = self._refresh(self._snapshot)
+                self._checked = time.monotonic()
+            return self._snapshot
+
+    def invalidate(self):
+        """Check the table for changes on the next ``snapshot()``"""
+        self._checked = 0.0
+
+    @perf.timed("store.refresh")
+    def _refresh(self, old):
+        # versions first: a row written after they are read is picked up
+        # again by the next refresh, never missed
+        version, rewrites = db.list_versions(self.conn)
+        if old is not None and old.version == version:
+            return old
+        columns = ", ".join(["rowid", *db.LIST_COLUMNS])
+        if old is not None and old.rewrites == rewrites:
+            # only appends (or writes outside the list columns) since
+            added = self.conn.execute(
+                f"SELECT {columns} FROM candidates WHERE rowid > ? ORDER BY rowid", (old.max_rowid,)
+            ).fetchall()
+            if not added:
+                return Snapshot(version, rewrites, old.max_rowid, old.columns)
+            rowids, *new = zip(*added)
+            return Snapshot(version, rewrites, rowids[-1],
+                            [column + list(values) for column, values in zip(old.columns, new)])
+
+        rows = self.conn.execute(f"SELECT {columns} FROM candidates ORDER BY rowid").fetchall()
+        if not rows:
+            return Snapshot(version, rewrites, 0, [[] for _ in db.LIST_COLUMNS])
+        rowids, *loaded = zip(*rows)
+        return Snapshot(version, rewrites, rowids[-1], [list(values) for values in loaded])
+
+    def filter_ids(self, snapshot, **filters):
+        """Ids passing the sidebar filters, in rowid order; no filters needs no query"""
+        if not filters_active(filters):
+            return list(snapshot.ids)
+        return db.filter_candidate_ids(self.conn, **filters)
+
+    @contextmanager
+    def writing(self):
+        """The writer connection inside a transaction, one session at a time"""
+        with self.write_lock, self._writer:
+            yield self._writer
+        self.invalidate()
+
+    def delete(self, ids, blobs=None):
+        """Delete candidates; with a BlobStore, also originals no other row shares"""
+        with self.writing() as conn:
+            hashes = db.content_hashes(conn, ids)
+            conn.executemany("DELETE FROM candidates WHERE id = ?", ((i,) for i in ids))
+        if blobs:
+            blobs.delete_unused(self.conn, hashes)
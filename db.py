@@ -0,0 +1,871 @@
+"""SQLite storage for candidates.
+
+Connections are opened in WAL mode so the UI's reads are never blocked
+by a bulk upload, and writes go through ``CandidateWriter``, which
+batches rows into a single transaction per flush.
+
+Resume text is stored compressed (``content_z``) and only decompressed
+when a full record is read. Connections from ``connect`` register the
+``unz()`` SQL function the search-index triggers rely on, so write to
+the database through ``connect`` rather than a bare sqlite3 connection.
+"""
+import os
+import re
+import sqlite3
+import time
+import zlib
+
+import perf
+from matching import jd_keywords_of, match_percentage, term_counts
+
+DB_PATH = "database.db"
+DEFAULT_BATCH_SIZE = 500
+
+CANDIDATE_COLUMNS = ("id", "name", "email", "phone", "skills", "experience", "content",
+                     "content_hash", "extractor", "parser_version", "minhash")
+
+# Derived from ``content`` by parsing.parse_resume, see reparse.py
+PARSED_COLUMNS = ("name", "email", "phone", "skills", "experience")
+
+# What the candidate list needs; ``content`` is only read for one candidate
+LIST_COLUMNS = ("id", "name", "email", "phone", "skills", "experience")
+
+# CANDIDATE_COLUMNS as stored: the text lives compressed in content_z
+STORED_COLUMNS = tuple("content_z" if column == "content" else column for column in CANDIDATE_COLUMNS)
+CONTENT = CANDIDATE_COLUMNS.index("content")
+
+INSERT_CANDIDATE = (
+    f"INSERT INTO candidates ({','.join(STORED_COLUMNS)}) "
+    f"VALUES ({','.join('?' * len(STORED_COLUMNS))})"
+)
+
+# "zlib", or "zstd" with the zstandard package installed. Either kind of
+# stored value is read back regardless of the current setting.
+CONTENT_CODEC = os.environ.get("RESUME_CONTENT_CODEC", "zlib")
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def compress_text(text):
+    """Resume text as stored in content_z"""
+    if text is None:
+        return None
+    data = text.encode("utf-8")
+    if CONTENT_CODEC == "zstd":
+        import zstandard
+        return zstandard.ZstdCompressor(level=9).compress(data)
+    return zlib.compress(data, 6)
+
+
+def decompress_text(blob):
+    """Inverse of ``compress_text``; also the ``unz()`` SQL function"""
+    if blob is None:
+        return None
+    if bytes(blob[:4]) == ZSTD_MAGIC:
+        import zstandard
+        return zstandard.ZstdDecompressor().decompress(blob).decode("utf-8")
+    return zlib.decompress(blob).decode("utf-8")
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    # WAL + NORMAL only syncs at checkpoints; a crash can lose the last
+    # transaction but never corrupts the database
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA busy_timeout=5000",
+)
+
+
+def _create_candidates(conn):
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS candidates(
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    email TEXT,
+    phone TEXT,
+    skills TEXT,
+    experience TEXT,
+    content TEXT
+    )
+    """)
+
+
+def _add_content_hash(conn):
+    # hash of the raw uploaded bytes; NULL for rows stored before hashing
+    conn.execute("ALTER TABLE candidates ADD COLUMN content_hash TEXT")
+    conn.execute("CREATE UNIQUE INDEX idx_candidates_content_hash ON candidates(content_hash)")
+
+
+def _add_data_version(conn):
+    # bumped by triggers on every write so readers can cache until it changes
+    conn.execute("CREATE TABLE meta(key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+    conn.execute("INSERT INTO meta VALUES ('data_version', 0)")
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        conn.execute(f"""
+        CREATE TRIGGER candidates_version_{event.lower()} AFTER {event} ON candidates
+        BEGIN
+            UPDATE meta SET value = value + 1 WHERE key = 'data_version';
+        END
+        """)
+
+
+FTS_COLUMNS = ("name", "email", "skills", "content")
+
+
+def _fts_sync_statements(content="{}.content"):
+    # ``content``: SQL for the text column, formatted with "new" or "old"
+    def values(row):
+        return ", ".join(content.format(row) if column == "content" else f"{row}.{column}"
+                         for column in FTS_COLUMNS)
+
+    columns = ", ".join(FTS_COLUMNS)
+    new_values = values("new")
+    old_values = values("old")
+    insert = f"INSERT INTO candidates_fts(rowid, {columns}) VALUES (new.rowid, {new_values});"
+    delete = (f"INSERT INTO candidates_fts(candidates_fts, rowid, {columns}) "
+              f"VALUES ('delete', old.rowid, {old_values});")
+    return insert, delete
+
+
+def _add_fts(conn):
+    # external-content FTS5 index over candidates, kept in sync by triggers.
+    # It is keyed by the implicit rowid, which only VACUUM would renumber;
+    # rebuild_search_index() re-derives it if that ever happens.
+    try:
+        conn.execute(f"""
+        CREATE VIRTUAL TABLE candidates_fts USING fts5(
+            {', '.join(FTS_COLUMNS)},
+            content='candidates', content_rowid='rowid',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+        """)
+    except sqlite3.OperationalError:
+        # SQLite built without FTS5: filters fall back to LIKE scans
+        return
+    insert, delete = _fts_sync_statements()
+    conn.execute(f"CREATE TRIGGER candidates_fts_insert AFTER INSERT ON candidates BEGIN {insert} END")
+    conn.execute(f"CREATE TRIGGER candidates_fts_delete AFTER DELETE ON candidates BEGIN {delete} END")
+    conn.execute(f"CREATE TRIGGER candidates_fts_update AFTER UPDATE ON candidates BEGIN {delete} {insert} END")
+    rebuild_search_index(conn)
+
+
+def _add_term_index(conn):
+    # inverted index for JD matching: term -> candidate rowid with the
+    # term's frequency, filled at ingest from Python-side tokenization
+    conn.execute("CREATE TABLE terms(id INTEGER PRIMARY KEY, term TEXT NOT NULL UNIQUE)")
+    conn.execute("""
+    CREATE TABLE candidate_terms(
+    term_id INTEGER NOT NULL,
+    doc INTEGER NOT NULL,
+    tf INTEGER NOT NULL,
+    PRIMARY KEY (term_id, doc)
+    ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX idx_candidate_terms_doc ON candidate_terms(doc)")
+    conn.execute("""
+    CREATE TRIGGER candidates_terms_delete AFTER DELETE ON candidates
+    BEGIN
+        DELETE FROM candidate_terms WHERE doc = old.rowid;
+    END
+    """)
+    # the text was still stored uncompressed at this point
+    rebuild_term_index(conn, text="content")
+
+
+def _add_score_cache(conn):
+    # persisted JD scores; dropped again by _drop_score_cache
+    conn.execute("""
+    CREATE TABLE score_cache(
+    jd_key TEXT NOT NULL,
+    candidate_id TEXT NOT NULL,
+    corpus_version INTEGER NOT NULL,
+    match_percentage INTEGER NOT NULL,
+    score REAL NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (jd_key, corpus_version, candidate_id)
+    ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX idx_score_cache_last_used ON score_cache(last_used)")
+
+
+def split_skills(skills):
+    """Skill names from the comma-joined ``skills`` column"""
+    if not skills or skills == "Not specified":
+        return []
+    return [skill.strip() for skill in skills.split(",") if skill.strip()]
+
+
+def _add_candidate_skills(conn):
+    # one row per (candidate, skill) so skill filters and facets are
+    # indexed lookups instead of scans of the comma-joined column
+    conn.execute("""
+    CREATE TABLE candidate_skills(
+    candidate_id TEXT NOT NULL,
+    skill TEXT NOT NULL,
+    PRIMARY KEY (candidate_id, skill)
+    ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX idx_candidate_skills_skill ON candidate_skills(skill, candidate_id)")
+    conn.execute("""
+    CREATE TRIGGER candidates_skills_delete AFTER DELETE ON candidates
+    BEGIN
+        DELETE FROM candidate_skills WHERE candidate_id = old.id;
+    END
+    """)
+    conn.executemany(
+        "INSERT OR IGNORE INTO candidate_skills VALUES (?,?)",
+        ((candidate_id, skill)
+         for candidate_id, skills in conn.execute("SELECT id, skills FROM candidates").fetchall()
+         for skill in split_skills(skills)),
+    )
+
+
+def _add_extractor(conn):
+    # extraction backend that produced ``content`` (e.g. "pdf-raw",
+    # "pdfplumber"); NULL for rows stored before it was recorded
+    conn.execute("ALTER TABLE candidates ADD COLUMN extractor TEXT")
+
+
+def _add_ingest_jobs(conn):
+    # background upload queue, see jobs.py: one row per upload batch and
+    # one per file, holding the uploaded bytes until the file is processed
+    conn.execute("""
+    CREATE TABLE ingest_jobs(
+    id TEXT PRIMARY KEY,
+    created REAL NOT NULL,
+    total INTEGER NOT NULL
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE ingest_job_files(
+    id INTEGER PRIMARY KEY,
+    job_id TEXT NOT NULL REFERENCES ingest_jobs(id),
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    data BLOB,
+    status TEXT NOT NULL DEFAULT 'queued',
+    error TEXT,
+    candidate_id TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    claimed_at REAL
+    )
+    """)
+    conn.execute("CREATE INDEX idx_ingest_job_files_job ON ingest_job_files(job_id, status)")
+    conn.execute("CREATE INDEX idx_ingest_job_files_status ON ingest_job_files(status, id)")
+
+
+def _add_parser_version(conn):
+    # parsing.parser_version() of the parse that produced the derived
+    # columns; NULL for rows stored before it was recorded
+    conn.execute("ALTER TABLE candidates ADD COLUMN parser_version TEXT")
+    conn.execute("CREATE INDEX idx_candidates_parser_version ON candidates(parser_version)")
+    if has_search_index(conn):
+        # only re-index a row when an indexed column changes, so stamping
+        # a re-parsed row whose fields came out the same stays cheap
+        insert, delete = _fts_sync_statements()
+        conn.execute("DROP TRIGGER candidates_fts_update")
+        conn.execute(f"CREATE TRIGGER candidates_fts_update AFTER UPDATE OF {', '.join(FTS_COLUMNS)} "
+                     f"ON candidates BEGIN {delete} {insert} END")
+
+
+def _compress_content(conn):
+    # resume text moves to zlib-compressed content_z and the content
+    # column is left NULL. The external-content FTS index now reads the
+    # text through a view that decompresses it, so it is rebuilt.
+    conn.execute("ALTER TABLE candidates ADD COLUMN content_z BLOB")
+    fts = has_search_index(conn)
+    if fts:
+        for event in ("insert", "delete", "update"):
+            conn.execute(f"DROP TRIGGER candidates_fts_{event}")
+        conn.execute("DROP TABLE candidates_fts")
+
+    cursor = conn.execute("SELECT rowid, content FROM candidates WHERE content IS NOT NULL")
+    while True:
+        rows = cursor.fetchmany(DEFAULT_BATCH_SIZE)
+        if not rows:
+            break
+        conn.executemany("UPDATE candidates SET content_z = ?, content = NULL WHERE rowid = ?",
+                         [(compress_text(content), rowid) for rowid, content in rows])
+
+    if not fts:
+        return
+    conn.execute(f"""
+    CREATE VIEW candidates_text AS
+    SELECT rowid AS doc, {', '.join(column for column in FTS_COLUMNS if column != 'content')},
+           unz(content_z) AS content
+    FROM candidates
+    """)
+    conn.execute(f"""
+    CREATE VIRTUAL TABLE candidates_fts USING fts5(
+        {', '.join(FTS_COLUMNS)},
+        content='candidates_text', content_rowid='doc',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """)
+    insert, delete = _fts_sync_statements("unz({}.content_z)")
+    indexed = ", ".join("content_z" if column == "content" else column for column in FTS_COLUMNS)
+    conn.execute(f"CREATE TRIGGER candidates_fts_insert AFTER INSERT ON candidates BEGIN {insert} END")
+    conn.execute(f"CREATE TRIGGER candidates_fts_delete AFTER DELETE ON candidates BEGIN {delete} END")
+    conn.execute(f"CREATE TRIGGER candidates_fts_update AFTER UPDATE OF {indexed} "
+                 f"ON candidates BEGIN {delete} {insert} END")
+    rebuild_search_index(conn)
+
+
+def _add_list_rewrites(conn):
+    # bumped only when a row leaves the list or its list columns change,
+    # so a cached copy of the list can tell "rows were appended" (read the
+    # new ones) from anything that needs a full reload
+    conn.execute("INSERT INTO meta VALUES ('list_rewrites', 0)")
+    bump = "BEGIN UPDATE meta SET value = value + 1 WHERE key = 'list_rewrites'; END"
+    conn.execute(f"CREATE TRIGGER candidates_rewrites_delete AFTER DELETE ON candidates {bump}")
+    conn.execute(f"CREATE TRIGGER candidates_rewrites_update AFTER UPDATE OF {', '.join(LIST_COLUMNS)} "
+                 f"ON candidates {bump}")
+
+
+def _add_saved_jds(conn):
+    # saved job descriptions (open reqs) and the stored corner of their
+    # candidates x JDs score matrix, see jd_batch.py
+    conn.execute("""
+    CREATE TABLE jds(
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL UNIQUE,
+    text TEXT NOT NULL,
+    created REAL NOT NULL,
+    matched_version INTEGER,
+    match_mode TEXT
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE jd_matches(
+    jd_id INTEGER NOT NULL,
+    candidate_id TEXT NOT NULL,
+    match_percentage INTEGER NOT NULL,
+    score REAL NOT NULL,
+    PRIMARY KEY (jd_id, candidate_id)
+    ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX idx_jd_matches_rank ON jd_matches(jd_id, match_percentage DESC, score DESC)")
+    conn.execute("CREATE INDEX idx_jd_matches_candidate ON jd_matches(candidate_id, match_percentage DESC)")
+    conn.execute("""
+    CREATE TRIGGER candidates_jd_matches_delete AFTER DELETE ON candidates
+    BEGIN
+        DELETE FROM jd_matches WHERE candidate_id = old.id;
+    END
+    """)
+
+
+def _add_minhash(conn):
+    # dedupe.signature() of the resume text, for near-duplicate detection;
+    # NULL until computed for rows stored before it was recorded
+    conn.execute("ALTER TABLE candidates ADD COLUMN minhash BLOB")
+
+
+def _add_content_version(conn):
+    # bumped only when the set of resume texts changes, which is all that
+    # scores depend on; background writes (re-parse stamps, signatures)
+    # leave it alone. Starts at data_version so JDs matched before this
+    # migration still count as current if nothing changed since.
+    conn.execute("INSERT INTO meta SELECT 'content_version', value FROM meta WHERE key = 'data_version'")
+    bump = "BEGIN UPDATE meta SET value = value + 1 WHERE key = 'content_version'; END"
+    conn.execute(f"CREATE TRIGGER candidates_content_insert AFTER INSERT ON candidates {bump}")
+    conn.execute(f"CREATE TRIGGER candidates_content_delete AFTER DELETE ON candidates {bump}")
+    conn.execute(f"CREATE TRIGGER candidates_content_update AFTER UPDATE OF content_z ON candidates {bump}")
+
+
+def _drop_score_cache(conn):
+    # each JD's RankedIndex (ranking.py) scores every candidate faster than
+    # the persisted scores could be read back
+    conn.execute("DROP TABLE score_cache")
+
+
+# Applied in order; PRAGMA user_version records how many have run.
+MIGRATIONS = [
+    _create_candidates,
+    _add_content_hash,
+    _add_data_version,
+    _add_fts,
+    _add_term_index,
+    _add_score_cache,
+    _add_candidate_skills,
+    _add_extractor,
+    _add_ingest_jobs,
+    _add_parser_version,
+    _compress_content,
+    _add_list_rewrites,
+    _add_saved_jds,
+    _add_minhash,
+    _add_content_version,
+    _drop_score_cache,
+]
+
+
+def init_schema(conn):
+    """Bring the schema up to date.
+
+    Each migration runs in its own transaction, and ``user_version`` is
+    read again once that transaction holds the write lock, so
+    connections opening the database at the same time never apply a
+    migration twice.
+    """
+    while conn.execute("PRAGMA user_version").fetchone()[0] < len(MIGRATIONS):
+        # explicit BEGIN: sqlite3 would otherwise autocommit each DDL
+        # statement; IMMEDIATE takes the write lock before the version is read
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < len(MIGRATIONS):
+                MIGRATIONS[version](conn)
+                conn.execute(f"PRAGMA user_version={version + 1}")
+        except Exception:
+            conn.rollback()
+            raise
+        conn.commit()
+
+
+def connect(path=DB_PATH):
+    """Open a tuned connection and make sure the schema exists"""
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.create_function("unz", 1, decompress_text, deterministic=True)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    init_schema(conn)
+    return conn
+
+
+def ids_by_hash(conn, hashes):
+    """``{content_hash: candidate id}`` for the ``hashes`` already stored"""
+    hashes = list(hashes)
+    found = {}
+    # stay under SQLite's bound-parameter limit
+    for start in range(0, len(hashes), 500):
+        chunk = hashes[start:start + 500]
+        found.update(conn.execute(
+            f"SELECT content_hash, id FROM candidates WHERE content_hash IN ({','.join('?' * len(chunk))})",
+            chunk,
+        ))
+    return found
+
+
+def existing_hashes(conn, hashes):
+    """Return the subset of ``hashes`` already stored"""
+    return set(ids_by_hash(conn, hashes))
+
+
+def content_hashes(conn, ids):
+    """The set of ``content_hash`` values of the candidates ``ids``"""
+    ids = list(ids)
+    found = set()
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        found.update(row[0] for row in conn.execute(
+            f"SELECT content_hash FROM candidates WHERE id IN ({','.join('?' * len(chunk))}) "
+            "AND content_hash IS NOT NULL",
+            chunk,
+        ))
+    return found
+
+
+@perf.timed("db.data_version")
+def data_version(conn):
+    """Counter that changes whenever the candidates table is written"""
+    return conn.execute("SELECT value FROM meta WHERE key = 'data_version'").fetchone()[0]
+
+
+def content_version(conn):
+    """Counter that changes only when candidates are added, removed or get new text"""
+    return conn.execute("SELECT value FROM meta WHERE key = 'content_version'").fetchone()[0]
+
+
+def list_versions(conn):
+    """``(data_version, list_rewrites)`` read together"""
+    rows = dict(conn.execute("SELECT key, value FROM meta WHERE key IN ('data_version', 'list_rewrites')"))
+    return rows["data_version"], rows["list_rewrites"]
+
+
+def has_search_index(conn):
+    """True when the FTS5 index exists (SQLite was built with FTS5)"""
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'candidates_fts'"
+    ).fetchone() is not None
+
+
+def rebuild_search_index(conn):
+    """Re-derive the FTS5 index from the candidates table"""
+    conn.execute("INSERT INTO candidates_fts(candidates_fts) VALUES ('rebuild')")
+
+
+def _match_terms(value, prefix=True):
+    """FTS5 query requiring every word of ``value``, quoted so user input
+    can never be parsed as query syntax"""
+    star = "*" if prefix else ""
+    return " AND ".join(f'"{word}"{star}' for word in re.findall(r"\w+", value.lower()))
+
+
+def _like(value):
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+# text filter -> (candidates column, FTS word-prefix match)
+FILTER_COLUMNS = {"name": ("name", True), "email": ("email", True), "body": ("content", False)}
+# what the LIKE fallback scans when a column is not stored as is
+LIKE_EXPRESSIONS = {"body": "unz(content_z)"}
+
+
+def _filter_clause(conn, skills=(), **filters):
+    """WHERE clause for the sidebar filters.
+
+    With the FTS5 index the text filters become one indexed MATCH (words
+    are matched by prefix, the resume body by whole word); otherwise each
+    is a case-insensitive LIKE scan. ``skills`` requires all of the given
+    skills, via the candidate_skills index.
+    """
+    conditions = []
+    params = []
+
+    active = {key: value for key, value in filters.items() if value and value.strip()}
+    if active and has_search_index(conn):
+        parts = []
+        for key, value in active.items():
+            column, prefix = FILTER_COLUMNS[key]
+            terms = _match_terms(value, prefix)
+            if not terms:
+                # nothing searchable (e.g. only punctuation) matches nothing
+                return "WHERE 0", []
+            parts.append(f"{column} : ({terms})")
+        conditions.append("rowid IN (SELECT rowid FROM candidates_fts WHERE candidates_fts MATCH ?)")
+        params.append(" AND ".join(parts))
+    else:
+        for key, value in active.items():
+            column = LIKE_EXPRESSIONS.get(key, FILTER_COLUMNS[key][0])
+            conditions.append(f"{column} LIKE ? ESCAPE '\\'")
+            params.append(_like(value))
+
+    skills = sorted({skill for skill in skills if skill})
+    if skills:
+        conditions.append(
+            f"id IN (SELECT candidate_id FROM candidate_skills WHERE skill IN "
+            f"({','.join('?' * len(skills))}) GROUP BY candidate_id HAVING COUNT(*) = ?)"
+        )
+        params += [*skills, len(skills)]
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return where, params
+
+
+@perf.timed("db.count_candidates")
+def count_candidates(conn, **filters):
+    """Number of candidates matching the filters"""
+    where, params = _filter_clause(conn, **filters)
+    return conn.execute(f"SELECT COUNT(*) FROM candidates {where}", params).fetchone()[0]
+
+
+@perf.timed("db.list_candidates")
+def list_candidates(conn, limit=None, offset=0, **filters):
+    """List-column rows matching the filters, in upload order"""
+    where, params = _filter_clause(conn, **filters)
+    sql = f"SELECT {','.join(LIST_COLUMNS)} FROM candidates {where} ORDER BY rowid"
+    if limit is not None:
+        sql += " LIMIT ? OFFSET ?"
+        params += [limit, offset]
+    return conn.execute(sql, params).fetchall()
+
+
+def iter_list_candidates(conn, batch_size=DEFAULT_BATCH_SIZE, **filters):
+    """Like ``list_candidates`` without a limit, streamed in batches"""
+    where, params = _filter_clause(conn, **filters)
+    cursor = conn.execute(f"SELECT {','.join(LIST_COLUMNS)} FROM candidates {where} ORDER BY rowid", params)
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        yield from rows
+
+
+@perf.timed("db.filter_candidate_ids")
+def filter_candidate_ids(conn, **filters):
+    """Ids of candidates matching the filters, in upload order"""
+    where, params = _filter_clause(conn, **filters)
+    rows = conn.execute(f"SELECT id FROM candidates {where} ORDER BY rowid", params)
+    return [row[0] for row in rows]
+
+
+@perf.timed("db.fetch_candidates")
+def fetch_candidates(conn, ids):
+    """List-column rows for ``ids``, returned in the same order"""
+    ids = list(ids)
+    by_id = {}
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        rows = conn.execute(
+            f"SELECT {','.join(LIST_COLUMNS)} FROM candidates WHERE id IN ({','.join('?' * len(chunk))})",
+            chunk,
+        )
+        by_id.update((row[0], row) for row in rows)
+    return [by_id[i] for i in ids if i in by_id]
+
+
+@perf.timed("db.get_candidate")
+def get_candidate(conn, candidate_id):
+    """Full record, including the decompressed ``content``, as a dict; None if missing"""
+    row = conn.execute(
+        f"SELECT {','.join(STORED_COLUMNS)} FROM candidates WHERE id = ?", (candidate_id,)
+    ).fetchone()
+    if row is None:
+        return None
+    record = dict(zip(CANDIDATE_COLUMNS, row))
+    record["content"] = decompress_text(record["content"])
+    return record
+
+
+def iter_candidate_texts(conn):
+    """Yield ``(id, skills, content)`` without materializing the table"""
+    for candidate_id, skills, content in conn.execute("SELECT id, skills, content_z FROM candidates"):
+        yield candidate_id, skills, decompress_text(content)
+
+
+def _term_ids(conn, terms):
+    """Vocabulary ids for ``terms``, adding the ones not seen before"""
+    terms = list(terms)
+    conn.executemany("INSERT OR IGNORE INTO terms(term) VALUES (?)", ((t,) for t in terms))
+    ids = {}
+    for start in range(0, len(terms), 500):
+        chunk = terms[start:start + 500]
+        rows = conn.execute(
+            f"SELECT term, id FROM terms WHERE term IN ({','.join('?' * len(chunk))})", chunk
+        )
+        ids.update(rows)
+    return ids
+
+
+def index_terms(conn, docs):
+    """Add ``(candidate_id, term_counts)`` pairs to the term index"""
+    docs = list(docs)
+    if not docs:
+        return
+    rowids = {}
+    for start in range(0, len(docs), 500):
+        chunk = [candidate_id for candidate_id, _ in docs[start:start + 500]]
+        rowids.update(conn.execute(
+            f"SELECT id, rowid FROM candidates WHERE id IN ({','.join('?' * len(chunk))})", chunk
+        ))
+    term_ids = _term_ids(conn, set().union(*(counts.keys() for _, counts in docs)))
+    conn.executemany(
+        "INSERT INTO candidate_terms(term_id, doc, tf) VALUES (?,?,?)",
+        ((term_ids[term], rowids[candidate_id], tf)
+         for candidate_id, counts in docs for term, tf in counts.items()),
+    )
+
+
+def rebuild_term_index(conn, batch_size=DEFAULT_BATCH_SIZE, text="unz(content_z)"):
+    """Re-tokenize every stored resume into the term index"""
+    conn.execute("DELETE FROM candidate_terms")
+    cursor = conn.execute(f"SELECT id, {text} FROM candidates")
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        index_terms(conn, [(candidate_id, term_counts(content)) for candidate_id, content in rows])
+
+
+def set_candidate_skills(conn, candidate_id, skills):
+    """Replace a candidate's rows in candidate_skills"""
+    conn.execute("DELETE FROM candidate_skills WHERE candidate_id = ?", (candidate_id,))
+    conn.executemany("INSERT OR IGNORE INTO candidate_skills VALUES (?,?)",
+                     ((candidate_id, skill) for skill in skills))
+
+
+def skill_names(conn):
+    """Every distinct skill stored, alphabetically"""
+    return [row[0] for row in conn.execute("SELECT DISTINCT skill FROM candidate_skills ORDER BY skill")]
+
+
+@perf.timed("db.skill_facets")
+def skill_facets(conn, limit=None, **filters):
+    """``(skill, candidates)`` counts over the filtered candidates, most common first.
+
+    For an arbitrary id set (a JD's min-match cut) see
+    ``candidate_store.Snapshot.skill_counts``.
+    """
+    where, params = _filter_clause(conn, **filters)
+    scope = f"SELECT id FROM candidates {where}"
+    sql = (f"SELECT skill, COUNT(*) FROM candidate_skills WHERE candidate_id IN ({scope}) "
+           f"GROUP BY skill ORDER BY COUNT(*) DESC, skill")
+    if limit is not None:
+        sql += " LIMIT ?"
+        params = [*params, limit]
+    return conn.execute(sql, params).fetchall()
+
+
+def count_term_matches(conn, terms):
+    """Number of ``terms`` present in each candidate, by candidate id"""
+    terms = list(terms)
+    if not terms:
+        return {}
+    rows = conn.execute(f"""
+    SELECT c.id, COUNT(*) FROM candidate_terms ct
+    JOIN candidates c ON c.rowid = ct.doc
+    WHERE ct.term_id IN (SELECT id FROM terms WHERE term IN ({','.join('?' * len(terms))}))
+    GROUP BY ct.doc
+    """, terms)
+    return dict(rows)
+
+
+@perf.timed("db.match_scores")
+def match_scores(conn, jd_text):
+    """Match % per candidate id, for candidates with a non-zero score.
+
+    Same formula as ``matching.calculate_match_percentage`` (keywords
+    longer than two characters found / all JD keywords), computed from
+    the term index. Keywords must match whole tokens, so "java" no
+    longer matches "javascript".
+    """
+    keywords = jd_keywords_of(jd_text) if jd_text else set()
+    searchable = [keyword for keyword in keywords if len(keyword) > 2]
+    return {
+        candidate_id: match_percentage(matches, len(keywords))
+        for candidate_id, matches in count_term_matches(conn, searchable).items()
+    }
+
+
+def save_jd(conn, title, text):
+    """Add a saved JD, or replace the text of the one with this title; returns its id"""
+    conn.execute("""
+    INSERT INTO jds(title, text, created) VALUES (?,?,?)
+    ON CONFLICT(title) DO UPDATE SET text = excluded.text, matched_version = NULL
+    """, (title, text, time.time()))
+    jd_id = conn.execute("SELECT id FROM jds WHERE title = ?", (title,)).fetchone()[0]
+    # matches for the old text are no longer valid
+    conn.execute("DELETE FROM jd_matches WHERE jd_id = ?", (jd_id,))
+    return jd_id
+
+
+def list_jds(conn):
+    """``(id, title, text, matched_version, match_mode)`` of every saved JD, by title"""
+    return conn.execute(
+        "SELECT id, title, text, matched_version, match_mode FROM jds ORDER BY title"
+    ).fetchall()
+
+
+def delete_jd(conn, jd_id):
+    conn.execute("DELETE FROM jd_matches WHERE jd_id = ?", (jd_id,))
+    conn.execute("DELETE FROM jds WHERE id = ?", (jd_id,))
+
+
+def replace_jd_matches(conn, jd_ids, rows, version, mode):
+    """Replace the stored matches of ``jd_ids`` with ``(jd_id, candidate_id, match %, score)`` rows"""
+    conn.executemany("DELETE FROM jd_matches WHERE jd_id = ?", ((jd_id,) for jd_id in jd_ids))
+    conn.executemany("INSERT INTO jd_matches VALUES (?,?,?,?)", rows)
+    conn.executemany("UPDATE jds SET matched_version = ?, match_mode = ? WHERE id = ?",
+                     ((version, mode, jd_id) for jd_id in jd_ids))
+
+
+def top_candidates_for_jd(conn, jd_id, limit):
+    """``(id, name, email, match %, score)`` of a saved JD's best stored matches above 0%"""
+    return conn.execute("""
+    SELECT c.id, c.name, c.email, m.match_percentage, m.score FROM jd_matches m
+    JOIN candidates c ON c.id = m.candidate_id
+    WHERE m.jd_id = ? AND m.match_percentage > 0
+    ORDER BY m.match_percentage DESC, m.score DESC LIMIT ?
+    """, (jd_id, limit)).fetchall()
+
+
+def best_jds_for(conn, candidate_id, limit):
+    """``(jd id, title, match %)`` of the saved JDs a candidate matches best, above 0%"""
+    return conn.execute("""
+    SELECT j.id, j.title, m.match_percentage FROM jd_matches m
+    JOIN jds j ON j.id = m.jd_id
+    WHERE m.candidate_id = ? AND m.match_percentage > 0
+    ORDER BY m.match_percentage DESC, m.score DESC LIMIT ?
+    """, (candidate_id, limit)).fetchall()
+
+
+def _stored(row):
+    # a CANDIDATE_COLUMNS row as INSERT_CANDIDATE takes it
+    return (*row[:CONTENT], compress_text(row[CONTENT]), *row[CONTENT + 1:])
+
+
+class CandidateWriter:
+    """Accumulates candidate rows and writes them in batches.
+
+    Each flush is one ``executemany`` inside one transaction, so a bulk
+    upload pays for one commit per batch instead of one per file.
+    """
+
+    def __init__(self, conn, batch_size=DEFAULT_BATCH_SIZE):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.pending = []
+        self.written = 0
+        self.failed = 0
+        self.duplicates = 0
+
+    def add(self, row, terms=None):
+        """Queue a row in CANDIDATE_COLUMNS order; flushes when the batch is full.
+
+        ``terms`` are the resume's term counts; they are computed from the
+        content when not supplied (ingest workers pass them precomputed).
+        """
+        self.pending.append((row, terms))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    @perf.timed("db.write_batch")
+    def flush(self):
+        """Write all queued rows and return how many were written.
+
+        Rows rejected by the unique content_hash index are counted in
+        ``duplicates`` rather than failing the batch.
+        """
+        if not self.pending:
+            return 0
+        batch, self.pending = self.pending, []
+        try:
+            try:
+                with self.conn:
+                    self.conn.executemany(INSERT_CANDIDATE, [_stored(row) for row, _ in batch])
+                    self._index(batch)
+                inserted = batch
+            except sqlite3.IntegrityError:
+                # a duplicate content_hash slipped past the pre-check (e.g. two
+                # sessions uploading the same file); retry row by row so only
+                # the duplicates are dropped
+                inserted = self._insert_each(batch)
+        except sqlite3.Error:
+            self.failed += len(batch)
+            raise
+        self.duplicates += len(batch) - len(inserted)
+        self.written += len(inserted)
+        return len(inserted)
+
+    def _insert_each(self, batch):
+        inserted = []
+        with self.conn:
+            for row, terms in batch:
+                try:
+                    self.conn.execute(INSERT_CANDIDATE, _stored(row))
+                    inserted.append((row, terms))
+                except sqlite3.IntegrityError:
+                    pass
+            self._index(inserted)
+        return inserted
+
+    def _index(self, batch):
+        skills = CANDIDATE_COLUMNS.index("skills")
+        index_terms(self.conn, [
+            (row[0], terms if terms is not None else term_counts(row[CONTENT]))
+            for row, terms in batch
+        ])
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO candidate_skills VALUES (?,?)",
+            ((row[0], skill) for row, _ in batch for skill in split_skills(row[skills])),
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
@@ -0,0 +1,221 @@
+"""Near-duplicate candidates: MinHash signatures and an LSH index.
+
+The same person is often uploaded again with a slightly edited resume
+(another file, so another ``content_hash`` and id). Each resume gets a
+MinHash signature of its word 3-shingles at ingest, stored in
+``candidates.minhash``: two signatures agree at a position with
+probability equal to the Jaccard similarity of the two shingle sets.
+The LSH index cuts signatures into ``BANDS`` bands of ``ROWS`` values
+and buckets candidates by band, so only candidates sharing a whole band
+are compared, instead of every pair. Pairs estimated at ``THRESHOLD``
+similarity or more are joined into clusters.
+
+With 20 bands of 6, pairs at 0.8 similarity share a band with
+probability 0.998, pairs at 0.3 with 0.015.
+"""
+import hashlib
+import itertools
+import zlib
+from dataclasses import dataclass
+
+import numpy as np
+
+import db
+import perf
+from matching import TOKEN_RE
+
+SHINGLE = 3
+BANDS = 20
+ROWS = 6
+NUM_PERM = BANDS * ROWS
+THRESHOLD = 0.8
+
+# buckets bigger than this (boilerplate shared by many resumes) are only
+# compared against their first member
+MAX_BUCKET = 50
+
+# multiply-shift hash functions; fixed so stored signatures stay comparable
+_SEEDS = np.frombuffer(
+    b"".join(hashlib.blake2b(f"minhash {n}".encode(), digest_size=16).digest() for n in range(NUM_PERM)),
+    dtype="<u8",
+).reshape(NUM_PERM, 2)
+_A = _SEEDS[:, 0] | np.uint64(1)
+_B = _SEEDS[:, 1]
+_BAND_MIX = np.frombuffer(hashlib.blake2b(b"lsh bands", digest_size=8 * ROWS).digest(), dtype="<u8")
+_BAND_MIX = _BAND_MIX | np.uint64(1)
+
+
+def shingle_hashes(text):
+    """CRC32 of each distinct run of SHINGLE words (the whole text if shorter)"""
+    tokens = TOKEN_RE.findall(text.lower()) if text else []
+    if len(tokens) <= SHINGLE:
+        shingles = {" ".join(tokens)} if tokens else set()
+    else:
+        shingles = {" ".join(tokens[n:n + SHINGLE]) for n in range(len(tokens) - SHINGLE + 1)}
+    return np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+
+@perf.timed("dedupe.signature")
+def signature(text):
+    """MinHash signature of ``text`` as stored (NUM_PERM little-endian uint32); None for empty text"""
+    hashes = shingle_hashes(text)
+    if not len(hashes):
+        return None
+    # (a * x + b) mod 2**64, top 32 bits: uint64 arithmetic wraps
+    permuted = (hashes[:, None] * _A + _B) >> np.uint64(32)
+    return permuted.min(axis=0).astype("<u4").tobytes()
+
+
+def signature_matrix(blobs):
+    """Stored signatures as an (n, NUM_PERM) uint32 array"""
+    if not blobs:
+        return np.zeros((0, NUM_PERM), dtype=np.uint32)
+    return np.frombuffer(b"".join(blobs), dtype="<u4").reshape(len(blobs), NUM_PERM)
+
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of matching signature rows"""
+    return (a == b).mean(axis=-1)
+
+
+def candidate_pairs(signatures):
+    """``(first, second)`` row pairs sharing at least one LSH band, each pair once"""
+    n = len(signatures)
+    first, second = [], []
+    for band in range(BANDS):
+        rows = signatures[:, band * ROWS:(band + 1) * ROWS].astype(np.uint64)
+        # one key per band; a collision only costs one extra comparison
+        key = (rows * _BAND_MIX).sum(axis=1)
+        order = np.argsort(key, kind="stable")
+        key = key[order]
+        starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+        sizes = np.diff(np.r_[starts, n])
+
+        # most shared buckets are a pair
+        pairs = starts[sizes == 2]
+        first.append(order[pairs])
+        second.append(order[pairs + 1])
+        for start, size in zip(starts[sizes > 2], sizes[sizes > 2]):
+            members = order[start:start + size]
+            if size > MAX_BUCKET:
+                first.append(np.repeat(members[0], size - 1))
+                second.append(members[1:])
+            else:
+                i, j = np.triu_indices(size, 1)
+                first.append(members[i])
+                second.append(members[j])
+
+    if not first:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    first, second = np.concatenate(first), np.concatenate(second)
+    low, high = np.minimum(first, second), np.maximum(first, second)
+    unique = np.unique(low.astype(np.int64) * n + high)
+    return unique // n, unique % n
+
+
+def _root(parent, n):
+    while parent[n] != n:
+        parent[n] = parent[parent[n]]
+        n = parent[n]
+    return n
+
+
+@dataclass
+class DuplicateCluster:
+    """Candidates that look like one person, oldest upload first"""
+    ids: list
+    # estimated similarity of each candidate to the first one
+    similarity: list
+
+
+@perf.timed("dedupe.clusters")
+def build_clusters(ids, signatures, threshold=THRESHOLD):
+    """DuplicateClusters among ``ids`` (in upload order), largest first"""
+    first, second = candidate_pairs(signatures)
+    scores = similarity(signatures[first], signatures[second]) if len(first) else np.zeros(0)
+    similar = scores >= threshold
+    parent = list(range(len(ids)))
+    for a, b in zip(first[similar].tolist(), second[similar].tolist()):
+        root_a, root_b = _root(parent, a), _root(parent, b)
+        if root_a != root_b:
+            parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    members = {}
+    for n in np.unique(np.r_[first[similar], second[similar]]).tolist():
+        members.setdefault(_root(parent, n), []).append(n)
+    clusters = []
+    for rows in members.values():
+        rows.sort()
+        estimated = similarity(signatures[rows[0]], signatures[rows])
+        clusters.append(DuplicateCluster([ids[n] for n in rows], estimated.round(2).tolist()))
+    clusters.sort(key=lambda cluster: -len(cluster.ids))
+    return clusters
+
+
+def fill_signatures(conn, writer=None, batch_size=db.DEFAULT_BATCH_SIZE, max_batches=None):
+    """Compute signatures for rows stored without one; returns how many.
+
+    ``writer`` is a context manager yielding a connection inside a
+    transaction (default: ``conn`` itself), such as ``CandidateStore.writing``.
+    """
+    filled = 0
+    last = 0
+    for _ in itertools.count() if max_batches is None else range(max_batches):
+        rows = conn.execute(
+            "SELECT rowid, content_z FROM candidates WHERE minhash IS NULL AND rowid > ? "
+            "ORDER BY rowid LIMIT ?", (last, batch_size)
+        ).fetchall()
+        if not rows:
+            return filled
+        last = rows[-1][0]
+        # rows without text get an empty value, so they are not read again
+        signed = [(signature(db.decompress_text(content)) or b"", rowid) for rowid, content in rows]
+        with (writer() if writer else conn) as write_conn:
+            write_conn.executemany("UPDATE candidates SET minhash = ? WHERE rowid = ?", signed)
+        filled += len(signed)
+    return filled
+
+
+def unsigned_count(conn):
+    """Candidates still waiting for ``fill_signatures``"""
+    return conn.execute("SELECT COUNT(*) FROM candidates WHERE minhash IS NULL").fetchone()[0]
+
+
+def find_clusters(conn, threshold=THRESHOLD):
+    """Clusters of near-duplicate candidates among those with a signature"""
+    rows = [(candidate_id, blob) for candidate_id, blob in
+            conn.execute("SELECT id, minhash FROM candidates ORDER BY rowid")
+            if blob is not None and len(blob) == NUM_PERM * 4]
+    ids = [candidate_id for candidate_id, _ in rows]
+    return build_clusters(ids, signature_matrix([blob for _, blob in rows]), threshold)
+
+
+def merge_candidates(conn, keep_id, other_ids):
+    """Fold ``other_ids`` into ``keep_id`` and delete them.
+
+    The kept record gains the others' skills and any email, phone or
+    experience it lacks. A later re-parse (see ``reparse``) re-derives
+    its fields from its own resume text only. Returns the content hashes
+    of the deleted rows, for ``BlobStore.delete_unused`` once committed.
+    """
+    rows = {row[0]: row for row in db.fetch_candidates(conn, [keep_id, *other_ids])}
+    if keep_id not in rows:
+        return set()
+    merged = dict(zip(db.LIST_COLUMNS, rows[keep_id]))
+    skills = db.split_skills(merged["skills"])
+    for other in (rows[i] for i in other_ids if i in rows):
+        other = dict(zip(db.LIST_COLUMNS, other))
+        for column in ("email", "phone", "experience"):
+            merged[column] = merged[column] or other[column]
+        skills += [skill for skill in db.split_skills(other["skills"]) if skill not in skills]
+    merged["skills"] = ", ".join(skills) if skills else merged["skills"]
+
+    conn.execute(
+        "UPDATE candidates SET email = ?, phone = ?, experience = ?, skills = ? WHERE id = ?",
+        (merged["email"], merged["phone"], merged["experience"], merged["skills"], keep_id),
+    )
+    db.set_candidate_skills(conn, keep_id, skills)
+    removed = [i for i in other_ids if i != keep_id]
+    hashes = db.content_hashes(conn, removed)
+    conn.executemany("DELETE FROM candidates WHERE id = ?", ((i,) for i in removed))
+    return hashes
@@ -0,0 +1,149 @@
+"""Streaming CSV / XLSX export of candidate rows.
+
+Rows are consumed from an iterator and written straight to a file:
+CSV in row chunks, XLSX through a constant-memory writer (openpyxl's
+write-only mode, or xlsxwriter's ``constant_memory``). Neither a
+DataFrame nor an in-memory copy of the file is ever built, so exporting
+100k candidates costs one file on disk. ``ExportCache`` keeps recent
+exports keyed by what produced them and only builds one on request.
+"""
+import csv
+import hashlib
+import os
+import tempfile
+from itertools import islice
+
+HEADER = ("Name", "Email", "Phone", "Experience", "Skills", "Match %")
+
+# "openpyxl" (write-only mode) or "xlsxwriter" (constant_memory mode)
+XLSX_ENGINE = os.environ.get("RESUME_XLSX_ENGINE", "openpyxl")
+
+# name prefix of exports still being written
+PARTIAL_PREFIX = "partial-"
+
+FORMATS = {
+    "csv": ("text/csv", "filtered_candidates.csv"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+             "filtered_candidates.xlsx"),
+}
+
+
+class ExportError(Exception):
+    """The export could not be written (e.g. the XLSX engine is missing)"""
+
+
+def write_csv(rows, path, chunk_rows=1000):
+    """Write HEADER and ``rows`` to a UTF-8 CSV at ``path``"""
+    rows = iter(rows)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        while True:
+            chunk = list(islice(rows, chunk_rows))
+            if not chunk:
+                break
+            writer.writerows(chunk)
+
+
+def _write_openpyxl(rows, path):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Candidates")
+    sheet.append(HEADER)
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+
+
+def _write_xlsxwriter(rows, path):
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+    sheet = workbook.add_worksheet("Candidates")
+    sheet.write_row(0, 0, HEADER)
+    for number, row in enumerate(rows, start=1):
+        sheet.write_row(number, 0, row)
+    workbook.close()
+
+
+XLSX_WRITERS = {"openpyxl": _write_openpyxl, "xlsxwriter": _write_xlsxwriter}
+
+
+def write_xlsx(rows, path, engine=None):
+    """Write HEADER and ``rows`` to an XLSX workbook at ``path``"""
+    engine = engine or XLSX_ENGINE
+    if engine not in XLSX_WRITERS:
+        raise ExportError(f"unknown XLSX engine {engine!r}; choose one of {', '.join(XLSX_WRITERS)}")
+    try:
+        XLSX_WRITERS[engine](rows, path)
+    except ImportError as e:
+        raise ExportError(f"XLSX engine {engine!r} is not installed") from e
+
+
+WRITERS = {"csv": write_csv, "xlsx": write_xlsx}
+
+
+def export_key(*parts):
+    """Stable cache key for whatever determines an export's contents"""
+    return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()
+
+
+class ExportCache:
+    """Finished export files on disk, newest ``max_files`` kept.
+
+    Keys only describe the export (data version, filters, JD), so each
+    database needs its own directory; see ``for_database``.
+    """
+
+    def __init__(self, directory, max_files=8):
+        self.directory = directory
+        self.max_files = max_files
+        os.makedirs(self.directory, exist_ok=True)
+
+    @classmethod
+    def for_database(cls, db_path, max_files=8):
+        """Cache for exports of the database at ``db_path``, under the temp directory"""
+        digest = hashlib.sha256(os.path.abspath(db_path).encode("utf-8")).hexdigest()[:16]
+        return cls(os.path.join(tempfile.gettempdir(), "resume-exports", digest), max_files)
+
+    def path(self, key, fmt):
+        return os.path.join(self.directory, f"{key}.{fmt}")
+
+    def get(self, key, fmt):
+        """Path of the cached export, or None if it has not been built"""
+        path = self.path(key, fmt)
+        return path if os.path.exists(path) else None
+
+    def build(self, key, fmt, rows):
+        """Write ``rows`` as ``fmt`` and return the file's path"""
+        path = self.path(key, fmt)
+        # written under a temporary name so a half-built file is never served
+        fd, partial = tempfile.mkstemp(prefix=PARTIAL_PREFIX, suffix=f".{fmt}", dir=self.directory)
+        os.close(fd)
+        try:
+            WRITERS[fmt](rows, partial)
+            os.replace(partial, path)
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+        self._prune()
+        return path
+
+    def _prune(self):
+        # files other sessions are still writing are theirs to rename or remove
+        finished = []
+        for name in os.listdir(self.directory):
+            if name.startswith(PARTIAL_PREFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                finished.append((os.path.getmtime(path), path))
+            except OSError:
+                pass  # pruned by another session meanwhile
+        finished.sort(reverse=True)
+        for _, stale in finished[self.max_files:]:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
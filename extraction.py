@@ -0,0 +1,214 @@
+"""Text extraction for uploaded resumes (PDF and DOCX).
+
+Kept free of Streamlit so it can run inside ingestion worker processes.
+PDF pages are streamed one at a time and released as soon as their text
+is read, and every file is held to ``ExtractionLimits`` so one huge
+portfolio cannot exhaust memory or stall a batch.
+
+Each format has a chain of backends tried cheapest first: PDFs go
+through the raw content-stream reader in ``pdf_text`` and only fall
+back to pdfplumber's layout analysis when that output is empty or
+garbled.
+"""
+import os
+import signal
+import threading
+import time
+from contextlib import closing, contextmanager
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Callable, Optional
+
+import pdfplumber
+from docx import Document
+
+import perf
+from pdf_text import is_plausible_text, iter_raw_pdf_text
+
+
+def _env_int(name, default):
+    value = os.environ.get(name, "")
+    return int(value) if value.isdigit() else default
+
+
+@dataclass(frozen=True)
+class ExtractionLimits:
+    """Per-file caps; pages and characters beyond a cap are dropped"""
+    max_pages: int = _env_int("RESUME_MAX_PAGES", 50)
+    max_bytes: int = _env_int("RESUME_MAX_FILE_BYTES", 20 * 1024 * 1024)
+    max_chars: int = _env_int("RESUME_MAX_TEXT_CHARS", 500_000)
+    timeout: float = _env_int("RESUME_EXTRACT_TIMEOUT", 60)
+
+
+DEFAULT_LIMITS = ExtractionLimits()
+
+
+class ExtractionError(Exception):
+    """The file could not be extracted within the limits"""
+
+
+class ExtractionTimeout(ExtractionError):
+    pass
+
+
+@contextmanager
+def _deadline(seconds):
+    """Yield a function that raises ExtractionTimeout once ``seconds`` pass.
+
+    The check runs between pages; on the main thread of a Unix process
+    (ingest pool workers) a SIGALRM additionally interrupts a single
+    page that hangs inside pdfminer.
+    """
+    expires = time.monotonic() + seconds
+
+    def check():
+        if time.monotonic() > expires:
+            raise ExtractionTimeout(f"extraction took longer than {seconds:g}s")
+
+    use_alarm = hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+    if not use_alarm:
+        yield check
+        return
+
+    def on_alarm(signum, frame):
+        raise ExtractionTimeout(f"extraction took longer than {seconds:g}s")
+
+    previous = signal.signal(signal.SIGALRM, on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield check
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _file_size(file):
+    position = file.tell()
+    file.seek(0, os.SEEK_END)
+    size = file.tell()
+    file.seek(position)
+    return size
+
+
+def iter_pdf_pages(file, limits=DEFAULT_LIMITS, check=None):
+    """Yield the text of each PDF page, releasing the page afterwards.
+
+    Only the first ``limits.max_pages`` pages are parsed at all.
+    """
+    with pdfplumber.open(file, pages=range(1, limits.max_pages + 1)) as pdf:
+        for page in pdf.pages:
+            if check:
+                check()
+            try:
+                page_text = page.extract_text()
+            except Exception as e:
+                # pdfplumber re-wraps errors raised inside pdfminer, the alarm included
+                if isinstance(e.__context__, ExtractionTimeout):
+                    raise e.__context__ from None
+                raise
+            finally:
+                page.close()
+            if page_text:
+                yield page_text
+
+
+def iter_docx_paragraphs(file, limits=DEFAULT_LIMITS, check=None):
+    """Yield the text of each DOCX paragraph"""
+    for paragraph in Document(file).paragraphs:
+        if check:
+            check()
+        yield paragraph.text
+
+
+def _join_capped(parts, max_chars):
+    """Join text parts with newlines, stopping once ``max_chars`` is reached"""
+    kept = []
+    size = 0
+    for part in parts:
+        kept.append(part)
+        size += len(part) + 1
+        if size >= max_chars:
+            break
+    return "\n".join(kept)[:max_chars]
+
+
+def iter_raw_pdf_pages(file, limits=DEFAULT_LIMITS, check=None):
+    """Yield PDF text read straight from the content streams (see pdf_text)"""
+    yield from iter_raw_pdf_text(file.read(), limits.max_pages, check)
+
+
+@dataclass(frozen=True)
+class Backend:
+    """One extractor in a chain.
+
+    ``parts(file, limits, check)`` yields text parts; ``accept(text)``
+    decides whether the joined result is good enough to keep, and None
+    accepts anything.
+    """
+    name: str
+    parts: Callable
+    accept: Optional[Callable] = None
+
+
+PDF_RAW = Backend("pdf-raw", iter_raw_pdf_pages, is_plausible_text)
+PDFPLUMBER = Backend("pdfplumber", iter_pdf_pages)
+PYTHON_DOCX = Backend("python-docx", iter_docx_paragraphs)
+
+# extension -> backends tried in order, cheapest first; the last one's
+# output is kept whatever it looks like
+BACKENDS = {
+    ".pdf": [PDF_RAW, PDFPLUMBER],
+    ".docx": [PYTHON_DOCX],
+}
+if os.environ.get("RESUME_PDF_FAST_PATH", "1") == "0":
+    BACKENDS[".pdf"].remove(PDF_RAW)
+
+
+@perf.timed("extract")
+def extract(file, limits=DEFAULT_LIMITS, backends=None):
+    """Extract text from a PDF or DOCX file-like object.
+
+    Returns ``(text, backend_name)``. ``file`` must expose a ``name``
+    attribute; its extension picks the chain from ``BACKENDS`` unless
+    ``backends`` is given. A backend whose output is rejected, or that
+    fails, hands over to the next one. Errors from the last backend,
+    and ExtractionError for files over the size or time limits,
+    propagate to the caller so it can decide how to report them.
+    """
+    size = _file_size(file)
+    if size > limits.max_bytes:
+        raise ExtractionError(f"file is {size / 1e6:.1f} MB, over the {limits.max_bytes / 1e6:.1f} MB limit")
+
+    if backends is None:
+        backends = BACKENDS.get(os.path.splitext(file.name)[1].lower(), [])
+    if not backends:
+        return "", ""
+
+    start = file.tell()
+    with _deadline(limits.timeout) as check:
+        for backend in backends:
+            last = backend is backends[-1]
+            file.seek(start)
+            try:
+                with perf.timer(f"extract.{backend.name}"), closing(backend.parts(file, limits, check)) as parts:
+                    text = _join_capped(parts, limits.max_chars).strip()
+            except ExtractionError:
+                raise
+            except Exception:
+                if last:
+                    raise
+                continue
+            if last or backend.accept is None or backend.accept(text):
+                return text, backend.name
+
+
+def extract_text(file, limits=DEFAULT_LIMITS):
+    """Text of a PDF or DOCX file-like object; see ``extract``"""
+    return extract(file, limits)[0]
+
+
+def extract_from_bytes(name, data, limits=DEFAULT_LIMITS):
+    """``(text, backend_name)`` for raw uploaded bytes"""
+    buffer = BytesIO(data)
+    buffer.name = name
+    return extract(buffer, limits)
@@ -0,0 +1,228 @@
+"""Headless bulk importer for directories and zip archives.
+
+Walks directories (recursing into any zip archives found there) and zip
+files, reading each resume into memory without extracting anything to
+disk, and runs them through the same parallel ingest pipeline as the
+UI; the originals of stored resumes are kept in the blob store
+(blobstore.py). Rows are written in batches; after each batch commits, the sources
+it covered are appended to a checkpoint file, so an interrupted import
+restarts where it stopped. Files in flight when a pool process crashed
+are retried one at a time at the end of the run; one that crashes the
+pool again on its own is counted as failed but never checkpointed:
+
+    python -m importer dumps/jobboard-2026-10.zip dumps/referrals --workers 8
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+import zipfile
+from collections import Counter
+from contextlib import closing
+
+import db
+from blobstore import BlobStore
+from ingest import IngestPool, content_hash, default_workers, ingest_files
+
+EXTENSIONS = (".pdf", ".docx")
+
+
+def _wanted(name):
+    return name.lower().endswith(EXTENSIONS)
+
+
+def iter_zip(path):
+    """Yield ``(key, name, bytes)`` for resumes inside a zip archive, one member at a time"""
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            if not info.is_dir() and _wanted(info.filename):
+                yield f"{path}::{info.filename}", os.path.basename(info.filename), archive.read(info)
+
+
+def iter_sources(paths):
+    """Yield ``(key, name, bytes)`` for every resume under ``paths``.
+
+    ``key`` identifies the source across runs (absolute path, plus the
+    member name for files inside archives).
+    """
+    for path in paths:
+        path = os.path.abspath(path)
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                dirs.sort()
+                for name in sorted(names):
+                    yield from iter_sources([os.path.join(root, name)])
+        elif path.lower().endswith(".zip"):
+            yield from iter_zip(path)
+        elif _wanted(path):
+            with open(path, "rb") as f:
+                yield path, os.path.basename(path), f.read()
+
+
+class Checkpoint:
+    """Append-only log of source keys whose outcome is committed"""
+
+    def __init__(self, path):
+        self.path = path
+        self.done = set()
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.done.update(line.rstrip("\n") for line in f)
+        self.file = open(path, "a", encoding="utf-8") if path else None
+
+    def __contains__(self, key):
+        return key in self.done
+
+    def add(self, keys):
+        self.done.update(keys)
+        if self.file and keys:
+            self.file.write("".join(f"{key}\n" for key in keys))
+            self.file.flush()
+            os.fsync(self.file.fileno())
+
+    def close(self):
+        if self.file:
+            self.file.close()
+
+
+class ImportStats:
+    """Counters for the throughput report"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.files = 0
+        self.bytes = 0
+        self.stored = 0
+        self.resumed = 0
+        self.failures = Counter()
+
+    def line(self):
+        elapsed = max(time.perf_counter() - self.start, 1e-9)
+        return (f"{self.files} files, {self.bytes / 1e6:.1f} MB in {elapsed:.1f}s | "
+                f"{self.files / elapsed:.1f} files/sec, {self.bytes / 1e6 / elapsed:.2f} MB/sec | "
+                f"{self.stored} stored, {sum(self.failures.values())} not stored")
+
+    def report(self, out=sys.stdout):
+        print(self.line(), file=out)
+        if self.resumed:
+            print(f"skipped {self.resumed} files already imported by an earlier run", file=out)
+        for reason, count in self.failures.most_common():
+            print(f"  {reason:<24} {count:>8}", file=out)
+
+
+def run_import(conn, paths, workers=None, batch_size=db.DEFAULT_BATCH_SIZE, checkpoint=None,
+               progress_every=10.0, out=sys.stderr):
+    """Import every resume under ``paths`` into ``conn`` and return ImportStats"""
+    checkpoint = checkpoint or Checkpoint(None)
+    stats = ImportStats()
+    in_flight = {}
+    # keys whose rows are queued in the writer but not yet committed
+    pending = []
+    seen = set()
+    blobs = BlobStore.for_connection(conn)
+
+    def payloads():
+        # ingest_files numbers inputs in the order they are yielded
+        index = 0
+        for key, name, data in iter_sources(paths):
+            if key in checkpoint:
+                stats.resumed += 1
+                continue
+            stats.files += 1
+            stats.bytes += len(data)
+            digest = content_hash(data)
+            if digest in seen or db.existing_hashes(conn, [digest]):
+                # same bytes as a stored resume: no need to extract them again
+                stats.failures["duplicate"] += 1
+                pending.append(key)
+                continue
+            seen.add(digest)
+            # the bytes are held only until the file's result is back
+            in_flight[index] = (key, digest, data)
+            index += 1
+            yield name, data
+
+    writer = db.CandidateWriter(conn, batch_size=sys.maxsize)
+    last_progress = time.perf_counter()
+    # (key, digest, name, bytes) of files in flight when a pool process crashed
+    crashed = []
+
+    def record(result, key, digest, data):
+        nonlocal last_progress
+        if result.error:
+            stats.failures[result.error_type or "error"] += 1
+        elif not result.text:
+            stats.failures["no text"] += 1
+        else:
+            if blobs:
+                blobs.put(data, digest)
+            writer.add((str(uuid.uuid4()), *result.fields, result.text, digest, result.backend,
+                        result.parser_version, result.minhash), result.terms)
+        pending.append(key)
+
+        if len(writer.pending) >= batch_size:
+            _commit(writer, pending, checkpoint, stats)
+        if progress_every and time.perf_counter() - last_progress >= progress_every:
+            print(stats.line(), file=out)
+            last_progress = time.perf_counter()
+
+    for result in ingest_files(payloads(), workers):
+        key, digest, data = in_flight.pop(result.index)
+        if result.error_type == "BrokenProcessPool":
+            # any file in flight may have taken the process down
+            crashed.append((key, digest, result.name, data))
+        else:
+            record(result, key, digest, data)
+
+    if crashed:
+        # alone in a pool of its own, a file can only crash itself
+        with IngestPool(1) as pool:
+            for key, digest, name, data in crashed:
+                for result in ingest_files([(name, data)], pool=pool):
+                    if result.error_type == "BrokenProcessPool":
+                        # left out of the checkpoint, so a rerun tries it again
+                        stats.failures[result.error_type] += 1
+                    else:
+                        record(result, key, digest, data)
+
+    _commit(writer, pending, checkpoint, stats)
+    return stats
+
+
+def _commit(writer, pending, checkpoint, stats):
+    """Flush the writer, then checkpoint the keys it covered"""
+    stored = writer.flush()
+    stats.stored += stored
+    duplicates, writer.duplicates = writer.duplicates, 0
+    if duplicates:
+        stats.failures["duplicate"] += duplicates
+    checkpoint.add(pending)
+    pending.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-import resumes from directories and zip archives")
+    parser.add_argument("paths", nargs="+", help="directories, zip archives or individual files")
+    parser.add_argument("--db", default=db.DB_PATH)
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--batch-size", type=int, default=db.DEFAULT_BATCH_SIZE)
+    parser.add_argument("--checkpoint", help="checkpoint file (default: <db>.import-checkpoint)")
+    parser.add_argument("--restart", action="store_true", help="ignore and replace an existing checkpoint")
+    args = parser.parse_args()
+
+    checkpoint_path = args.checkpoint or f"{args.db}.import-checkpoint"
+    if args.restart and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    with closing(db.connect(args.db)) as conn, closing(Checkpoint(checkpoint_path)) as checkpoint:
+        try:
+            stats = run_import(conn, args.paths, args.workers, args.batch_size, checkpoint)
+        except KeyboardInterrupt:
+            print(f"interrupted; rerun the same command to resume from {checkpoint_path}", file=sys.stderr)
+            raise SystemExit(130)
+    stats.report()
+
+
+if __name__ == "__main__":
+    main()
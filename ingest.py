@@ -0,0 +1,184 @@
+"""Parallel resume ingestion pipeline.
+
+Fans uploaded files out over a process pool, runs ``extract_text`` and
+``parse_resume`` in the workers and streams per-file results back as they
+complete. The module has no Streamlit dependency so the UI, the
+benchmarks and headless tools all drive the same engine.
+"""
+import hashlib
+import multiprocessing
+import os
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import nullcontext
+from dataclasses import dataclass
+
+import perf
+from dedupe import signature
+from extraction import extract_from_bytes
+from matching import term_counts
+from parsing import parse_resume, parser_version
+
+
+CRASHED = "a worker process crashed while this file was being processed"
+
+
+def default_workers():
+    """Worker count from RESUME_INGEST_WORKERS, else the number of CPUs"""
+    configured = os.environ.get("RESUME_INGEST_WORKERS", "")
+    if configured.isdigit() and int(configured) > 0:
+        return int(configured)
+    return os.cpu_count() or 1
+
+
+def content_hash(data):
+    """Hex SHA-256 of raw uploaded bytes, used to detect re-uploads"""
+    return hashlib.sha256(data).hexdigest()
+
+
+@dataclass
+class IngestResult:
+    """Outcome of processing one uploaded file"""
+    index: int
+    name: str
+    text: str = ""
+    fields: tuple = ()
+    terms: dict = None
+    error: str = ""
+    backend: str = ""
+    error_type: str = ""
+    timings: dict = None
+    parser_version: str = ""
+    minhash: bytes = None
+
+    @property
+    def ok(self):
+        return bool(self.text) and not self.error
+
+
+def process_file(index, name, data):
+    """Extract, parse, tokenize and sign a single file; never raises"""
+    try:
+        text, backend = extract_from_bytes(name, data)
+        fields = parse_resume(text) if text else ()
+        result = IngestResult(index, name, text, fields, term_counts(text), backend=backend,
+                              parser_version=parser_version(), minhash=signature(text))
+    except Exception as e:
+        result = IngestResult(index, name, error=str(e) or type(e).__name__, error_type=type(e).__name__)
+    if perf.enabled():
+        # the worker's stage timings travel back with the result
+        result.timings = perf.REGISTRY.take()
+    return result
+
+
+def _collect(result):
+    if result.timings:
+        perf.REGISTRY.merge(result.timings)
+    return result
+
+
+class IngestPool:
+    """Spawn process pool for ``ingest_files``, started on first use.
+
+    Spawned workers take about a second to start, so a long-running
+    caller (the queue worker) keeps one pool for all its batches.
+    ``restart`` drops a pool broken by a crashed child; the next call
+    starts a fresh one.
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.executor = None
+
+    def _started(self):
+        if self.executor is None:
+            # spawn rather than fork: the Streamlit server is multi-threaded
+            self.executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                mp_context=multiprocessing.get_context("spawn"))
+        return self.executor
+
+    def submit(self, fn, *args):
+        return self._started().submit(fn, *args)
+
+    def map(self, fn, *iterables):
+        return self._started().map(fn, *iterables)
+
+    def restart(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _settle(pool, in_flight, return_when=ALL_COMPLETED):
+    """Yield results of finished futures, removing them from ``in_flight``.
+
+    When a child process dies the executor fails every file still in
+    flight with BrokenProcessPool; those are reported as failed and the
+    pool is restarted, so the files after them are still processed.
+    """
+    done, _ = wait(in_flight, return_when=return_when)
+    broken = any(isinstance(future.exception(), BrokenProcessPool) for future in done)
+    if broken:
+        done, _ = wait(in_flight)
+    for future in done:
+        index, name = in_flight.pop(future)
+        try:
+            yield _collect(future.result())
+        except BrokenProcessPool:
+            yield IngestResult(index, name, error=CRASHED, error_type="BrokenProcessPool")
+    if broken:
+        pool.restart()
+
+
+def ingest_files(files, workers=None, max_in_flight=None, pool=None):
+    """Process ``(name, bytes)`` pairs and yield an IngestResult per file.
+
+    Results arrive in completion order; ``result.index`` is the position
+    of the file in the input. With one worker (or a single file and no
+    ``pool``) the files are processed inline, avoiding pool start-up
+    cost. At most ``max_in_flight`` files are submitted at a time so
+    lazily produced inputs are never fully buffered. A file in flight when a worker
+    process crashes comes back with ``error_type`` "BrokenProcessPool".
+    ``pool`` is an IngestPool to use (and leave open) instead of
+    starting one for this call.
+    """
+    workers = pool.workers if pool else workers or default_workers()
+    if not isinstance(files, (list, tuple)):
+        files = iter(files)
+    elif workers > 1 and len(files) <= 1 and pool is None:
+        workers = 1
+
+    if workers <= 1:
+        for index, (name, data) in enumerate(files):
+            yield _collect(process_file(index, name, data))
+        return
+
+    max_in_flight = max_in_flight or workers * 4
+    # future -> (index, name), to report the files a crashed worker takes down
+    in_flight = {}
+    with (nullcontext(pool) if pool else IngestPool(workers)) as pool:
+        for index, (name, data) in enumerate(files):
+            try:
+                future = pool.submit(process_file, index, name, data)
+            except BrokenProcessPool:
+                # a child died since the last wait
+                yield from _settle(pool, in_flight)
+                pool.restart()
+                future = pool.submit(process_file, index, name, data)
+            in_flight[future] = (index, name)
+            if len(in_flight) >= max_in_flight:
+                yield from _settle(pool, in_flight, FIRST_COMPLETED)
+
+        while in_flight:
+            yield from _settle(pool, in_flight, FIRST_COMPLETED)
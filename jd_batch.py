@@ -0,0 +1,93 @@
+"""Batch matching of the saved JDs (open reqs) against every candidate.
+
+``match_saved_jds`` scores the whole corpus against every saved JD in
+one pass (``RankingEngine.score_matrix``) and stores the part of the
+candidates x JDs matrix the UI shows in ``jd_matches``: each JD's top
+``STORED_TOP_K`` candidates and each candidate's best ``BEST_JDS`` JDs.
+The rest of the matrix would only ever be read to be skipped.
+"""
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+import numpy as np
+
+import db
+import perf
+
+# match mode -> label; "substring" scores like calculate_match_percentage
+MODES = {
+    "tokens": "Whole words",
+    "substring": "Substring (legacy)",
+}
+
+STORED_TOP_K = 200
+BEST_JDS = 3
+
+
+@dataclass
+class MatrixStats:
+    jds: int
+    candidates: int
+    stored: int
+    seconds: float
+
+    def line(self):
+        return (f"{self.candidates} candidates x {self.jds} JDs scored in {self.seconds:.2f}s, "
+                f"{self.stored} matches stored")
+
+
+def ranking_key(match, score):
+    """Match %, with BM25 (scaled into [0, 1) per JD) breaking ties"""
+    top = score.max(axis=0) if len(score) else np.zeros(score.shape[1])
+    scale = np.where(top > 0, top * 1.001, 1.0)
+    return match + score / scale
+
+
+def stored_cells(key, top_k=STORED_TOP_K, best=BEST_JDS):
+    """``(rows, columns)`` of each column's top ``top_k`` and each row's best ``best``"""
+    n_rows, n_columns = key.shape
+    keep = np.zeros(key.shape, dtype=bool)
+    if n_rows > top_k:
+        keep[np.argpartition(-key, top_k - 1, axis=0)[:top_k], np.arange(n_columns)] = True
+    else:
+        keep[:] = True
+    if n_columns > best:
+        keep[np.arange(n_rows)[:, None], np.argpartition(-key, best - 1, axis=1)[:, :best]] = True
+    else:
+        keep[:] = True
+    return np.nonzero(keep)
+
+
+@contextmanager
+def _write_transaction(conn):
+    with conn:
+        yield conn
+
+
+@perf.timed("jd_batch.match")
+def match_saved_jds(conn, engine, mode="tokens", version=None, writer=None):
+    """Score every candidate against every saved JD and store the results.
+
+    ``version`` is the ``db.data_version`` to sync ``engine`` to. The JDs
+    are stamped with ``db.content_version``, read first, so texts
+    changing during the run leave them marked as not matched.
+    ``writer`` is a context manager yielding a connection inside a
+    transaction (default: ``conn`` itself), such as ``CandidateStore.writing``.
+    """
+    started = time.perf_counter()
+    matched_version = db.content_version(conn)
+    if version is None:
+        version = db.data_version(conn)
+    engine.sync(conn, version)
+    jds = db.list_jds(conn)
+    jd_ids = [jd_id for jd_id, *_ in jds]
+    ids, match, score = engine.score_matrix([text for _, _, text, *_ in jds], substring=mode == "substring")
+    cells = []
+    if jds and ids:
+        rows, columns = stored_cells(ranking_key(match, score))
+        cells = [(jd_ids[j], ids[r], int(match[r, j]), float(score[r, j]))
+                 for r, j in zip(rows.tolist(), columns.tolist())]
+    with (writer() if writer else _write_transaction(conn)) as write_conn:
+        db.replace_jd_matches(write_conn, jd_ids, cells, matched_version, mode)
+    return MatrixStats(len(jds), len(ids), len(cells), time.perf_counter() - started)
@@ -0,0 +1,375 @@
+"""Background ingestion queue backed by SQLite.
+
+The UI only stores uploaded bytes with ``enqueue`` and polls
+``job_status``; a separate worker process (``python -m jobs``) claims
+queued files, runs them through the ingest pipeline and records a status
+per file. A closed browser tab no longer aborts a batch, and sessions
+uploading at the same time never share a cursor.
+
+Claims are leases, renewed by the worker's heartbeat every
+``HEARTBEAT_INTERVAL`` seconds while it processes them: a file left
+``running`` by a worker that crashed is handed out again once its lease
+has gone ``lease`` seconds without renewal, up to ``max_attempts``
+times, so every job finishes after a restart. A claim that fails in a
+live worker goes back to the queue straight away, as do the files a
+crashed pool process took down with it. A file handed out again is
+claimed on its own, so one that crashes the extractor cannot keep
+failing the files queued next to it.
+
+While the queue is empty the worker also re-parses candidates stored by
+an older parser version (see reparse.py) and signs rows stored without
+a MinHash signature (see dedupe.py), a few batches at a time so new
+uploads never wait long.
+"""
+import argparse
+import logging
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import closing, contextmanager
+from dataclasses import dataclass, field
+
+import db
+import dedupe
+import reparse
+from blobstore import BlobStore
+from ingest import CRASHED, IngestPool, content_hash, default_workers, ingest_files
+
+log = logging.getLogger(__name__)
+
+QUEUED, RUNNING, DONE, DUPLICATE, FAILED = "queued", "running", "done", "duplicate", "failed"
+FINISHED = (DONE, DUPLICATE, FAILED)
+
+HEARTBEAT_INTERVAL = 10
+# a worker that has not checked in for this long is presumed dead
+HEARTBEAT_TIMEOUT = 30
+DEFAULT_LEASE = HEARTBEAT_TIMEOUT
+DEFAULT_MAX_ATTEMPTS = 3
+# re-parse batches run between two checks of the queue
+REPARSE_BATCHES = 4
+HEARTBEAT_KEY = "ingest_worker_heartbeat"
+
+
+@dataclass
+class QueuedFile:
+    id: int
+    name: str
+    content_hash: str
+    data: bytes
+
+
+@dataclass
+class JobStatus:
+    """Per-status file counts and failures of one upload batch"""
+    id: str
+    total: int
+    counts: dict = field(default_factory=dict)
+    errors: list = field(default_factory=list)
+
+    @property
+    def processed(self):
+        return sum(self.counts.get(status, 0) for status in FINISHED)
+
+    @property
+    def finished(self):
+        return self.processed >= self.total
+
+
+def enqueue(conn, files):
+    """Queue ``(name, bytes)`` pairs as one job and return its id"""
+    job_id = str(uuid.uuid4())
+    files = list(files)
+    with conn:
+        conn.execute("INSERT INTO ingest_jobs VALUES (?,?,?)", (job_id, time.time(), len(files)))
+        conn.executemany(
+            "INSERT INTO ingest_job_files(job_id, position, name, content_hash, data) VALUES (?,?,?,?,?)",
+            ((job_id, position, name, content_hash(data), data)
+             for position, (name, data) in enumerate(files)),
+        )
+    return job_id
+
+
+def job_status(conn, job_id):
+    """JobStatus for ``job_id``, or None if there is no such job"""
+    row = conn.execute("SELECT total FROM ingest_jobs WHERE id = ?", (job_id,)).fetchone()
+    if row is None:
+        return None
+    status = JobStatus(job_id, row[0])
+    status.counts = dict(conn.execute(
+        "SELECT status, COUNT(*) FROM ingest_job_files WHERE job_id = ? GROUP BY status", (job_id,)
+    ))
+    status.errors = conn.execute(
+        "SELECT name, error FROM ingest_job_files WHERE job_id = ? AND status = ? ORDER BY position",
+        (job_id, FAILED),
+    ).fetchall()
+    return status
+
+
+def claim(conn, limit, lease=DEFAULT_LEASE, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """Lease up to ``limit`` queued files to the calling worker.
+
+    Leases not renewed for ``lease`` seconds are returned to the queue
+    first; a file whose worker died ``max_attempts`` times is failed
+    instead, so one file that crashes the extractor cannot wedge the queue.
+    A file that was handed out before is claimed alone.
+    """
+    now = time.time()
+    # IMMEDIATE takes the write lock up front, so two workers never claim the same file
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(
+            "UPDATE ingest_job_files SET status = ?, error = ?, data = NULL, claimed_at = NULL "
+            "WHERE status = ? AND claimed_at < ? AND attempts >= ?",
+            (FAILED, "worker stopped while processing this file", RUNNING, now - lease, max_attempts),
+        )
+        conn.execute(
+            "UPDATE ingest_job_files SET status = ?, claimed_at = NULL WHERE status = ? AND claimed_at < ?",
+            (QUEUED, RUNNING, now - lease),
+        )
+        rows = conn.execute(
+            "SELECT id, name, content_hash, data, attempts FROM ingest_job_files "
+            "WHERE status = ? ORDER BY id LIMIT ?",
+            (QUEUED, limit),
+        ).fetchall()
+        retried = [row for row in rows if row[4]]
+        if retried:
+            rows = retried[:1]
+        conn.executemany(
+            "UPDATE ingest_job_files SET status = ?, claimed_at = ?, attempts = attempts + 1 WHERE id = ?",
+            ((RUNNING, now, row[0]) for row in rows),
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return [QueuedFile(*row[:4]) for row in rows]
+
+
+def _finish(conn, outcomes):
+    """Record ``{file id: (status, error, candidate id)}`` and drop the stored bytes"""
+    with conn:
+        conn.executemany(
+            "UPDATE ingest_job_files SET status = ?, error = ?, candidate_id = ?, data = NULL WHERE id = ?",
+            ((status, error, candidate_id, file_id)
+             for file_id, (status, error, candidate_id) in outcomes.items()),
+        )
+
+
+def _release(conn, claimed, error, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """Put the files of a claim that could not be processed back in the queue.
+
+    Files already tried ``max_attempts`` times are failed with ``error``.
+    """
+    ids = [f.id for f in claimed]
+    with conn:
+        conn.executemany(
+            "UPDATE ingest_job_files SET status = ?, error = ?, data = NULL, claimed_at = NULL "
+            "WHERE id = ? AND status = ? AND attempts >= ?",
+            ((FAILED, error, file_id, RUNNING, max_attempts) for file_id in ids),
+        )
+        conn.executemany(
+            "UPDATE ingest_job_files SET status = ?, claimed_at = NULL WHERE id = ? AND status = ?",
+            ((QUEUED, file_id, RUNNING) for file_id in ids),
+        )
+
+
+def process(conn, claimed, workers=None, pool=None, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """Ingest claimed files and record each one's outcome; ``pool`` as for ``ingest_files``.
+
+    Files in flight when a pool process crashed get no outcome: they go
+    back to the queue (see ``_release``).
+    """
+    outcomes = {}
+    crashed = []
+    stored = db.ids_by_hash(conn, {f.content_hash for f in claimed})
+    todo = []
+    for f in claimed:
+        if f.content_hash in stored:
+            outcomes[f.id] = (DUPLICATE, None, stored[f.content_hash])
+        else:
+            # the same bytes twice in one claim are stored once
+            stored[f.content_hash] = None
+            todo.append(f)
+
+    written = {}
+    blobs = BlobStore.for_connection(conn)
+    with db.CandidateWriter(conn) as writer:
+        for result in ingest_files([(f.name, f.data) for f in todo], workers, pool=pool):
+            f = todo[result.index]
+            if result.error_type == "BrokenProcessPool":
+                crashed.append(f)
+            elif result.error:
+                outcomes[f.id] = (FAILED, result.error, None)
+            elif not result.text:
+                outcomes[f.id] = (FAILED, "no text found", None)
+            else:
+                uid = str(uuid.uuid4())
+                written[f.id] = (f.content_hash, uid)
+                if blobs:
+                    # before the row, so a stored candidate always has its original
+                    blobs.put(f.data, f.content_hash)
+                writer.add((uid, *result.fields, result.text, f.content_hash, result.backend,
+                            result.parser_version, result.minhash), result.terms)
+
+    # a concurrent writer may have stored the same bytes first
+    ids = db.ids_by_hash(conn, {h for h, _ in written.values()})
+    for file_id, (h, uid) in written.items():
+        outcomes[file_id] = (DONE if ids.get(h) == uid else DUPLICATE, None, ids.get(h))
+    _finish(conn, outcomes)
+    if crashed:
+        _release(conn, crashed, CRASHED, max_attempts)
+    return outcomes
+
+
+def heartbeat(conn, file_ids=()):
+    """Record that the worker is alive and renew its leases on ``file_ids``"""
+    now = time.time()
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (HEARTBEAT_KEY, int(now)))
+        conn.executemany(
+            "UPDATE ingest_job_files SET claimed_at = ? WHERE id = ? AND status = ?",
+            ((now, file_id, RUNNING) for file_id in file_ids),
+        )
+
+
+@contextmanager
+def beating(conn, file_ids=(), interval=HEARTBEAT_INTERVAL):
+    """Keep calling ``heartbeat`` from a thread while the block runs.
+
+    The thread uses its own connection, so a beat never lands inside a
+    transaction the block has open. In-memory databases are private to
+    ``conn`` and need no heartbeat.
+    """
+    path = conn.execute("PRAGMA database_list").fetchone()[2]
+    stop = threading.Event()
+
+    def beat():
+        with closing(db.connect(path)) as beat_conn:
+            while not stop.wait(interval):
+                try:
+                    heartbeat(beat_conn, file_ids)
+                except sqlite3.Error:
+                    log.exception("could not record the worker heartbeat")
+
+    thread = threading.Thread(target=beat, name="jobs-heartbeat", daemon=True) if path else None
+    if thread:
+        thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        if thread:
+            thread.join()
+
+
+def worker_alive(conn, timeout=HEARTBEAT_TIMEOUT):
+    """True if some worker has checked in within ``timeout`` seconds"""
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (HEARTBEAT_KEY,)).fetchone()
+    return row is not None and time.time() - row[0] < timeout
+
+
+def run_worker(conn, workers=None, poll=1.0, idle_exit=None, lease=DEFAULT_LEASE,
+               max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """Drain the queue until stopped; with ``idle_exit``, return after that many idle seconds"""
+    workers = workers or default_workers()
+    # one pool for the worker's lifetime instead of a new one per claim
+    with IngestPool(workers) as pool:
+        idle_since = time.monotonic()
+        # rows only go stale when the parser changes, which means new code and
+        # so a new worker; once caught up there is nothing more to look for
+        reparse_pending = True
+        # likewise, only rows stored before signatures were computed lack one
+        signatures_pending = True
+        while True:
+            heartbeat(conn)
+            claimed = claim(conn, workers * 4, lease, max_attempts)
+            if claimed:
+                try:
+                    with beating(conn, [f.id for f in claimed]):
+                        outcomes = process(conn, claimed, workers, pool, max_attempts)
+                    log.info("processed %d files (%d stored)", len(outcomes),
+                             sum(1 for status, _, _ in outcomes.values() if status == DONE))
+                except Exception as e:
+                    log.exception("could not process %d claimed files", len(claimed))
+                    if isinstance(e, BrokenProcessPool):
+                        pool.restart()
+                    try:
+                        _release(conn, claimed, str(e) or type(e).__name__, max_attempts)
+                    except sqlite3.Error:
+                        # the leases lapse without a heartbeat and the files are retried then
+                        log.exception("could not release %d claimed files", len(claimed))
+                    time.sleep(poll)
+                idle_since = time.monotonic()
+                continue
+            if reparse_pending:
+                try:
+                    with beating(conn):
+                        stats = reparse.reparse(conn, max_batches=REPARSE_BATCHES, pool=pool)
+                    if stats.done:
+                        log.info("re-parsed %d candidates (%d changed)", stats.done, stats.changed)
+                    reparse_pending = not stats.finished
+                except Exception as e:
+                    log.exception("could not re-parse candidates")
+                    if isinstance(e, BrokenProcessPool):
+                        pool.restart()
+                    time.sleep(poll)
+                idle_since = time.monotonic()
+                continue
+            if signatures_pending:
+                try:
+                    with beating(conn):
+                        signed = dedupe.fill_signatures(conn, max_batches=REPARSE_BATCHES)
+                    if signed:
+                        log.info("computed %d MinHash signatures", signed)
+                    signatures_pending = signed >= REPARSE_BATCHES * db.DEFAULT_BATCH_SIZE
+                except Exception:
+                    log.exception("could not compute MinHash signatures")
+                    time.sleep(poll)
+                idle_since = time.monotonic()
+                continue
+            if idle_exit is not None and time.monotonic() - idle_since > idle_exit:
+                return
+            time.sleep(poll)
+
+
+def start_worker(path=db.DB_PATH, idle_exit=300):
+    """Launch a detached ``python -m jobs`` process for the database at ``path``"""
+    # the worker runs from this directory, so a relative path would name another file
+    return subprocess.Popen(
+        [sys.executable, "-m", "jobs", "--db", os.path.abspath(path), "--idle-exit", str(idle_exit)],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        stdin=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def ensure_worker(conn, path=db.DB_PATH):
+    """Start a worker unless one is already draining the queue"""
+    if not worker_alive(conn):
+        start_worker(path)
+        heartbeat(conn)  # so sessions enqueueing right now do not start another
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drain the resume ingestion queue")
+    parser.add_argument("--db", default=db.DB_PATH)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--poll", type=float, default=1.0, help="seconds between checks of an empty queue")
+    parser.add_argument("--idle-exit", type=float, default=None,
+                        help="exit after this many idle seconds (default: run forever)")
+    parser.add_argument("--lease", type=float, default=DEFAULT_LEASE,
+                        help="seconds without a heartbeat after which a claimed file is handed out again")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    with closing(db.connect(args.db)) as conn:
+        run_worker(conn, args.workers, args.poll, args.idle_exit, args.lease)
+
+
+if __name__ == "__main__":
+    main()
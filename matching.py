@@ -0,0 +1,79 @@
+"""JD matching: keyword extraction, resume tokenization and match scores.
+
+Resumes are tokenized once at ingest into per-candidate term counts (see
+``db.CandidateWriter``), so scoring a JD against the whole table is one
+indexed SQL aggregate (``db.match_scores``) instead of a substring scan
+over every resume.
+"""
+import hashlib
+import re
+from collections import Counter
+
+import perf
+
+TOKEN_RE = re.compile(r'\b\w+\b')
+
+STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has',
+    'had', 'do', 'does', 'did', 'will', 'would', 'should', 'could', 'may',
+    'might', 'must', 'can', 'this', 'that', 'these', 'those', 'i', 'you',
+    'he', 'she', 'it', 'we', 'they', 'them', 'their', 'what', 'which',
+    'who', 'when', 'where', 'why', 'how'})
+
+
+@perf.timed("tokenize")
+def term_counts(text):
+    """Lower-cased word tokens of ``text`` with their frequencies"""
+    return Counter(TOKEN_RE.findall(text.lower())) if text else Counter()
+
+
+def jd_keywords_of(jd_text):
+    """Distinct JD words minus stop words"""
+    return set(TOKEN_RE.findall(jd_text.lower())) - STOP_WORDS
+
+
+def jd_key(jd_text):
+    """Hash of the JD's keyword set; case, spacing, word order and stop
+    words do not change the scores, so they do not change the key"""
+    keywords = " ".join(sorted(jd_keywords_of(jd_text)))
+    return hashlib.sha256(keywords.encode("utf-8")).hexdigest()
+
+
+def match_percentage(matches, total_keywords):
+    """Share of JD keywords found, as an int percentage"""
+    if total_keywords == 0:
+        return 0
+    return min(int((matches / total_keywords) * 100), 100)
+
+
+@perf.timed("match.calculate_match_percentage")
+def calculate_match_percentage(candidate_text, candidate_skills, jd_text):
+    """Calculate match percentage between candidate and JD.
+
+    Original substring-based scorer, kept as the reference implementation;
+    ``db.match_scores`` gives the token-based equivalent for the whole table.
+    """
+    
+    if not jd_text:
+        return 0
+    
+    candidate_text_lower = candidate_text.lower()
+    jd_text_lower = jd_text.lower()
+    
+    # Extract keywords from JD (simple approach)
+    jd_keywords = jd_keywords_of(jd_text_lower)
+    
+    # Count matching keywords
+    matches = 0
+    total_keywords = len(jd_keywords)
+    
+    if total_keywords == 0:
+        return 0
+    
+    for keyword in jd_keywords:
+        if len(keyword) > 2 and keyword in candidate_text_lower:
+            matches += 1
+    
+    # Calculate percentage
+    return match_percentage(matches, total_keywords)
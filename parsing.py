@@ -0,0 +1,142 @@
+"""Resume field parsing (name, email, phone, skills, experience).
+
+Regex fields live in a registry (``FIELDS``) holding just what
+``parse_resume`` stores. A single-valued field is its own compiled
+``search``, which stops at the first match: the value is the same
+whatever other fields are requested. Multiple-valued fields added with
+``register_field`` are compiled together into one alternation of named
+groups, so collecting any number of them is a single scan of the text.
+"""
+import hashlib
+import json
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Optional
+
+import perf
+from skills import default_matcher
+
+FIRST_LINE_RE = re.compile(r'\S[^\n]*')
+
+
+@dataclass(frozen=True)
+class Field:
+    """A regex-extracted resume field.
+
+    ``pattern`` must not contain capturing groups of its own; use
+    ``(?:...)``, and scoped flags such as ``(?i:...)`` instead of global
+    ones. ``multiple`` fields collect every distinct match; their matches
+    are only tried where a word starts (not right after a letter or
+    digit) and never overlap one another.
+    """
+    name: str
+    pattern: str
+    multiple: bool = False
+    normalize: Optional[Callable] = None
+
+
+FIELDS = {}
+
+
+@lru_cache(maxsize=None)
+def _pattern(name):
+    return re.compile(FIELDS[name].pattern)
+
+
+@lru_cache(maxsize=32)
+def _compile(names):
+    # matches may only start where a word starts: re would otherwise try
+    # every alternative at every character, which dominates the scan
+    alternatives = "|".join(f"(?P<{name}>{FIELDS[name].pattern})" for name in names)
+    return re.compile(rf"(?<!\w)(?:{alternatives})")
+
+
+def register_field(name, pattern, multiple=False, normalize=None):
+    """Add (or replace) a field in the registry"""
+    FIELDS[name] = Field(name, pattern, multiple, normalize)
+    _pattern.cache_clear()
+    _compile.cache_clear()
+
+
+register_field("email", r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+register_field("phone", r'(?:\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
+register_field("experience", r'(?i:\d+\+?\s*(?:years?|yrs?))', normalize=str.lower)
+
+# what parse_resume stores
+CORE_FIELDS = ("email", "phone", "experience")
+
+# bump when parse_resume's logic changes in a way the patterns and
+# taxonomy below do not capture
+PARSER_REVISION = 2
+
+
+def extract_fields(text, names=None):
+    """``{field: value}`` for ``names`` (default: every registered field).
+
+    Single-valued fields are their first match, or ``""``; multiple-valued
+    fields are lists of distinct matches in order of appearance, all
+    collected in one scan.
+    """
+    names = tuple(names or FIELDS)
+    values = {}
+    for name in names:
+        field = FIELDS[name]
+        if field.multiple:
+            values[name] = []
+            continue
+        match = _pattern(name).search(text)
+        value = match.group() if match else ""
+        values[name] = field.normalize(value) if field.normalize and value else value
+
+    multiple = tuple(name for name in names if FIELDS[name].multiple)
+    if multiple:
+        for match in _compile(multiple).finditer(text):
+            name = match.lastgroup
+            field = FIELDS[name]
+            value = match.group(name)
+            if field.normalize:
+                value = field.normalize(value)
+            if value not in values[name]:
+                values[name].append(value)
+    return values
+
+
+@lru_cache(maxsize=1)
+def parser_version():
+    """Short hash of everything that determines parse_resume's output.
+
+    Stored with each candidate; rows stamped with another version are
+    re-derived from their stored text by ``reparse``. Editing a core
+    pattern, the skill taxonomy (including RESUME_SKILL_TAXONOMY) or
+    PARSER_REVISION changes it.
+    """
+    matcher = default_matcher()
+    spec = {
+        "revision": PARSER_REVISION,
+        "fields": [FIELDS[name].pattern for name in CORE_FIELDS],
+        "skills": sorted(matcher.canonical.items()),
+    }
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+
+@perf.timed("parse")
+def parse_resume(text):
+    """Parse resume with improved regex and validation"""
+    
+    if not text:
+        return "Unknown", "", "", "", ""
+    
+    # NAME - first non-empty line
+    first_line = FIRST_LINE_RE.search(text)
+    name = first_line.group().strip()[:60] if first_line else "Unknown"
+    
+    # EMAIL, PHONE, EXPERIENCE - first match of each
+    fields = extract_fields(text, CORE_FIELDS)
+    
+    # SKILLS - single pass over the text with the compiled taxonomy matcher
+    found_skills = default_matcher().find(text.lower())
+    
+    skills = ", ".join(found_skills) if found_skills else "Not specified"
+    
+    return name, fields["email"], fields["phone"], skills, fields["experience"]
@@ -0,0 +1,187 @@
+"""Fast PDF text extraction straight from the content streams.
+
+Most resumes are simple text PDFs whose content streams spell out the
+text with ``Tj``/``TJ`` operators in a standard encoding. Reading those
+operators directly skips pdfminer's object model and pdfplumber's
+per-character layout analysis entirely, which is where nearly all of the
+ingestion time goes.
+
+This is deliberately naive: streams are read in file order (which for
+almost every generator is page order), fonts are assumed to use a
+single-byte WinAnsi-style encoding, and no layout is reconstructed
+beyond line breaks and word gaps. ``is_plausible_text`` tells the
+caller when the result cannot be trusted (CID fonts, custom encodings,
+encryption) so it can fall back to pdfplumber.
+"""
+import re
+import zlib
+
+STREAM_RE = re.compile(rb"(?<![A-Za-z])stream\r?\n")
+LENGTH_RE = re.compile(rb"/Length\s+(\d+)(?!\s+\d+\s+R)")
+FILTER_RE = re.compile(rb"/Filter\s*(\[[^\]]*\]|/\w+)")
+SKIPPED_RE = re.compile(rb"/Subtype\s*/Image|/Type\s*/(?:ObjStm|XRef|Metadata)|/Length[123]\b")
+
+TOKEN_RE = re.compile(
+    rb"\((?:\\.|\((?:\\.|[^\\()])*\)|[^\\()])*\)"  # literal string, one level of nesting
+    rb"|<[0-9A-Fa-f\s]*>"                            # hex string
+    rb"|\[|\]"
+    rb"|/[^\s/\[\]()<>{}%]*"                         # name
+    rb"|%[^\r\n]*"                                   # comment
+    rb"|[^\s/\[\]()<>{}%]+",                         # number or operator
+    re.S,
+)
+ESCAPE_RE = re.compile(rb"\\([0-7]{1,3}|\r\n|.)", re.S)
+ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f",
+           b"\n": b"", b"\r": b"", b"\r\n": b""}
+
+# a TJ displacement (thousandths of an em) wider than this is a word gap
+WORD_GAP = 200
+
+# characters beyond letters, digits and whitespace that resumes are full of
+COMMON_PUNCTUATION = frozenset(".,;:!?'\"()[]{}<>/\\|-_+=*&%$#@~`^•·–—‘’“”…")
+
+
+def _unescape(match):
+    escaped = match.group(1)
+    if escaped[:1].isdigit():
+        return bytes([int(escaped, 8) & 0xFF])
+    return ESCAPES.get(escaped, escaped)
+
+
+def _decode_string(token):
+    if token[:1] == b"(":
+        raw = ESCAPE_RE.sub(_unescape, token[1:-1])
+    else:
+        digits = re.sub(rb"\s", b"", token[1:-1])
+        raw = bytes.fromhex((digits + b"0" * (len(digits) % 2)).decode("ascii"))
+    return raw.decode("cp1252", errors="replace")
+
+
+def _is_string(token):
+    return token[:1] in (b"(", b"<")
+
+
+def _number(token):
+    try:
+        return float(token)
+    except ValueError:
+        return 0.0
+
+
+def content_text(content):
+    """Text shown by one content stream, with line breaks and word gaps"""
+    lines = [[]]
+    operands = []
+    array = None
+
+    def newline():
+        if lines[-1]:
+            lines.append([])
+
+    for token in TOKEN_RE.findall(content):
+        if token == b"[":
+            array = []
+        elif token == b"]":
+            operands.append(array if array is not None else [])
+            array = None
+        elif array is not None:
+            array.append(token)
+        elif _is_string(token) or token[:1] == b"/" or token[:1] in b"+-.0123456789":
+            operands.append(token)
+        elif token[:1] == b"%":
+            continue
+        else:
+            if token == b"Tj" and operands and _is_string(operands[-1]):
+                lines[-1].append(_decode_string(operands[-1]))
+            elif token in (b"'", b'"') and operands and _is_string(operands[-1]):
+                newline()
+                lines[-1].append(_decode_string(operands[-1]))
+            elif token == b"TJ" and operands and isinstance(operands[-1], list):
+                for item in operands[-1]:
+                    if _is_string(item):
+                        lines[-1].append(_decode_string(item))
+                    elif -_number(item) > WORD_GAP:
+                        lines[-1].append(" ")
+            elif token in (b"Td", b"TD") and len(operands) >= 2:
+                if _number(operands[-1]) != 0:
+                    newline()
+                elif _number(operands[-2]) > 0 and lines[-1]:
+                    lines[-1].append(" ")
+            elif token in (b"T*", b"Tm", b"ET"):
+                newline()
+            operands = []
+
+    return "\n".join("".join(parts).strip() for parts in lines if parts)
+
+
+def _decode_stream(header, body):
+    """Decoded stream bytes, or None for streams that cannot hold page text"""
+    if SKIPPED_RE.search(header):
+        return None
+    filters = FILTER_RE.search(header)
+    if filters:
+        names = re.findall(rb"/(\w+)", filters.group(1))
+        if any(name != b"FlateDecode" for name in names):
+            return None
+        try:
+            for _ in names:
+                body = zlib.decompressobj().decompress(body)
+        except zlib.error:
+            return None
+    return body
+
+
+def iter_content_streams(data):
+    """Yield the decoded bytes of every stream in ``data`` that could be page content"""
+    position = 0
+    while True:
+        match = STREAM_RE.search(data, position)
+        if not match:
+            return
+        start = match.end()
+        header = data[max(0, match.start() - 2048):match.start()]
+        header = header[header.rfind(b"obj"):]
+        length = LENGTH_RE.search(header)
+        end = start + int(length.group(1)) if length else -1
+        if end < 0 or data.find(b"endstream", end, end + 64) < 0:
+            # indirect or wrong /Length: trust the endstream keyword instead
+            end = data.find(b"endstream", start)
+            if end < 0:
+                return
+        position = end + len(b"endstream")
+        content = _decode_stream(header, data[start:end])
+        if content and b"BT" in content:
+            yield content
+
+
+def iter_raw_pdf_text(data, max_streams=None, check=None):
+    """Yield the text of each text-bearing content stream of a PDF.
+
+    Encrypted files yield nothing, since their streams are unreadable
+    without the key.
+    """
+    if b"/Encrypt" in data[-4096:] or b"/Encrypt" in data[:4096]:
+        return
+    for count, content in enumerate(iter_content_streams(data)):
+        if max_streams is not None and count >= max_streams:
+            return
+        if check:
+            check()
+        text = content_text(content)
+        if text:
+            yield text
+
+
+def is_plausible_text(text, min_chars=20, min_readable=0.9, max_word_length=25):
+    """True if ``text`` looks like real prose rather than mis-decoded glyph ids.
+
+    Garbled extractions are dominated by control and replacement
+    characters, or lose their spaces so "words" become very long.
+    """
+    visible = [char for char in text if not char.isspace()]
+    if len(visible) < min_chars:
+        return False
+    readable = sum(char.isalnum() or char in COMMON_PUNCTUATION for char in visible)
+    if readable / len(visible) < min_readable:
+        return False
+    return len(visible) / len(text.split()) <= max_word_length
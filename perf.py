@@ -0,0 +1,201 @@
+"""Per-stage timing histograms.
+
+Wrap a function with ``@timed("stage")`` or a block with
+``with timer("stage"):`` and every call is recorded in a process-wide
+histogram. Stages are dotted names (``extract``, ``parse``,
+``db.list_candidates``, ``render.list``).
+
+Timing is off unless RESUME_PERF=1 (or ``enable()`` is called): a
+disabled ``timed`` wrapper costs one flag check per call and a disabled
+``timer`` returns a shared no-op context manager.
+
+Ingest workers run in other processes, so ``ingest.process_file`` hands
+back what the worker recorded (``REGISTRY.take()``) with each result and
+the parent merges it in. Histograms can be written out as JSON or in
+the Prometheus text exposition format, to new files in DUMP_DIR
+(RESUME_PERF_DIR).
+"""
+import bisect
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+# upper bounds in seconds, 0.1 ms .. 60 s, roughly x2.5 apart
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# format -> file suffix of dumps
+DUMP_FORMATS = {"json": ".json", "prometheus": ".prom"}
+DUMP_DIR = os.environ.get("RESUME_PERF_DIR", "perf_stats")
+
+_enabled = os.environ.get("RESUME_PERF", "") == "1"
+_disabled_timer = nullcontext()
+
+
+def enabled():
+    return _enabled
+
+
+def enable(on=True):
+    """Turn timing on or off; worker processes started afterwards inherit it"""
+    global _enabled
+    _enabled = on
+    os.environ["RESUME_PERF"] = "1" if on else "0"
+
+
+class Histogram:
+    """Count, sum, extremes and bucket counts of one stage's durations"""
+
+    __slots__ = ("count", "total", "min", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        # one slot per bound plus +Inf
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+
+    def merge(self, state):
+        self.count += state["count"]
+        self.total += state["total"]
+        self.min = min(self.min, state["min"])
+        self.max = max(self.max, state["max"])
+        self.buckets = [a + b for a, b in zip(self.buckets, state["buckets"])]
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the ``q`` quantile"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def state(self):
+        return {"count": self.count, "total": self.total, "min": self.min, "max": self.max,
+                "buckets": list(self.buckets)}
+
+
+class Registry:
+    """Thread-safe map of stage name to Histogram"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+
+    def record(self, stage, seconds):
+        with self.lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram()
+            histogram.add(seconds)
+
+    def take(self):
+        """Remove and return everything recorded so far, as plain (picklable) state"""
+        with self.lock:
+            histograms, self.histograms = self.histograms, {}
+        return {stage: histogram.state() for stage, histogram in histograms.items()}
+
+    def merge(self, states):
+        """Add state returned by ``take`` (e.g. from a worker process)"""
+        with self.lock:
+            for stage, state in states.items():
+                self.histograms.setdefault(stage, Histogram()).merge(state)
+
+    def reset(self):
+        with self.lock:
+            self.histograms = {}
+
+    def summary(self):
+        """``[(stage, count, total s, mean s, p50 s, p95 s, max s)]`` sorted by total time"""
+        with self.lock:
+            rows = [(stage, h.count, h.total, h.total / h.count, h.quantile(0.5), h.quantile(0.95), h.max)
+                    for stage, h in self.histograms.items() if h.count]
+        return sorted(rows, key=lambda row: -row[2])
+
+    def to_json(self):
+        with self.lock:
+            return json.dumps({
+                "buckets": BUCKETS,
+                "stages": {stage: h.state() for stage, h in self.histograms.items()},
+            }, indent=2)
+
+    def to_prometheus(self, metric="resume_stage_duration_seconds"):
+        lines = [f"# HELP {metric} Time spent per pipeline stage.", f"# TYPE {metric} histogram"]
+        with self.lock:
+            for stage, h in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, count in zip(BUCKETS, h.buckets):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{stage="{stage}",le="+Inf"}} {h.count}')
+                lines.append(f'{metric}_sum{{stage="{stage}"}} {h.total}')
+                lines.append(f'{metric}_count{{stage="{stage}"}} {h.count}')
+        return "\n".join(lines) + "\n"
+
+    def dump(self, fmt="json", directory=None):
+        """Write the histograms to a new timestamped file and return its path.
+
+        ``fmt`` is a key of DUMP_FORMATS; files go to ``directory``
+        (default DUMP_DIR) and never replace an existing file.
+        """
+        text = self.to_prometheus() if fmt == "prometheus" else self.to_json()
+        directory = directory or DUMP_DIR
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        for n in itertools.count():
+            path = os.path.join(directory, f"perf-{stamp}{f'-{n}' if n else ''}{DUMP_FORMATS[fmt]}")
+            try:
+                with open(path, "x", encoding="utf-8") as f:
+                    f.write(text)
+                return path
+            except FileExistsError:
+                continue
+
+
+REGISTRY = Registry()
+
+
+@contextmanager
+def _timer(stage):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        REGISTRY.record(stage, time.perf_counter() - start)
+
+
+def timer(stage):
+    """Context manager recording the block's duration under ``stage``"""
+    return _timer(stage) if _enabled else _disabled_timer
+
+
+def timed(stage):
+    """Decorator recording each call's duration under ``stage``"""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                REGISTRY.record(stage, time.perf_counter() - start)
+        return wrapper
+    return decorate
@@ -0,0 +1,361 @@
+"""Vectorized JD ranking over an in-memory document-term matrix.
+
+``RankingEngine`` mirrors the ``candidate_terms`` index as sparse
+(term, doc, tf) arrays, updated incrementally as candidates are added or
+deleted, and scores a JD against every candidate in a handful of NumPy
+operations: BM25 for ordering, plus the keyword-coverage match % the UI
+has always shown (and ``min_match`` filters on).
+
+Each JD's full ranking is sorted once and kept as a ``RankedIndex``
+until the documents change, so a new filter or ``min_match`` only
+selects from it: a binary search for the ``min_match`` cut and a mask
+for the filtered ids, no rescoring or resorting.
+
+``score_matrix`` scores many JDs at once (the saved reqs, see
+``jd_batch``) as a candidates x JDs matrix.
+"""
+import bisect
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+
+import perf
+from matching import jd_keywords_of
+
+# compact once this share of loaded documents has been deleted
+COMPACT_DEAD_RATIO = 0.25
+
+# JD rankings kept per engine, least recently used dropped first
+RANKED_INDEXES = 16
+
+# documents x keywords cells per block of the score matrix product
+MATRIX_CELLS = 1 << 22
+
+
+@dataclass
+class Ranking:
+    """Candidates ordered by match % then BM25 score, best first"""
+    ids: list
+    match_percentage: np.ndarray
+    score: np.ndarray
+    total: int
+
+
+class RankedIndex:
+    """Every candidate ranked against one JD, sorted once and reused.
+
+    ``match`` is in descending order, so the candidates meeting a
+    ``min_match`` are always a prefix found by binary search.
+    """
+
+    def __init__(self, ids, match, score):
+        match = np.asarray(match, dtype=int)
+        score = np.asarray(score, dtype=float)
+        # match % first, score only breaks ties; lexsort is stable
+        order = np.lexsort((-score, -match))
+        self.ids = [ids[n] for n in order]
+        self.match = match[order]
+        self.score = score[order]
+        self.position = {candidate_id: n for n, candidate_id in enumerate(self.ids)}
+        # ascending copy for searchsorted
+        self._negated = -self.match
+
+    def __len__(self):
+        return len(self.ids)
+
+    def cut(self, min_match):
+        """Number of candidates with match % >= ``min_match``"""
+        return int(np.searchsorted(self._negated, -min_match, side="right"))
+
+    def select(self, ids=None, min_match=0, top_k=None):
+        """Ranking of ``ids`` (default: everyone) at or above ``min_match``"""
+        cut = self.cut(min_match)
+        if ids is None:
+            positions = np.arange(cut)
+        else:
+            keep = np.zeros(cut, dtype=bool)
+            found = np.fromiter((self.position.get(i, cut) for i in ids), dtype=np.int64, count=len(ids))
+            keep[found[found < cut]] = True
+            positions = np.flatnonzero(keep)
+        total = len(positions)
+        positions = positions[:top_k]
+        return Ranking([self.ids[n] for n in positions], self.match[positions], self.score[positions], total)
+
+
+class RankingEngine:
+    """BM25 / keyword-coverage scorer over all stored resumes.
+
+    Call ``sync(conn)`` after the candidates table changes; only new
+    documents' postings are read and deleted ones are masked out until
+    the next compaction.
+    """
+
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.lock = threading.RLock()
+        self.vocabulary = {}
+        self.max_term_id = 0
+        self.doc_ids = []
+        self.doc_index = {}
+        self.doc_rowids = {}
+        self.alive = np.zeros(0, dtype=bool)
+        self.doc_len = np.zeros(0)
+        self.term = np.zeros(0, dtype=np.int64)
+        self.doc = np.zeros(0, dtype=np.int64)
+        self.tf = np.zeros(0)
+        self._indptr = None
+        self._ranked = OrderedDict()
+        self._term_text = None
+        self.version = None
+
+    # ----- maintenance -----
+
+    @perf.timed("rank.sync")
+    def sync(self, conn, version=None):
+        """Load postings for new candidates and drop deleted ones.
+
+        Pass ``db.data_version`` as ``version`` to skip the check when the
+        table has not changed since the last sync.
+        """
+        with self.lock:
+            if version is not None and version == self.version:
+                return
+            stored = dict(conn.execute("SELECT rowid, id FROM candidates"))
+            removed = [rowid for rowid, i in self.doc_rowids.items() if stored.get(rowid) != i]
+            added = [(rowid, i) for rowid, i in stored.items() if self.doc_rowids.get(rowid) != i]
+
+            for rowid in removed:
+                self.alive[self.doc_index.pop(self.doc_rowids.pop(rowid))] = False
+            if added:
+                self._add_documents(conn, added)
+
+            # after the postings, so every loaded term id is in the vocabulary
+            self.vocabulary.update(
+                (term, term_id) for term_id, term in
+                conn.execute("SELECT id, term FROM terms WHERE id > ?", (self.max_term_id,))
+            )
+            self.max_term_id = max(self.vocabulary.values(), default=0)
+            if removed or added:
+                self._ranked.clear()
+            if removed:
+                self._indptr = None
+                if (~self.alive).sum() > COMPACT_DEAD_RATIO * len(self.alive):
+                    self._compact()
+            self.version = version
+
+    def _add_documents(self, conn, added):
+        start = len(self.doc_ids)
+        added = sorted(added)
+        for rowid, candidate_id in added:
+            self.doc_index[candidate_id] = len(self.doc_ids)
+            self.doc_rowids[rowid] = candidate_id
+            self.doc_ids.append(candidate_id)
+
+        rowids = np.array([rowid for rowid, _ in added], dtype=np.int64)
+        if len(added) > len(self.doc_rowids) // 2:
+            # mostly new (e.g. the first sync): one sequential scan beats
+            # thousands of index probes
+            rows = conn.execute("SELECT term_id, doc, tf FROM candidate_terms").fetchall()
+        else:
+            rows = []
+            for chunk_start in range(0, len(rowids), 500):
+                chunk = rowids[chunk_start:chunk_start + 500].tolist()
+                rows += conn.execute(
+                    f"SELECT term_id, doc, tf FROM candidate_terms WHERE doc IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+        postings = np.array(rows, dtype=np.int64).reshape(-1, 3)
+        postings = postings[np.isin(postings[:, 1], rowids)]
+
+        new_term = postings[:, 0]
+        # rowids were numbered in ascending order from ``start``
+        new_doc = start + np.searchsorted(rowids, postings[:, 1])
+        new_tf = postings[:, 2].astype(float)
+        self.term = np.concatenate([self.term, new_term])
+        self.doc = np.concatenate([self.doc, new_doc])
+        self.tf = np.concatenate([self.tf, new_tf])
+        self.alive = np.concatenate([self.alive, np.ones(len(added), dtype=bool)])
+        self.doc_len = np.concatenate([
+            self.doc_len,
+            np.bincount(new_doc - start, weights=new_tf, minlength=len(added)),
+        ])
+        self._indptr = None
+
+    def _compact(self):
+        keep = self.alive
+        remap = np.cumsum(keep) - 1
+        postings = keep[self.doc]
+        self.term = self.term[postings]
+        self.doc = remap[self.doc[postings]]
+        self.tf = self.tf[postings]
+        self.doc_len = self.doc_len[keep]
+        self.doc_ids = [i for i, alive in zip(self.doc_ids, keep) if alive]
+        self.doc_index = {i: n for n, i in enumerate(self.doc_ids)}
+        self.alive = np.ones(len(self.doc_ids), dtype=bool)
+        self._indptr = None
+
+    def _build_index(self):
+        """Sort postings by term (CSC layout) so a term's postings are one slice"""
+        order = np.argsort(self.term, kind="stable")
+        self.term = self.term[order]
+        self.doc = self.doc[order]
+        self.tf = self.tf[order]
+        self._indptr = np.searchsorted(self.term, np.arange(self.max_term_id + 2))
+
+    # ----- scoring -----
+
+    def _postings(self, term_ids):
+        """Concatenated (query term position, doc, tf) postings for ``term_ids``"""
+        if self._indptr is None or len(self._indptr) < self.max_term_id + 2:
+            self._build_index()
+        slices = [np.arange(self._indptr[t], self._indptr[t + 1]) for t in term_ids]
+        lengths = [len(s) for s in slices]
+        positions = np.concatenate(slices) if slices else np.zeros(0, dtype=np.int64)
+        owner = np.repeat(np.arange(len(term_ids)), lengths)
+        return owner, self.doc[positions], self.tf[positions]
+
+    @perf.timed("rank.score")
+    def score(self, jd_text):
+        """``(match_percentage, bm25)`` arrays over all loaded documents"""
+        with self.lock:
+            n_docs = len(self.doc_ids)
+            keywords = jd_keywords_of(jd_text) if jd_text else set()
+            match = np.zeros(n_docs, dtype=int)
+            bm25 = np.zeros(n_docs)
+            if not keywords or not n_docs:
+                return match, bm25
+
+            term_ids = [self.vocabulary[k] for k in keywords if k in self.vocabulary]
+            searchable = np.array([len(k) > 2 for k in keywords if k in self.vocabulary], dtype=bool)
+            owner, doc, tf = self._postings(term_ids)
+            live = self.alive[doc]
+            owner, doc, tf = owner[live], doc[live], tf[live]
+
+            counted = searchable[owner] if len(owner) else np.zeros(0, dtype=bool)
+            matches = np.bincount(doc[counted], minlength=n_docs)
+            # same arithmetic as matching.match_percentage
+            match = np.minimum(((matches / len(keywords)) * 100).astype(int), 100)
+
+            n_alive = self.alive.sum()
+            df = np.bincount(owner, minlength=len(term_ids))
+            idf = np.log1p((n_alive - df + 0.5) / (df + 0.5))
+            avg_len = self.doc_len[self.alive].mean() or 1.0
+            norm = self.k1 * (1 - self.b + self.b * self.doc_len[doc] / avg_len)
+            bm25 = np.bincount(doc, weights=idf[owner] * tf * (self.k1 + 1) / (tf + norm),
+                               minlength=n_docs)
+            return match, bm25
+
+    def score_ids(self, jd_text, ids):
+        """``(ids, match_percentage, bm25)`` for the given candidates"""
+        with self.lock:
+            match, bm25 = self.score(jd_text)
+            known = [i for i in ids if i in self.doc_index]
+            docs = np.array([self.doc_index[i] for i in known], dtype=np.int64)
+            return known, match[docs], bm25[docs]
+
+    def _terms_containing(self, keyword):
+        """Vocabulary terms with ``keyword`` inside them (itself included)"""
+        if self._term_text is None or self._term_text[0] != len(self.vocabulary):
+            # one newline-joined string, so str.find does the scanning
+            terms = list(self.vocabulary)
+            starts = [0]
+            for term in terms[:-1]:
+                starts.append(starts[-1] + len(term) + 1)
+            self._term_text = (len(self.vocabulary), terms, starts, "\n".join(terms))
+        _, terms, starts, text = self._term_text
+        found = []
+        position = text.find(keyword)
+        while position != -1:
+            n = bisect.bisect_right(starts, position) - 1
+            found.append(terms[n])
+            position = text.find(keyword, starts[n] + len(terms[n]) + 1)
+        return found
+
+    def _posting_slice(self, term):
+        """Postings of one term id (the index is sorted by term)"""
+        return slice(self._indptr[term], self._indptr[term + 1])
+
+    @perf.timed("rank.score_matrix")
+    def score_matrix(self, jd_texts, substring=False, max_cells=MATRIX_CELLS):
+        """``(ids, match_percentage, bm25)`` for every live candidate x every JD.
+
+        One pass over the postings of all the JDs' keywords: a documents x
+        keywords matrix, ``max_cells`` at a time, times the keywords x JDs
+        incidence matrix. With ``substring`` a keyword also counts when it
+        is part of a longer word ("java" in "javascript"), exactly as
+        ``matching.calculate_match_percentage`` counts it; BM25 always uses
+        whole words.
+        """
+        with self.lock:
+            keyword_sets = [jd_keywords_of(text) if text else set() for text in jd_texts]
+            keywords = sorted(set().union(*keyword_sets))
+            column = {keyword: n for n, keyword in enumerate(keywords)}
+            incidence = np.zeros((len(keywords), len(jd_texts)), dtype=np.float32)
+            for j, jd_keywords in enumerate(keyword_sets):
+                incidence[[column[k] for k in jd_keywords], j] = 1
+            sizes = np.array([len(k) for k in keyword_sets], dtype=np.float64)
+            docs = np.flatnonzero(self.alive)
+            ids = [self.doc_ids[n] for n in docs]
+            n_docs = len(self.doc_ids)
+            bm25 = np.zeros((n_docs, len(jd_texts)))
+            counts = np.zeros((n_docs, len(jd_texts)))
+            if self._indptr is None or len(self._indptr) < self.max_term_id + 2:
+                self._build_index()
+
+            # same BM25 as ``score``; deleted documents get weights too, but
+            # only live rows are returned
+            n_alive = self.alive.sum()
+            avg_len = self.doc_len[self.alive].mean() if n_alive else 1.0
+            chunk = max(1, max_cells // max(n_docs, 1))
+            for start in range(0, len(keywords), chunk):
+                part = keywords[start:start + chunk]
+                weights = np.zeros((n_docs, len(part)), dtype=np.float32)
+                hits = np.zeros((n_docs, len(part)), dtype=np.float32)
+                for n, keyword in enumerate(part):
+                    term = self.vocabulary.get(keyword)
+                    if term is not None:
+                        postings = self._posting_slice(term)
+                        doc, tf = self.doc[postings], self.tf[postings]
+                        df = self.alive[doc].sum()
+                        idf = np.log1p((n_alive - df + 0.5) / (df + 0.5))
+                        norm = self.k1 * (1 - self.b + self.b * self.doc_len[doc] / avg_len)
+                        weights[doc, n] = idf * tf * (self.k1 + 1) / (tf + norm)
+                    # only keywords longer than two characters count as matches
+                    if len(keyword) <= 2:
+                        continue
+                    if substring:
+                        for contained in self._terms_containing(keyword):
+                            hits[self.doc[self._posting_slice(self.vocabulary[contained])], n] = 1
+                    elif term is not None:
+                        hits[doc, n] = 1
+                bm25 += weights @ incidence[start:start + len(part)]
+                counts += hits @ incidence[start:start + len(part)]
+
+            # same arithmetic as matching.match_percentage; a JD without
+            # keywords has no hits, so dividing by 1 keeps it at 0
+            match = np.minimum(((counts / np.maximum(sizes, 1)) * 100).astype(int), 100)
+            return ids, match[docs], bm25[docs]
+
+    def ranked(self, jd_text):
+        """The RankedIndex of every live candidate for a JD, built on first use"""
+        with self.lock:
+            key = " ".join(sorted(jd_keywords_of(jd_text))) if jd_text else ""
+            index = self._ranked.get(key)
+            if index is not None:
+                self._ranked.move_to_end(key)
+                return index
+            with perf.timer("rank.index"):
+                docs = np.flatnonzero(self.alive)
+                match, bm25 = self.score(jd_text)
+                index = RankedIndex([self.doc_ids[n] for n in docs], match[docs], bm25[docs])
+            self._ranked[key] = index
+            if len(self._ranked) > RANKED_INDEXES:
+                self._ranked.popitem(last=False)
+            return index
+
+    def rank(self, jd_text, ids=None, min_match=0, top_k=None):
+        """Rank candidates (all, or just ``ids``) against a JD from its RankedIndex"""
+        return self.ranked(jd_text).select(ids, min_match, top_k)
@@ -0,0 +1,148 @@
+"""Incremental re-parse of stored resumes after a parser change.
+
+Every candidate row records the ``parsing.parser_version()`` that
+produced its name/email/phone/skills/experience. When the skill
+taxonomy or the field regexes change, only rows stamped with another
+version are re-derived, from the ``content`` already in the database
+(nothing is extracted again). Rows are walked in rowid order in
+batches; each batch is parsed across a process pool and written in one
+short transaction, so the UI keeps reading and uploads keep landing
+while it runs. Rows whose fields come out the same only get a new
+stamp. The ingest worker (``python -m jobs``) re-parses in the
+background when its queue is idle; to do it in one go:
+
+    python -m reparse --workers 8
+"""
+import argparse
+import sys
+import time
+from contextlib import closing, nullcontext
+
+import db
+import perf
+from ingest import IngestPool, default_workers
+from parsing import parse_resume, parser_version
+
+STALE = "(parser_version IS NULL OR parser_version != ?)"
+
+
+def stale_count(conn, version=None):
+    """Candidates parsed by another parser version (or before versions were recorded)"""
+    version = version or parser_version()
+    return conn.execute(f"SELECT COUNT(*) FROM candidates WHERE {STALE}", (version,)).fetchone()[0]
+
+
+def parse_texts(texts):
+    """``parse_resume`` over a chunk of texts; runs in pool workers"""
+    return [parse_resume(text) for text in texts]
+
+
+def _chunks(items, count):
+    size = max(1, -(-len(items) // count))
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+
+class ReparseStats:
+    """Progress counters"""
+
+    def __init__(self, total):
+        self.start = time.perf_counter()
+        self.total = total
+        self.done = 0
+        self.changed = 0
+
+    @property
+    def finished(self):
+        return self.done >= self.total
+
+    def line(self):
+        elapsed = max(time.perf_counter() - self.start, 1e-9)
+        return (f"{self.done}/{self.total} re-parsed in {elapsed:.1f}s | "
+                f"{self.done / elapsed:.0f} rows/sec | {self.changed} changed")
+
+
+@perf.timed("reparse.batch")
+def _write_batch(conn, rows, parsed, version):
+    """Store parsed fields for ``(rowid, id, content_z, *PARSED_COLUMNS)`` rows; returns how many changed"""
+    changed = 0
+    skills = db.PARSED_COLUMNS.index("skills")
+    assignments = ", ".join(f"{column} = ?" for column in db.PARSED_COLUMNS)
+    with conn:
+        for (rowid, candidate_id, _, *old), new in zip(rows, parsed):
+            new = tuple(new)
+            if new == tuple(old):
+                conn.execute("UPDATE candidates SET parser_version = ? WHERE rowid = ?", (version, rowid))
+                continue
+            updated = conn.execute(
+                f"UPDATE candidates SET {assignments}, parser_version = ? WHERE rowid = ? AND id = ?",
+                (*new, version, rowid, candidate_id),
+            ).rowcount
+            # rowcount 0: deleted since the batch was read
+            if updated and new[skills] != old[skills]:
+                db.set_candidate_skills(conn, candidate_id, db.split_skills(new[skills]))
+            changed += updated
+    return changed
+
+
+def reparse(conn, workers=None, batch_size=db.DEFAULT_BATCH_SIZE, max_batches=None, progress=None,
+            pool=None):
+    """Re-derive parsed fields for stale rows and return ReparseStats.
+
+    ``progress`` is called with the stats after every batch. With
+    ``max_batches`` it returns after that many batches; calling it again
+    continues with the rows still stale. ``pool`` is an IngestPool to
+    use (and leave open) instead of starting one for this call.
+    """
+    workers = pool.workers if pool else workers or default_workers()
+    version = parser_version()
+    stats = ReparseStats(stale_count(conn, version))
+    if not stats.total:
+        return stats
+
+    # a handful of rows parse faster inline than a pool starts up
+    inline = workers <= 1 or stats.total <= batch_size // 4
+    owned = IngestPool(workers) if pool is None and not inline else None
+    pool = None if inline else pool or owned
+    columns = ", ".join(db.PARSED_COLUMNS)
+    last_rowid = 0
+    batches = 0
+    with owned or nullcontext():
+        while max_batches is None or batches < max_batches:
+            # keyset pagination: each batch is an indexed range read, and
+            # rows committed behind the cursor are never revisited
+            rows = conn.execute(
+                f"SELECT rowid, id, content_z, {columns} FROM candidates "
+                f"WHERE rowid > ? AND {STALE} ORDER BY rowid LIMIT ?",
+                (last_rowid, version, batch_size),
+            ).fetchall()
+            if not rows:
+                break
+            last_rowid = rows[-1][0]
+            texts = [db.decompress_text(row[2]) or "" for row in rows]
+            if pool:
+                parsed = [fields for chunk in pool.map(parse_texts, _chunks(texts, workers)) for fields in chunk]
+            else:
+                parsed = parse_texts(texts)
+            stats.changed += _write_batch(conn, rows, parsed, version)
+            stats.done += len(rows)
+            batches += 1
+            if progress:
+                progress(stats)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-parse candidates stored by an older parser version")
+    parser.add_argument("--db", default=db.DB_PATH)
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--batch-size", type=int, default=db.DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    with closing(db.connect(args.db)) as conn:
+        stats = reparse(conn, args.workers, args.batch_size,
+                        progress=lambda stats: print(stats.line(), file=sys.stderr))
+    print(stats.line() if stats.total else f"nothing to re-parse (parser version {parser_version()})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Skill taxonomy and single-pass skill extraction.
+
+``SkillMatcher`` compiles every skill name and synonym into one
+trie-shaped regular expression, so a resume is scanned once no matter
+how large the taxonomy is. Matches need word boundaries on both sides
+("ai" does not match "maintain") and are reported under the canonical
+skill name.
+
+A larger taxonomy can be supplied as a JSON object mapping canonical
+names to lists of synonyms, via the RESUME_SKILL_TAXONOMY environment
+variable.
+"""
+import json
+import os
+import re
+from functools import lru_cache
+
+# canonical name -> synonyms; order is the order skills are reported in
+DEFAULT_TAXONOMY = {
+    "python": [], "sql": [], "azure": ["microsoft azure"], "aws": ["amazon web services"],
+    "java": [], "react": ["react.js", "reactjs"], "etl": [], "data": [],
+    "spark": ["apache spark", "pyspark"], "javascript": [], "typescript": [],
+    "node": ["node.js", "nodejs"], "docker": [], "kubernetes": ["k8s"],
+    "tensorflow": [], "pytorch": [], "excel": [], "tableau": [], "databricks": [],
+    "snowflake": [], "airflow": ["apache airflow"], "kafka": ["apache kafka"],
+    "redis": [], "mongodb": ["mongo"], "postgresql": ["postgres"],
+    "machine learning": ["ml"], "ai": ["artificial intelligence"],
+    "data science": [], "analytics": [], "bi": ["business intelligence"],
+    "power bi": ["powerbi", "power-bi"], "looker": [], "quicksight": [],
+    "redshift": [], "bigquery": [], "gcp": ["google cloud", "google cloud platform"],
+    "devops": [], "ci/cd": ["cicd", "ci cd"], "jenkins": [], "git": [],
+    "linux": [], "bash": [], "shell": ["shell scripting"],
+}
+
+
+def _normalize(term):
+    return " ".join(term.lower().split())
+
+
+def _trie_pattern(terms):
+    """Regex matching exactly ``terms``, factored by shared prefixes.
+
+    Python's ``re`` tries alternation branches one by one; sharing
+    prefixes means each position of the text costs one walk down the trie
+    instead of one attempt per term.
+    """
+    trie = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node):
+        ends_here = "" in node
+        branches = [(r"\s+" if char == " " else re.escape(char)) + build(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        if ends_here:
+            # greedy: prefer the longer term, fall back to this one
+            return f"(?:{body})?" if len(branches) == 1 else f"{body}?"
+        return body
+
+    return build(trie)
+
+
+class SkillMatcher:
+    """Finds taxonomy skills in text in a single regex pass"""
+
+    def __init__(self, taxonomy):
+        self.canonical = {}
+        self.order = {}
+        for position, (skill, synonyms) in enumerate(taxonomy.items()):
+            self.order[_normalize(skill)] = position
+            for term in [skill, *synonyms]:
+                self.canonical.setdefault(_normalize(term), _normalize(skill))
+        self.pattern = re.compile(
+            rf"(?<!\w)(?:{_trie_pattern(self.canonical)})(?!\w)"
+        ) if self.canonical else None
+
+    def find(self, text_lower):
+        """Canonical skills in lower-cased ``text_lower``, in taxonomy order"""
+        if self.pattern is None:
+            return []
+        found = {self.canonical[_normalize(m.group())] for m in self.pattern.finditer(text_lower)}
+        return sorted(found, key=self.order.__getitem__)
+
+
+def load_taxonomy(path):
+    """Read a ``{canonical: [synonyms]}`` JSON taxonomy"""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=1)
+def default_matcher():
+    """Matcher for RESUME_SKILL_TAXONOMY, or the built-in taxonomy; built once per process"""
+    path = os.environ.get("RESUME_SKILL_TAXONOMY")
+    return SkillMatcher(load_taxonomy(path) if path else DEFAULT_TAXONOMY)
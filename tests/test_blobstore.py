@@ -0,0 +1,53 @@
+from contextlib import closing
+
+import db
+import dedupe
+from blobstore import BlobStore, file_type
+from candidate_store import CandidateStore
+from ingest import content_hash
+
+
+def store_candidates(path, texts):
+    """Candidates ``c0``, ``c1``... with their originals in the blob store; returns the digests"""
+    digests = []
+    with closing(db.connect(path)) as conn, db.CandidateWriter(conn) as writer:
+        blobs = BlobStore.for_connection(conn)
+        for n, text in enumerate(texts):
+            digest = content_hash(text.encode())
+            blobs.put(text.encode(), digest)
+            writer.add((f"c{n}", f"Person {n}", "", "", "python", "", text, digest, "test", None, None))
+            digests.append(digest)
+    return digests
+
+
+def test_deleting_candidates_deletes_their_originals(tmp_path):
+    path = str(tmp_path / "resumes.db")
+    digests = store_candidates(path, ["first resume", "second resume"])
+    store = CandidateStore(path)
+    blobs = BlobStore.for_connection(store.conn)
+
+    store.delete(["c0"], blobs)
+    assert digests[0] not in blobs and digests[1] in blobs
+
+
+def test_merging_duplicates_deletes_the_merged_originals(tmp_path):
+    path = str(tmp_path / "resumes.db")
+    digests = store_candidates(path, ["first resume", "first resume, edited", "other resume"])
+    store = CandidateStore(path)
+    blobs = BlobStore.for_connection(store.conn)
+
+    with store.writing() as conn:
+        removed = dedupe.merge_candidates(conn, "c0", ["c1"])
+    blobs.delete_unused(store.conn, removed)
+    assert removed == {digests[1]}
+    assert [digest in blobs for digest in digests] == [True, False, True]
+
+
+def test_read_returns_the_file_a_prefix_or_none(tmp_path):
+    blobs = BlobStore(str(tmp_path / "blobs"))
+    data = b"%PDF-1.4 rest of the file"
+    blobs.put(data, content_hash(data))
+
+    assert blobs.read(content_hash(data)) == data
+    assert file_type(blobs.read(content_hash(data), 8)) == (".pdf", "application/pdf")
+    assert blobs.read(content_hash(b"other")) is None
@@ -0,0 +1,20 @@
+import random
+from contextlib import closing
+
+import db
+from benchmarks.corpus import populate
+from candidate_store import CandidateStore
+
+NO_FILTERS = {"name": "", "email": "", "skills": (), "body": ""}
+
+
+def test_snapshot_skill_counts_match_the_database(tmp_path):
+    path = str(tmp_path / "resumes.db")
+    with closing(db.connect(path)) as conn:
+        populate(conn, 300, random.Random(3))
+    store = CandidateStore(path)
+    snapshot = store.snapshot()
+
+    assert snapshot.skill_counts() == db.skill_facets(store.conn, **NO_FILTERS)
+    ids = store.filter_ids(snapshot, **{**NO_FILTERS, "skills": ("python",)})
+    assert snapshot.skill_counts(ids, 10) == db.skill_facets(store.conn, 10, **{**NO_FILTERS, "skills": ("python",)})
@@ -0,0 +1,109 @@
+import sqlite3
+import threading
+from contextlib import closing
+
+import db
+import reparse
+
+
+def test_concurrent_connections_migrate_once(tmp_path):
+    path = str(tmp_path / "resumes.db")
+    errors = []
+
+    def open_database():
+        try:
+            db.connect(path).close()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=open_database) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    with closing(db.connect(path)) as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == len(db.MIGRATIONS)
+
+
+BASELINE_ROWS = [
+    ("a", "Ada Lovelace", "ada@example.com", "555-123-4567", "python, sql", "10 years",
+     "Ada Lovelace\nPython and SQL engineer, 10 years of analytics"),
+    ("b", "Grace Hopper", "grace@example.com", "", "java", "", "Grace Hopper\nJava and compilers"),
+]
+
+
+def baseline_database(path):
+    """A database as the original app created it, before any migration"""
+    with closing(sqlite3.connect(path)) as conn, conn:
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS candidates(
+        id TEXT PRIMARY KEY,
+        name TEXT,
+        email TEXT,
+        phone TEXT,
+        skills TEXT,
+        experience TEXT,
+        content TEXT
+        )
+        """)
+        conn.executemany("INSERT INTO candidates VALUES (?,?,?,?,?,?,?)", BASELINE_ROWS)
+
+
+def migrate(conn, count):
+    """Apply the first ``count`` migrations, as an older version of the app would"""
+    conn.create_function("unz", 1, db.decompress_text, deterministic=True)
+    for number in range(conn.execute("PRAGMA user_version").fetchone()[0], count):
+        conn.execute("BEGIN")
+        db.MIGRATIONS[number](conn)
+        conn.execute(f"PRAGMA user_version={number + 1}")
+        conn.commit()
+
+
+def test_migrations_from_baseline_database(tmp_path):
+    path = str(tmp_path / "database.db")
+    baseline_database(path)
+    with closing(db.connect(path)) as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == len(db.MIGRATIONS)
+        assert db.get_candidate(conn, "a")["content"] == BASELINE_ROWS[0][6]
+        assert db.list_candidates(conn) == [row[:6] for row in BASELINE_ROWS]
+        assert db.filter_candidate_ids(conn, body="compilers") == ["b"]
+        assert db.skill_facets(conn) == [("java", 1), ("python", 1), ("sql", 1)]
+        assert db.match_scores(conn, "python sql analytics") == {"a": 100}
+        assert reparse.stale_count(conn) == 2
+        with conn:
+            conn.execute("DELETE FROM candidates WHERE id = 'b'")
+        assert db.count_candidates(conn) == 1 and db.match_scores(conn, "java compilers") == {}
+
+
+def test_saved_jds_stay_matched_across_content_version_migration(tmp_path):
+    path = str(tmp_path / "database.db")
+    baseline_database(path)
+    with closing(sqlite3.connect(path)) as conn:
+        migrate(conn, db.MIGRATIONS.index(db._add_content_version))
+        with conn:
+            version = conn.execute("SELECT value FROM meta WHERE key = 'data_version'").fetchone()[0]
+            jd_id = db.save_jd(conn, "Data Engineer", "python sql")
+            db.replace_jd_matches(conn, [jd_id], [(jd_id, "a", 100, 1.0)], version, "tokens")
+    with closing(db.connect(path)) as conn:
+        assert db.list_jds(conn)[0][3] == db.content_version(conn)
+
+
+def test_skill_filters_and_facets_read_the_skill_table(tmp_path):
+    with closing(db.connect(str(tmp_path / "resumes.db"))) as conn:
+        with db.CandidateWriter(conn) as writer:
+            for candidate_id, skills in [("a", "python, sql"), ("b", "python"), ("c", "javascript, sql"),
+                                         ("d", "Not specified")]:
+                writer.add((candidate_id, candidate_id, "", "", skills, "", "resume text", candidate_id,
+                            None, None, None))
+
+        assert db.filter_candidate_ids(conn, skills=("python", "sql")) == ["a"]
+        assert sorted(db.filter_candidate_ids(conn, skills=("sql",))) == ["a", "c"]
+        assert db.skill_facets(conn) == [("python", 2), ("sql", 2), ("javascript", 1)]
+        assert db.skill_facets(conn, limit=1, skills=("sql",)) == [("sql", 2)]
+
+        with conn:
+            conn.execute("DELETE FROM candidates WHERE id = 'a'")
+        assert db.skill_names(conn) == ["javascript", "python", "sql"]
+        assert db.skill_facets(conn) == [("javascript", 1), ("python", 1), ("sql", 1)]
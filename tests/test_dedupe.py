@@ -0,0 +1,84 @@
+import random
+from contextlib import closing
+
+import numpy as np
+
+import db
+import dedupe
+from benchmarks.corpus import resume_texts
+from matching import term_counts
+from parsing import parse_resume
+
+
+def random_signatures(count, seed=0):
+    return np.random.default_rng(seed).integers(0, 2**32, size=(count, dedupe.NUM_PERM), dtype=np.uint32)
+
+
+def pairs(signatures):
+    first, second = dedupe.candidate_pairs(signatures)
+    return set(zip(first.tolist(), second.tolist()))
+
+
+def test_pairs_share_at_least_one_band():
+    signatures = random_signatures(5)
+    signatures[1] = signatures[0]
+    band = slice(5 * dedupe.ROWS, 6 * dedupe.ROWS)
+    signatures[3, band] = signatures[2, band]
+    # a band that differs in one value is not shared
+    signatures[4, band] = signatures[2, band]
+    signatures[4, band.start] += 1
+
+    assert pairs(signatures) == {(0, 1), (2, 3)}
+
+
+def test_oversized_buckets_only_pair_with_their_first_member():
+    signatures = random_signatures(dedupe.MAX_BUCKET + 5)
+    signatures[:, :dedupe.ROWS] = signatures[0, :dedupe.ROWS]
+
+    assert pairs(signatures) == {(0, n) for n in range(1, len(signatures))}
+
+
+def test_signature_similarity_estimates_jaccard():
+    text = resume_texts(1, seed=9, paragraphs=(12, 12))[0]
+    words = text.split(" ")
+    edited = " ".join(words[:-10] + ["changed"] * 10)
+    a, b = dedupe.signature(text), dedupe.signature(edited)
+    shingles_a, shingles_b = set(dedupe.shingle_hashes(text)), set(dedupe.shingle_hashes(edited))
+    jaccard = len(shingles_a & shingles_b) / len(shingles_a | shingles_b)
+
+    assert a == dedupe.signature(text) and len(a) == dedupe.NUM_PERM * 4
+    estimate = dedupe.similarity(*dedupe.signature_matrix([a, b]))
+    assert abs(estimate - jaccard) < 0.1
+    assert dedupe.signature("") is None
+
+
+def test_build_clusters_finds_planted_duplicates():
+    rng = random.Random(10)
+    texts = resume_texts(200, seed=10)
+    originals = rng.sample(range(200), 10)
+    for n in originals:
+        words = texts[n].split(" ")
+        words[rng.randrange(len(words))] = "updated"
+        texts.append(" ".join(words))
+    ids = [f"c{n}" for n in range(len(texts))]
+    clusters = dedupe.build_clusters(ids, dedupe.signature_matrix([dedupe.signature(t) for t in texts]))
+
+    assert sorted(cluster.ids for cluster in clusters) == sorted([f"c{n}", f"c{200 + k}"]
+                                                                   for k, n in enumerate(originals))
+    assert all(cluster.similarity[0] == 1.0 and cluster.similarity[1] >= dedupe.THRESHOLD
+               for cluster in clusters)
+
+
+def test_fill_signatures_signs_rows_stored_without_one(tmp_path):
+    texts = resume_texts(5, seed=11)
+    texts.append(texts[0])
+    with closing(db.connect(str(tmp_path / "dedupe.db"))) as conn:
+        with db.CandidateWriter(conn) as writer:
+            for n, text in enumerate(texts):
+                writer.add((f"c{n}", *parse_resume(text), text, f"h{n}", None, None, None), term_counts(text))
+        assert dedupe.unsigned_count(conn) == 6
+        assert dedupe.find_clusters(conn) == []
+
+        assert dedupe.fill_signatures(conn, batch_size=4) == 6
+        assert dedupe.unsigned_count(conn) == 0
+        assert [cluster.ids for cluster in dedupe.find_clusters(conn)] == [["c0", "c5"]]
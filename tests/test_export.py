@@ -0,0 +1,37 @@
+import csv
+import os
+import tempfile
+
+import export
+
+ROWS = [("Ada", "ada@example.com", "555", "5", "python", 80)]
+
+
+def test_each_database_gets_its_own_cache_directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    first = export.ExportCache.for_database(str(tmp_path / "a.db"))
+    second = export.ExportCache.for_database(str(tmp_path / "b.db"))
+    key = export.export_key(1, {}, "", 0)
+    first.build(key, "csv", ROWS)
+
+    assert first.directory != second.directory
+    assert first.get(key, "csv") and second.get(key, "csv") is None
+
+
+def test_build_writes_rows(tmp_path):
+    cache = export.ExportCache(str(tmp_path))
+    path = cache.build("key", "csv", ROWS)
+    with open(path, newline="", encoding="utf-8") as f:
+        assert list(csv.reader(f)) == [list(export.HEADER), [str(value) for value in ROWS[0]]]
+    assert os.listdir(tmp_path) == ["key.csv"]
+
+
+def test_prune_keeps_files_still_being_written(tmp_path):
+    cache = export.ExportCache(str(tmp_path), max_files=2)
+    partial = tmp_path / f"{export.PARTIAL_PREFIX}other-session.csv"
+    partial.write_text("")
+    os.utime(partial, (0, 0))
+    for n in range(4):
+        cache.build(f"key{n}", "csv", ROWS)
+
+    assert sorted(os.listdir(tmp_path)) == ["key2.csv", "key3.csv", partial.name]
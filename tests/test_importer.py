@@ -0,0 +1,37 @@
+import multiprocessing
+import random
+from contextlib import closing
+
+import db
+import importer
+from benchmarks.corpus import make_docx, resume_lines
+
+
+def test_files_lost_to_a_crashed_worker_are_retried(tmp_path, monkeypatch):
+    rng = random.Random(2)
+    source = tmp_path / "resumes"
+    source.mkdir()
+    for n in range(16):
+        (source / f"resume{n:02}.docx").write_bytes(make_docx(resume_lines(rng, 4)))
+
+    ingest_files = importer.ingest_files
+    killed = []
+
+    def crashing(files, workers=None, pool=None):
+        for result in ingest_files(files, workers, max_in_flight=6, pool=pool):
+            if not killed:
+                killed.extend(multiprocessing.active_children())
+                for child in killed:
+                    child.kill()
+            yield result
+
+    monkeypatch.setattr(importer, "ingest_files", crashing)
+    checkpoint = importer.Checkpoint(str(tmp_path / "checkpoint"))
+    with closing(db.connect(str(tmp_path / "import.db"))) as conn, closing(checkpoint):
+        stats = importer.run_import(conn, [str(source)], workers=2, checkpoint=checkpoint, progress_every=0)
+        stored = conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+
+    assert killed
+    assert not stats.failures
+    assert stats.stored == stored == 16
+    assert len(importer.Checkpoint(str(tmp_path / "checkpoint")).done) == 16
@@ -0,0 +1,22 @@
+import multiprocessing
+import random
+
+from benchmarks.corpus import make_docx, resume_lines
+from ingest import ingest_files
+
+
+def test_worker_crash_fails_in_flight_files_and_continues():
+    rng = random.Random(1)
+    files = [(f"resume{n}.docx", make_docx(resume_lines(rng, 4))) for n in range(24)]
+    results = []
+    for result in ingest_files(files, workers=2, max_in_flight=6):
+        if not results:
+            for child in multiprocessing.active_children():
+                child.kill()
+        results.append(result)
+
+    assert sorted(result.index for result in results) == list(range(len(files)))
+    crashed = [result for result in results if result.error_type == "BrokenProcessPool"]
+    assert crashed and all(result.error for result in crashed)
+    # files submitted after the crash still get processed
+    assert results[-1].ok
@@ -0,0 +1,30 @@
+import random
+from contextlib import closing
+
+import db
+import dedupe
+import jd_batch
+from benchmarks.corpus import populate
+from ranking import RankingEngine
+
+
+def test_saved_jds_stay_matched_until_resume_texts_change(tmp_path):
+    with closing(db.connect(str(tmp_path / "resumes.db"))) as conn:
+        populate(conn, 50, random.Random(4))
+        db.save_jd(conn, "Data Engineer", "python sql airflow spark")
+        conn.commit()
+        jd_batch.match_saved_jds(conn, RankingEngine())
+
+        def matched():
+            return {version for _, _, _, version, _ in db.list_jds(conn)} == {db.content_version(conn)}
+
+        assert matched()
+        # background writes that leave the texts alone
+        dedupe.fill_signatures(conn)
+        with conn:
+            conn.execute("UPDATE candidates SET parser_version = 'new'")
+        assert matched()
+
+        with conn:
+            conn.execute("DELETE FROM candidates WHERE rowid = 1")
+        assert not matched()
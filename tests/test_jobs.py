@@ -0,0 +1,77 @@
+import multiprocessing
+import random
+import time
+from contextlib import closing
+
+import db
+import jobs
+from benchmarks.corpus import make_docx, resume_lines
+
+
+def connect(tmp_path):
+    return closing(db.connect(str(tmp_path / "queue.db")))
+
+
+def test_failed_claim_is_requeued_until_out_of_attempts(tmp_path, monkeypatch):
+    def broken(conn, claimed, *args):
+        raise RuntimeError("pool exploded")
+
+    monkeypatch.setattr(jobs, "process", broken)
+    with connect(tmp_path) as conn:
+        job_id = jobs.enqueue(conn, [("a.pdf", b"%PDF-1.4")])
+        jobs.run_worker(conn, workers=1, poll=0, idle_exit=0, max_attempts=2)
+        status = jobs.job_status(conn, job_id)
+        attempts = conn.execute("SELECT attempts FROM ingest_job_files").fetchone()[0]
+    assert status.counts == {jobs.FAILED: 1}
+    assert status.errors == [("a.pdf", "pool exploded")]
+    assert attempts == 2
+
+
+def test_files_lost_to_a_crashed_pool_process_are_retried(tmp_path, monkeypatch):
+    ingest_files = jobs.ingest_files
+    killed = []
+
+    def crashing(files, workers=None, pool=None):
+        for result in ingest_files(files, workers, pool=pool):
+            if not killed:
+                killed.extend(multiprocessing.active_children())
+                for child in killed:
+                    child.kill()
+            yield result
+
+    monkeypatch.setattr(jobs, "ingest_files", crashing)
+    rng = random.Random(4)
+    with connect(tmp_path) as conn:
+        job_id = jobs.enqueue(conn, [(f"resume{n}.docx", make_docx(resume_lines(rng, 4))) for n in range(12)])
+        jobs.run_worker(conn, workers=2, poll=0, idle_exit=0)
+        status = jobs.job_status(conn, job_id)
+        attempts = dict(conn.execute("SELECT attempts, COUNT(*) FROM ingest_job_files GROUP BY attempts"))
+    assert killed
+    assert status.counts == {jobs.DONE: 12}
+    assert attempts.get(2)
+
+
+def test_heartbeat_renews_leases(tmp_path):
+    with connect(tmp_path) as conn:
+        jobs.enqueue(conn, [("a.pdf", b"%PDF-1.4")])
+        claimed = jobs.claim(conn, 10)
+        with jobs.beating(conn, [f.id for f in claimed], interval=0.05):
+            time.sleep(0.5)
+            assert jobs.claim(conn, 10, lease=0.2) == []
+            assert jobs.worker_alive(conn)
+        time.sleep(0.3)
+        assert [f.id for f in jobs.claim(conn, 10, lease=0.2)] == [f.id for f in claimed]
+
+
+def test_worker_started_from_another_directory_drains_the_same_database(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("RESUME_INGEST_WORKERS", "1")
+    with closing(db.connect("queue.db")) as conn:
+        job_id = jobs.enqueue(conn, [("a.docx", make_docx(resume_lines(random.Random(3), 4)))])
+        worker = jobs.start_worker("queue.db", idle_exit=0)
+        try:
+            worker.wait(timeout=60)
+        finally:
+            worker.kill()
+        status = jobs.job_status(conn, job_id)
+    assert status.counts == {jobs.DONE: 1}
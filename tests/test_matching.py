@@ -0,0 +1,37 @@
+from contextlib import closing
+
+import db
+from matching import calculate_match_percentage, jd_keywords_of, match_percentage, term_counts
+
+JD = "We need a Python and SQL engineer, ideally with Java, Go and Airflow"
+
+
+def test_keywords_drop_stop_words_and_case():
+    assert jd_keywords_of(JD) == {"need", "python", "sql", "engineer", "ideally", "java", "go", "airflow"}
+    assert term_counts("Python, python; SQL") == {"python": 2, "sql": 1}
+    assert term_counts("") == {}
+
+
+def test_match_percentage_is_a_capped_int_share():
+    assert match_percentage(0, 0) == 0
+    assert match_percentage(1, 3) == 33
+    assert match_percentage(5, 4) == 100
+
+
+def test_short_keywords_count_against_but_never_for_a_match():
+    # "go" is one of the eight keywords but is never looked for
+    assert calculate_match_percentage("python sql go", "", JD) == 25
+    assert calculate_match_percentage("anything", "", "") == 0
+
+
+def test_term_index_matches_whole_tokens_only(tmp_path):
+    texts = {"a": "Python and SQL engineer, Java", "b": "JavaScript engineer", "c": "baker"}
+    with closing(db.connect(str(tmp_path / "resumes.db"))) as conn:
+        with db.CandidateWriter(conn) as writer:
+            for candidate_id, text in texts.items():
+                writer.add((candidate_id, candidate_id, "", "", "", "", text, candidate_id, None, None, None))
+        scores = db.match_scores(conn, JD)
+
+    assert scores == {"a": calculate_match_percentage(texts["a"], "", JD), "b": 12}
+    # the substring scorer also finds "java" inside "javascript"
+    assert calculate_match_percentage(texts["b"], "", JD) == 25
@@ -0,0 +1,40 @@
+import pytest
+
+import parsing
+from parsing import CORE_FIELDS, extract_fields, parse_resume
+
+
+@pytest.fixture
+def extra_fields(monkeypatch):
+    monkeypatch.setattr(parsing, "FIELDS", dict(parsing.FIELDS))
+    parsing.register_field("degrees", r"(?i:\b(?:bachelor|ph\.?d)(?!\w))", multiple=True)
+    parsing.register_field("dates", r"(?i:\b(?:jan|mar)[a-z]*\s+\d{4}|\d{4}\s*-\s*present\b)", multiple=True)
+    yield
+    monkeypatch.undo()
+    parsing._pattern.cache_clear()
+    parsing._compile.cache_clear()
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("5551234567@mail.com", {"email": "5551234567@mail.com", "phone": "5551234567", "experience": ""}),
+    ("over10 years", {"email": "", "phone": "", "experience": "10 years"}),
+    ("X5551234567", {"email": "", "phone": "5551234567", "experience": ""}),
+    ("ada@example.com (555) 123-4567 7+ YRS", {"email": "ada@example.com", "phone": "(555) 123-4567",
+                                               "experience": "7+ yrs"}),
+])
+def test_core_fields_match_as_if_searched_alone(text, expected):
+    assert extract_fields(text, CORE_FIELDS) == expected
+
+
+def test_only_stored_fields_are_registered():
+    assert tuple(parsing.FIELDS) == CORE_FIELDS
+
+
+def test_multiple_fields_collect_distinct_matches(extra_fields):
+    fields = extract_fields("PhD, Bachelor, PhD\nJan 2019 - Mar 2020; 2015 - present", ["degrees", "dates"])
+    assert fields == {"degrees": ["PhD", "Bachelor"], "dates": ["Jan 2019", "Mar 2020", "2015 - present"]}
+
+
+def test_parse_resume():
+    text = "\n  Ada Lovelace  \nada@example.com | 555.123.4567\n10 years of Python and SQL"
+    assert parse_resume(text) == ("Ada Lovelace", "ada@example.com", "555.123.4567", "python, sql", "10 years")
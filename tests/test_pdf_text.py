@@ -0,0 +1,34 @@
+import pytest
+
+from benchmarks.corpus import make_pdf
+from pdf_text import content_text, is_plausible_text, iter_raw_pdf_text
+
+
+@pytest.mark.parametrize("stream, expected", [
+    (rb"BT /F1 12 Tf (Hello) Tj ET", "Hello"),
+    # small TJ kerning joins, a wide gap is a space
+    (rb"BT [(Hel) -50 (lo) -300 (World)] TJ ET", "Hello World"),
+    (rb"BT (a\(b\) \\ \101) Tj (f(x)) Tj ET", r"a(b) \ Af(x)"),
+    (rb"BT <48656C6C6F> Tj <4 1 4> Tj ET", "HelloA@"),
+    (b"BT (\\225 item) Tj ET", "• item"),
+    (rb"BT (Line1) Tj 0 -14 Td (Line2) Tj 10 0 Td (more) Tj ET", "Line1\nLine2 more"),
+    (rb"BT (first) Tj (second) ' T* (third) Tj ET", "first\nsecond\nthird"),
+    (b"BT % (hidden) Tj\n(shown) Tj ET", "shown"),
+    (rb"BT 1 0 0 1 72 700 Tm (one) Tj ET BT (two) Tj ET", "one\ntwo"),
+    (rb"q 0 0 1 rg 10 10 100 100 re f Q", ""),
+])
+def test_content_text(stream, expected):
+    assert content_text(stream) == expected
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_raw_text_of_generated_pdf(compress):
+    lines = ["Ada Lovelace", "ada@example.com", "Skills: python, sql (advanced)"]
+    pages = list(iter_raw_pdf_text(make_pdf(lines, compress=compress)))
+    assert pages == ["\n".join(lines)]
+
+
+def test_is_plausible_text():
+    assert is_plausible_text("Senior data engineer with ten years of Python")
+    assert not is_plausible_text("�\x01\x02�" * 10)
+    assert not is_plausible_text("a" * 60)
@@ -0,0 +1,18 @@
+import json
+import os
+
+import perf
+
+
+def test_dump_writes_new_files_in_the_dump_directory(tmp_path):
+    registry = perf.Registry()
+    registry.record("parse", 0.002)
+    first = registry.dump("json", str(tmp_path))
+    second = registry.dump("json", str(tmp_path))
+    prom = registry.dump("prometheus", str(tmp_path))
+
+    assert len({first, second, prom}) == 3
+    assert all(os.path.dirname(path) == str(tmp_path) for path in (first, second, prom))
+    assert first.endswith(".json") and prom.endswith(".prom")
+    with open(first, encoding="utf-8") as f:
+        assert json.load(f)["stages"]["parse"]["count"] == 1
@@ -0,0 +1,91 @@
+import random
+from contextlib import closing
+
+import numpy as np
+import pytest
+
+import db
+from benchmarks.corpus import populate
+from matching import calculate_match_percentage
+from ranking import RankedIndex, RankingEngine
+
+JD = "Senior data engineer: python, sql, spark, airflow and aws; kafka a plus"
+
+
+@pytest.fixture
+def conn(tmp_path):
+    with closing(db.connect(str(tmp_path / "resumes.db"))) as conn:
+        populate(conn, 200, random.Random(5))
+        yield conn
+
+
+def scores_by_id(engine):
+    match, bm25 = engine.score(JD)
+    return {i: (int(match[n]), bm25[n]) for n, i in enumerate(engine.doc_ids) if engine.alive[n]}
+
+
+def assert_same_scores(engine, conn):
+    fresh = RankingEngine()
+    fresh.sync(conn)
+    expected = scores_by_id(fresh)
+    actual = scores_by_id(engine)
+    assert actual.keys() == expected.keys()
+    for i, (match, bm25) in expected.items():
+        assert actual[i][0] == match
+        assert actual[i][1] == pytest.approx(bm25)
+    # the match % the UI shows, straight from SQLite
+    assert {i: match for i, (match, _) in actual.items() if match} == db.match_scores(conn, JD)
+
+
+def test_sync_adds_and_masks_documents_incrementally(conn):
+    engine = RankingEngine()
+    engine.sync(conn)
+    populate(conn, 50, random.Random(6))
+    with conn:
+        conn.execute("DELETE FROM candidates WHERE rowid IN (3, 7)")
+    engine.sync(conn)
+
+    # two deletions are only masked out
+    assert len(engine.doc_ids) == 250 and engine.alive.sum() == 248
+    assert_same_scores(engine, conn)
+
+
+def test_sync_compacts_after_many_deletions(conn):
+    engine = RankingEngine()
+    engine.sync(conn)
+    with conn:
+        conn.execute("DELETE FROM candidates WHERE rowid % 3 = 0")
+    engine.sync(conn)
+
+    assert engine.alive.all() and len(engine.doc_ids) == db.count_candidates(conn)
+    assert engine.doc_index == {i: n for n, i in enumerate(engine.doc_ids)}
+    assert_same_scores(engine, conn)
+    populate(conn, 20, random.Random(7))
+    engine.sync(conn)
+    assert_same_scores(engine, conn)
+
+
+def test_sync_skips_unchanged_version(conn):
+    engine = RankingEngine()
+    engine.sync(conn, db.data_version(conn))
+    populate(conn, 10, random.Random(8))
+    engine.sync(conn, engine.version)
+    assert len(engine.doc_ids) == 200
+
+
+def test_substring_matrix_matches_calculate_match_percentage(conn):
+    jds = [JD, "java react typescript", ""]
+    engine = RankingEngine()
+    engine.sync(conn)
+    ids, match, _ = engine.score_matrix(jds, substring=True)
+    texts = {i: content for i, _, content in db.iter_candidate_texts(conn)}
+    expected = np.array([[calculate_match_percentage(texts[i], "", jd) for jd in jds] for i in ids])
+    assert (match == expected).all()
+
+
+def test_ranked_index_orders_and_cuts():
+    index = RankedIndex(["a", "b", "c", "d"], [50, 80, 50, 10], [1.0, 0.5, 2.0, 9.0])
+    assert index.ids == ["b", "c", "a", "d"]
+    assert index.cut(50) == 3 and index.cut(81) == 0
+    ranking = index.select(["a", "d", "b"], min_match=20, top_k=1)
+    assert ranking.ids == ["b"] and ranking.total == 2
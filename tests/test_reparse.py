@@ -0,0 +1,72 @@
+import random
+from contextlib import closing
+
+import pytest
+
+import db
+import reparse
+from benchmarks.corpus import populate
+from ingest import IngestPool
+from parsing import parse_resume, parser_version
+
+
+@pytest.fixture
+def conn(tmp_path):
+    with closing(db.connect(str(tmp_path / "resumes.db"))) as conn:
+        populate(conn, 30, random.Random(9))
+        yield conn
+
+
+def stored(conn):
+    columns = ", ".join(db.PARSED_COLUMNS)
+    return {row[0]: (tuple(row[1:-1]), row[-1]) for row in
+            conn.execute(f"SELECT id, {columns}, parser_version FROM candidates")}
+
+
+def test_stale_rows_are_parsed_again_and_stamped(conn):
+    texts = dict(conn.execute("SELECT id, unz(content_z) FROM candidates"))
+    assert reparse.stale_count(conn) == 30
+    content_version = db.content_version(conn)
+
+    stats = reparse.reparse(conn, workers=1, batch_size=8)
+
+    assert (stats.done, stats.finished) == (30, True)
+    assert stats.changed == 30
+    assert reparse.stale_count(conn) == 0
+    assert stored(conn) == {i: (tuple(parse_resume(text)), parser_version()) for i, text in texts.items()}
+    skills = {i: db.split_skills(fields[3]) for i, (fields, _) in stored(conn).items()}
+    for candidate_id, names in skills.items():
+        assert sorted(names) == [row[0] for row in conn.execute(
+            "SELECT skill FROM candidate_skills WHERE candidate_id = ? ORDER BY skill", (candidate_id,))]
+    # only parsed fields changed, not the resume texts
+    assert db.content_version(conn) == content_version
+
+
+def test_unchanged_rows_only_get_a_new_stamp(conn):
+    reparse.reparse(conn, workers=1)
+    before = stored(conn)
+    with conn:
+        conn.execute("UPDATE candidates SET parser_version = 'older' WHERE rowid <= 10")
+
+    stats = reparse.reparse(conn, workers=1)
+
+    assert (stats.done, stats.changed) == (10, 0)
+    assert stored(conn) == before
+
+
+def test_max_batches_stops_and_resumes_where_it_left_off(conn):
+    first = reparse.reparse(conn, workers=1, batch_size=8, max_batches=2)
+    assert (first.done, first.finished) == (16, False)
+    assert reparse.stale_count(conn) == 14
+
+    second = reparse.reparse(conn, workers=1, batch_size=8)
+    assert (second.total, second.done, second.finished) == (14, 14, True)
+
+
+def test_shared_pool_parses_the_same_fields(conn):
+    texts = dict(conn.execute("SELECT id, unz(content_z) FROM candidates"))
+    with IngestPool(2) as pool:
+        stats = reparse.reparse(conn, batch_size=8, pool=pool)
+        assert pool.executor is not None
+    assert stats.done == 30
+    assert stored(conn) == {i: (tuple(parse_resume(text)), parser_version()) for i, text in texts.items()}
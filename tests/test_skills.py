@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+import skills
+from skills import DEFAULT_TAXONOMY, SkillMatcher
+
+
+@pytest.fixture
+def matcher():
+    return SkillMatcher(DEFAULT_TAXONOMY)
+
+
+def test_skills_need_word_boundaries(matcher):
+    assert matcher.find("maintained javascript services, said the javanese") == ["javascript"]
+    assert matcher.find("node.js and c++") == ["node"]
+
+
+def test_synonyms_report_the_canonical_name_in_taxonomy_order(matcher):
+    text = "k8s, apache   spark, postgres and artificial intelligence with pyspark"
+    assert matcher.find(text) == ["spark", "kubernetes", "postgresql", "ai"]
+
+
+def test_longest_term_wins_at_a_position(matcher):
+    assert matcher.find("power bi dashboards") == ["power bi"]
+    assert matcher.find("bi and power-bi") == ["bi", "power bi"]
+
+
+def test_terms_sharing_prefixes_and_punctuation():
+    taxonomy = {"go": ["golang"], "google cloud": ["gcp"], "c": [], "c#": ["csharp"], "sql": ["sql server"]}
+    matcher = SkillMatcher(taxonomy)
+    text = "golang go-to c# c sql server mysql google  cloud"
+    assert matcher.find(text) == ["go", "google cloud", "c", "c#", "sql"]
+    assert SkillMatcher({}).find(text) == []
+
+
+def test_taxonomy_from_environment(tmp_path, monkeypatch):
+    path = tmp_path / "taxonomy.json"
+    path.write_text(json.dumps({"rust": ["rustlang"], "elixir": []}), encoding="utf-8")
+    monkeypatch.setenv("RESUME_SKILL_TAXONOMY", str(path))
+    skills.default_matcher.cache_clear()
+    try:
+        assert skills.default_matcher().find("rustlang, elixir and python") == ["rust", "elixir"]
+    finally:
+        monkeypatch.undo()
+        skills.default_matcher.cache_clear()